@@ -1,9 +1,21 @@
+import json
+import logging
 import os
+import time
 from contextlib import contextmanager
-from typing import Iterator
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
 
-from sqlalchemy import create_engine
+import anyio
+
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
 
 
 def get_db_url() -> str:
@@ -16,16 +28,221 @@ def get_db_url() -> str:
     return url
 
 
+def db_configured() -> bool:
+    return bool(os.getenv("DATABASE_URL") or os.getenv("POSTGRES_URL"))
+
+
+def get_async_db_url() -> str:
+    # psycopg 3 serves both engines; the async one needs the driver spelled out
+    url = get_db_url()
+    if url.startswith("postgresql://"):
+        url = url.replace("postgresql://", "postgresql+psycopg://", 1)
+    return url
+
+
+class PoolMetrics:
+    """Checkout waits for one pool class: how long callers blocked for a connection."""
+
+    # Upper bounds (ms) of the wait histogram; a final bucket catches everything slower
+    BUCKETS_MS = (1, 5, 25, 100, 500, 2000)
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.wait_total_s = 0.0
+        self.wait_max_s = 0.0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.buckets = [0] * (len(self.BUCKETS_MS) + 1)
+
+    def observe(self, wait_s: float) -> None:
+        self.checkouts += 1
+        self.wait_total_s += wait_s
+        self.wait_max_s = max(self.wait_max_s, wait_s)
+        ms = wait_s * 1000.0
+        i = next((i for i, b in enumerate(self.BUCKETS_MS) if ms <= b), len(self.BUCKETS_MS))
+        self.buckets[i] += 1
+
+    def snapshot(self, pool: Optional[Any] = None) -> Dict[str, Any]:
+        out: Dict[str, Any] = {
+            "checkouts": self.checkouts,
+            "wait_avg_ms": round(1000.0 * self.wait_total_s / self.checkouts, 3) if self.checkouts else 0.0,
+            "wait_max_ms": round(1000.0 * self.wait_max_s, 3),
+            "wait_ms_buckets": {
+                **{f"le_{b}": n for b, n in zip(self.BUCKETS_MS, self.buckets)},
+                "inf": self.buckets[-1],
+            },
+            "timeouts": self.timeouts,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+        }
+        if pool is not None and hasattr(pool, "checkedout"):
+            out.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            })
+        return out
+
+
+def _timed_pool(base: Any, metrics: PoolMetrics) -> Any:
+    # Times the public Pool.connect() checkout; pool events fire after the wait, not
+    # around it. Kept on the class so pools recreated by dispose() keep reporting.
+    class TimedPool(base):
+        def connect(self):  # type: ignore[no-untyped-def]
+            t0 = time.perf_counter()
+            try:
+                return super().connect()
+            except exc.TimeoutError:
+                metrics.timeouts += 1
+                raise
+            finally:
+                metrics.observe(time.perf_counter() - t0)
+
+    TimedPool.__name__ = f"Timed{base.__name__}"
+    return TimedPool
+
+
+POOL_METRICS = {"sync": PoolMetrics(), "async": PoolMetrics()}
+TimedQueuePool = _timed_pool(QueuePool, POOL_METRICS["sync"])
+TimedAsyncQueuePool = _timed_pool(AsyncAdaptedQueuePool, POOL_METRICS["async"])
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    raw = os.getenv(name)
+    return default if raw is None else raw.strip().lower() in ("1", "true", "yes", "on")
+
+
+def pool_options(url: str) -> Dict[str, Any]:
+    """Pool/connection settings from env (Postgres only; other URLs keep driver defaults).
+
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT_S, DB_POOL_RECYCLE_S,
+    DB_POOL_PRE_PING and DB_STATEMENT_TIMEOUT_MS (0 disables the server-side limit).
+    """
+    if not url.startswith("postgresql"):
+        return {}
+    opts: Dict[str, Any] = {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "5")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT_S", "10")),
+        # Recycle before Render/PgBouncer idle limits close connections under us
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE_S", "1800")),
+        # Detects connections killed by a Postgres restart instead of failing the request
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+    }
+    statement_ms = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "15000"))
+    if statement_ms > 0:
+        opts["connect_args"] = {"options": f"-c statement_timeout={statement_ms}"}
+    return opts
+
+
+def _instrument(sync_engine: Engine, metrics: PoolMetrics) -> None:
+    def on_connect(*_: Any) -> None:
+        metrics.connects += 1
+
+    def on_invalidate(*_: Any) -> None:
+        metrics.invalidations += 1
+
+    event.listen(sync_engine, "connect", on_connect)
+    event.listen(sync_engine, "invalidate", on_invalidate)
+
+
 _engine = None
+_async_engine = None
 
 
 def engine():
     global _engine
     if _engine is None:
-        _engine = create_engine(get_db_url(), future=True)
+        url = get_db_url()
+        opts = pool_options(url)
+        if opts:
+            opts["poolclass"] = TimedQueuePool
+        _engine = create_engine(url, future=True, **opts)
+        _instrument(_engine, POOL_METRICS["sync"])
     return _engine
 
 
+def async_engine() -> AsyncEngine:
+    """Engine for queries awaited on the event loop (request-path lookups)."""
+    global _async_engine
+    if _async_engine is None:
+        url = get_async_db_url()
+        opts = pool_options(url)
+        if opts:
+            opts["poolclass"] = TimedAsyncQueuePool
+        _async_engine = create_async_engine(url, **opts)
+        _instrument(_async_engine.sync_engine, POOL_METRICS["async"])
+    return _async_engine
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Pool metrics for engines created in this process (empty when none are)."""
+    out: Dict[str, Any] = {}
+    if _engine is not None:
+        out["sync"] = POOL_METRICS["sync"].snapshot(_engine.pool)
+    if _async_engine is not None:
+        out["async"] = POOL_METRICS["async"].snapshot(_async_engine.sync_engine.pool)
+    return out
+
+
+class SqlStore:
+    """Base for stores that run blocking SQL off the event loop.
+
+    ``bind`` pins an engine (tests, jobs); otherwise the process-wide ``engine()``.
+    """
+
+    def __init__(self, bind: Optional[Engine] = None) -> None:
+        self._bind = bind
+
+    def _engine(self) -> Engine:
+        return self._bind or engine()
+
+    async def _in_thread(self, fn: Callable[..., T], *args: Any) -> T:
+        return await anyio.to_thread.run_sync(fn, *args)
+
+    async def _in_thread_or(self, fallback: T, event: str, fn: Callable[..., T], *args: Any, **fields: Any) -> T:
+        """``_in_thread``, but failures are logged as ``event`` and reported as ``fallback``."""
+        try:
+            return await anyio.to_thread.run_sync(fn, *args)
+        except Exception as e:
+            log.warning(json.dumps({"event": event, **fields, "error": str(e)}))
+            return fallback
+
+
+# Need PostGIS (or reference a table that does); created by Alembic only
+POSTGRES_ONLY_TABLES = ("stations", "station_observations")
+
+
+def bootstrap_schema(bind: Engine) -> List[str]:
+    """Create missing tables from the SQLModel metadata on SQLite (dev/tests).
+
+    Postgres schemas are owned by the Alembic migrations, so this is a no-op there.
+    Runs once at startup; request handlers never issue DDL.
+    """
+    if bind.dialect.name != "sqlite":
+        return []
+    from sqlmodel import SQLModel
+
+    from . import models  # noqa: F401  (registers the tables on the metadata)
+
+    tables = [t for name, t in SQLModel.metadata.tables.items() if name not in POSTGRES_ONLY_TABLES]
+    with bind.connect() as conn:
+        existing = set(bind.dialect.get_table_names(conn))
+    SQLModel.metadata.create_all(bind, tables=tables)
+    created = sorted(t.name for t in tables if t.name not in existing)
+    log.info(json.dumps({"event": "schema_bootstrap", "created": created}))
+    return created
+
+
 @contextmanager
 def get_session() -> Iterator[Session]:
     sess = Session(engine())
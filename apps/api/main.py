@@ -1,12 +1,14 @@
+import asyncio
 import json
 import logging
 import os
-from datetime import datetime
+from datetime import date, datetime
 
 from fastapi import FastAPI, Depends, Query, HTTPException
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Optional, Dict, Any, Iterator
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Optional, Dict, Any, Iterator, Tuple
 from datetime import timedelta
 from contextlib import asynccontextmanager
 
@@ -15,17 +17,23 @@ from pydantic import Field
 from pydantic import ConfigDict
 from sqlmodel import Session, select
 from sqlalchemy import text as sa_text
-from apps.api.db import engine
+from apps.api.db import bootstrap_schema, db_configured, dispose_async_engine, engine, pool_stats
 from apps.api.models import Property as DBProperty, Polygon as DBPolygon, Label as DBLabel
 
-from apps.api.providers.openmeteo import OpenMeteoProvider
-from apps.api.services.ok_to_spray import ok_to_spray_hour
-from apps.api.services.station_select import select_nearest_station_safe
-from apps.api.providers.nws import NWSProvider, MissingNWSUserAgent
+from apps.api.providers.registry import ProviderRegistry
+from apps.api.providers.forecast import HourlyForecast, as_forecast
+from apps.api.services.ok_to_spray import DEFAULT_RULESET, RuleSet, ruleset_for_recipe
+from apps.api.services.spray_windows import find_windows, first_ok_window
+from apps.api.services.fanout import within
+from apps.api.services.gdd import SqlGddStore, refresh_property
+from apps.api.services.soil_obs import SqlObservationStore
+from apps.api.services.weather_snapshots import decode_snapshot, store_snapshot
+from apps.api.providers.nws import MissingNWSUserAgent
 from apps.api.services.mix_math import calc_mix
 from apps.api.services.labels import epa_ppls_pdf_url, load_label_recipes, search_recipes, filter_rates_for_product, _recipes_cache
 from apps.api.auth import verify_bearer_token
 import httpx
+import numpy as np
 
 
 APP_NAME = "Bermuda Buddy API"
@@ -51,12 +59,29 @@ log = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    if db_configured():
+        # SQLite dev databases get their tables here, once; Postgres is migrated by Alembic
+        await run_in_threadpool(bootstrap_schema, engine())
+    # Parse label recipes once, off the event loop; handlers then hit the cache
+    await run_in_threadpool(_recipes_cache, os.path.join(os.getcwd(), 'data', 'label_recipes'))
     app.state.httpx = httpx.AsyncClient(timeout=20)
+    app.state.providers = ProviderRegistry(client=app.state.httpx)
+    app.state.providers.start()
     yield
+    await app.state.providers.aclose()
     await app.state.httpx.aclose()
+    await dispose_async_engine()
 
 app = FastAPI(title=APP_NAME, version=APP_VERSION, lifespan=lifespan)
 
+
+def providers() -> ProviderRegistry:
+    # The lifespan owns the registry (and closes it); there is no unowned fallback
+    reg = getattr(app.state, "providers", None)
+    if reg is None:
+        raise RuntimeError("provider registry is not initialized; run the app with its lifespan")
+    return reg
+
 # CORS configuration - reads from environment or uses defaults
 cors_origins_env = os.getenv("CORS_ORIGINS", "")
 if cors_origins_env:
@@ -98,7 +123,13 @@ def healthz() -> dict:
 def metrics() -> JSONResponse:
     now = datetime.utcnow()
     uptime = (now - START_TIME).total_seconds()
-    payload = {"app": APP_NAME, "version": APP_VERSION, "uptime_sec": int(uptime)}
+    payload = {
+        "app": APP_NAME,
+        "version": APP_VERSION,
+        "uptime_sec": int(uptime),
+        "providers": providers().stats(),
+        "db_pool": pool_stats(),
+    }
     return JSONResponse(payload)
 
 
@@ -530,15 +561,58 @@ Write a 3-4 paragraph presidential address. Be dramatic and use political rhetor
     return {"text": body + closing}
 
 
-class HourlyRow(BaseModel):
-    ts: str
-    wind_mph: Optional[float] = None
-    wind_gust_mph: Optional[float] = None
-    precip_prob: Optional[float] = None
-    precip_in: Optional[float] = None
-    status: str
-    rules: Dict[str, bool]
-    provider: str
+def _find_recipe(product: str) -> Dict[str, Any]:
+    # Blocking on a cold cache (YAML reads); async handlers call this through run_in_threadpool
+    recs = list(_recipes_cache(os.path.join(os.getcwd(), 'data', 'label_recipes')))
+    matches = search_recipes(recs, product)
+    recipe = next((r for r in recs if matches and r.get('name') == matches[0]['name']), None)
+    if recipe is None:
+        raise HTTPException(status_code=404, detail=f"Unknown product: {product}")
+    return recipe
+
+
+def _spray_ruleset(product: Optional[str]) -> RuleSet:
+    if not product:
+        return DEFAULT_RULESET
+    return ruleset_for_recipe(_find_recipe(product))
+
+
+def _spray_table(
+    om: HourlyForecast,
+    wind: np.ndarray,
+    gust: np.ndarray,
+    row_provider: Any,
+    ruleset: RuleSet = DEFAULT_RULESET,
+    hours: Optional[int] = None,
+    verdict: Optional[Tuple[np.ndarray, Dict[str, np.ndarray]]] = None,
+    window_hours: int = 2,
+    include_caution: bool = True,
+) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, str]], List[Dict[str, Any]]]:
+    # ``om`` may extend past ``hours`` so lookahead rules can see beyond the table
+    prob = om.column("precip_prob")
+    qty = om.column("precip_in")
+    columns = {"wind_mph": wind, "wind_gust_mph": gust, "precip_prob": prob, "precip_in": qty}
+    status, rules = verdict if verdict is not None else ruleset.evaluate(columns)
+    n = len(om) if hours is None else min(hours, len(om))
+    if not isinstance(row_provider, str):
+        row_provider = row_provider[:n]
+    scored = HourlyForecast(om.times[:n], {k: v[:n] for k, v in columns.items()}, row_provider)
+    status = status[:n]
+    rules = {k: v[:n] for k, v in rules.items()}
+
+    # Response edge: materialize rows once
+    table = scored.to_rows()
+    status_list = status.tolist()
+    rule_lists = {k: v.tolist() for k, v in rules.items()}
+    for i, row in enumerate(table):
+        provider_label = row.pop("provider")
+        row["status"] = status_list[i]
+        row["rules"] = {k: v[i] for k, v in rule_lists.items()}
+        row["provider"] = provider_label
+
+    ts = [row["ts"] for row in table]
+    windows = find_windows(status, ts, window_hours, include_caution)
+    return table, first_ok_window(status, ts), windows
 
 
 @app.get("/api/weather/ok-to-spray")
@@ -546,79 +620,169 @@ async def api_ok_to_spray(
     lat: float = Query(..., ge=-90, le=90),
     lon: float = Query(..., ge=-180, le=180),
     hours: int = Query(24, ge=1, le=48),
-    wind_source: str = Query("openmeteo", pattern="^(openmeteo|nws)$"),
+    wind_source: str = Query("openmeteo", pattern="^(openmeteo|nws|nws_grid)$"),
+    product: Optional[str] = Query(None),
+    window_hours: int = Query(2, ge=1, le=48),
+    include_caution: bool = Query(True),
 ) -> Dict[str, Any]:
-    station = await select_nearest_station_safe(lat, lon)
+    ruleset = await run_in_threadpool(_spray_ruleset, product)
     start = datetime.utcnow().replace(microsecond=0)
-    end = start + timedelta(hours=hours)
-
-    om = OpenMeteoProvider()
-    om_rows = await om.get_hourly(lat, lon, start, end)
+    # Fetch past the table when a rule looks ahead (e.g. rainfast period after the last hour)
+    end = start + timedelta(hours=hours + ruleset.lookahead)
+    om_provider = providers().openmeteo
+    use_nws = wind_source in ("nws", "nws_grid") and bool(os.getenv("NWS_USER_AGENT"))
+    nws_fetch = _nws_forecast_grid if wind_source == "nws_grid" else _nws_forecast_hourly
+
+    # Inside a covered region the precomputed tile stands in for the live Open-Meteo call
+    tile_hit = await providers().tiles.forecast(lat, lon, start, hours + ruleset.lookahead)
+
+    # Sources are independent: latency is the slowest one, each bounded by its own budget
+    async with asyncio.TaskGroup() as tg:
+        station_t = tg.create_task(within("station", providers().stations.nearest(lat, lon), None))
+        om_t = None if tile_hit else tg.create_task(within("openmeteo", om_provider.get_hourly(lat, lon, start, end), None))
+        nws_t = tg.create_task(within("nws", nws_fetch(lat, lon), None)) if use_nws else None
+    station, _ = station_t.result()
+    if tile_hit is not None:
+        om, om_status = tile_hit[1], "tile"
+    else:
+        om_data, om_status = om_t.result()
+        om = as_forecast(om_data if om_data is not None else om_provider.synthetic(start, end))
 
     source_label = "OpenMeteo"
-    wind_rows = om_rows
-    if wind_source == "nws" and os.getenv("NWS_USER_AGENT"):
-        nws_by_ts = {}
-        try:
-            nws = NWSProvider()
-            nws_rows = await nws.get_forecast_hourly(lat, lon)
-            for r in nws_rows:
-                if r.get("ts"):
-                    nws_by_ts[r["ts"]] = r
-            merged: List[Dict[str, Any]] = []
-            for omr in om_rows:
-                nr = nws_by_ts.get(omr["ts"])
-                merged.append({
-                    "ts": omr["ts"],
-                    "wind_mph": (nr or {}).get("wind_mph", omr.get("wind_mph")),
-                    "wind_gust_mph": (nr or {}).get("wind_gust_mph", omr.get("wind_gust_mph")),
-                    "precip_prob": omr.get("precip_prob"),
-                    "precip_in": omr.get("precip_in"),
-                    "provider": "NWS+OpenMeteo" if nr else "OpenMeteo",
-                })
-            wind_rows = merged
-            source_label = "NWS+OpenMeteo"
-        except Exception:
-            wind_rows = om_rows
-            source_label = "OpenMeteo"
-
-    table: List[HourlyRow] = []
-    for r in wind_rows:
-        status, rules = ok_to_spray_hour(r.get("wind_mph"), r.get("wind_gust_mph"), r.get("precip_prob"), r.get("precip_in"))
-        table.append(
-            HourlyRow(
-                ts=r["ts"],
-                wind_mph=r.get("wind_mph"),
-                wind_gust_mph=r.get("wind_gust_mph"),
-                precip_prob=r.get("precip_prob"),
-                precip_in=r.get("precip_in"),
-                status=status,
-                rules=rules,
-                provider=r.get("provider", source_label),
-            )
-        )
+    wind = om.column("wind_mph")
+    gust = om.column("wind_gust_mph")
+    row_provider: Any = om.provider
+    nws_data, nws_status = nws_t.result() if nws_t else (None, "skipped")
+    if nws_data is not None:
+        nws = as_forecast(nws_data, "NWS")
+        aligned, matched = nws.reindex(om.times)
+        if wind_source == "nws_grid":
+            # gridData carries QPF and PoP too; prefer each grid value wherever it exists
+            cols = dict(om.columns)
+            for name in ("wind_mph", "wind_gust_mph", "precip_prob", "precip_in"):
+                theirs = aligned.column(name)
+                cols[name] = np.where(matched & ~np.isnan(theirs), theirs, om.column(name))
+            om = HourlyForecast(om.times, cols, om.provider, om.degraded)
+            wind, gust = om.column("wind_mph"), om.column("wind_gust_mph")
+        else:
+            wind = np.where(matched, aligned.column("wind_mph"), wind)
+            gust = np.where(matched, aligned.column("wind_gust_mph"), gust)
+        row_provider = np.where(matched, "NWS+OpenMeteo", "OpenMeteo").astype(object)
+        source_label = "NWS+OpenMeteo"
 
-    # find first 2-hour OK window
-    window = None
-    for i in range(len(table) - 1):
-        if table[i].status == "OK" and table[i + 1].status == "OK":
-            window = {"start": table[i].ts, "end": table[i + 1].ts}
-            break
+    table, window, windows = _spray_table(
+        om, wind, gust, row_provider, ruleset, hours, window_hours=window_hours, include_caution=include_caution
+    )
 
     return {
-        "source": {"provider": source_label, "station": station},
-        "table": [t.model_dump() for t in table],
+        "source": {
+            "provider": source_label,
+            "station": station,
+            "status": {"openmeteo": om_status, "nws": nws_status},
+            "degraded": om.degraded,
+            "tile": tile_hit[0].region if tile_hit is not None else None,
+        },
+        "product": ruleset.name,
+        "table": table,
         "ok_window": window,
+        "windows": windows,
     }
 
 
+async def _nws_forecast_hourly(lat: float, lon: float) -> Any:
+    return await providers().nws().get_forecast_hourly(lat, lon)
+
+
+async def _nws_forecast_grid(lat: float, lon: float) -> Any:
+    return await providers().nws().get_forecast_grid(lat, lon)
+
+
+class SprayLocation(BaseModel):
+    lat: float = Field(..., ge=-90, le=90)
+    lon: float = Field(..., ge=-180, le=180)
+    id: Optional[str] = None
+
+
+class SprayBatchRequest(BaseModel):
+    locations: List[SprayLocation] = Field(..., min_length=1, max_length=500)
+    hours: int = Field(24, ge=1, le=48)
+    product: Optional[str] = None
+    window_hours: int = Field(2, ge=1, le=48)
+    include_caution: bool = True
+
+
+@app.post("/api/weather/ok-to-spray/batch")
+async def api_ok_to_spray_batch(req: SprayBatchRequest) -> Dict[str, Any]:
+    ruleset = await run_in_threadpool(_spray_ruleset, req.product)
+    start = datetime.utcnow().replace(microsecond=0)
+    end = start + timedelta(hours=req.hours + ruleset.lookahead)
+    points = [(loc.lat, loc.lon) for loc in req.locations]
+    async with asyncio.TaskGroup() as tg:
+        stations_t = tg.create_task(within("station", providers().stations.nearest_many(points), [None] * len(points)))
+        frames_t = tg.create_task(providers().openmeteo.get_hourly_many(points, start, end))
+    stations, _ = stations_t.result()
+    frames = frames_t.result()
+
+    # Score every location in one pass when the series line up (the usual case)
+    verdicts: List[Any] = [None] * len(frames)
+    if len({len(f) for f in frames}) == 1:
+        fields = ("wind_mph", "wind_gust_mph", "precip_prob", "precip_in")
+        status, rules = ruleset.evaluate({k: np.stack([f.column(k) for f in frames]) for k in fields})
+        verdicts = [(status[i], {k: v[i] for k, v in rules.items()}) for i in range(len(frames))]
+
+    results = []
+    for loc, frame, verdict, station in zip(req.locations, frames, verdicts, stations):
+        table, window, windows = _spray_table(
+            frame, frame.column("wind_mph"), frame.column("wind_gust_mph"), frame.provider, ruleset, req.hours, verdict,
+            window_hours=req.window_hours, include_caution=req.include_caution,
+        )
+        results.append({
+            "id": loc.id, "lat": loc.lat, "lon": loc.lon, "table": table,
+            "ok_window": window, "windows": windows, "degraded": frame.degraded, "station": station,
+        })
+    return {"source": {"provider": "OpenMeteo"}, "product": ruleset.name, "results": results}
+
+
+@app.get("/api/weather/spray-tiles")
+async def api_spray_tiles() -> Dict[str, Any]:
+    cache = providers().tiles
+    await cache.refresh()
+    return {"regions": [
+        {
+            "region": t.region,
+            "south": t.south,
+            "west": t.west,
+            "step": t.step,
+            "rows": t.shape[0],
+            "cols": t.shape[1],
+            "hours": len(t.times),
+            "computed_at": datetime.utcfromtimestamp(t.computed_at).isoformat() + "Z",
+        }
+        for t in cache.tiles.values()
+    ]}
+
+
+@app.get("/api/weather/spray-tiles/{region}")
+async def api_spray_tile_overlay(region: str, hour: int = Query(0, ge=0, le=47)) -> Dict[str, Any]:
+    """Status grid for one region ``hour`` hours from now, for map overlays."""
+    cache = providers().tiles
+    await cache.refresh()
+    tile = cache.tiles.get(region)
+    if tile is None:
+        raise HTTPException(status_code=404, detail="Unknown region")
+    now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    i = int(np.searchsorted(tile.times, int((now - datetime(1970, 1, 1)).total_seconds()))) + hour
+    if i >= len(tile.times):
+        raise HTTPException(status_code=404, detail="Hour not covered by the current tile")
+    return tile.overlay(i)
+
+
 @app.get("/api/nws/alerts")
 async def nws_alerts(lat: float = Query(..., ge=-90, le=90), lon: float = Query(..., ge=-180, le=180)):
     try:
-        nws = NWSProvider()
+        alerts = await providers().alerts(lat, lon)
     except MissingNWSUserAgent as e:
         raise HTTPException(status_code=500, detail=str(e))
-    alerts = await nws.get_alerts(lat, lon)
     return {"alerts": alerts}
 
 
@@ -631,29 +795,46 @@ async def weather_summary(
     return await compute_weather_summary(lat, lon, hours)
 
 
+async def _nws_alerts(lat: float, lon: float) -> List[Dict[str, Any]]:
+    return await providers().alerts(lat, lon)
+
+
+async def _station_and_soil(lat: float, lon: float) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    # The soil read depends on the station, so it runs as one branch of the fan-out
+    station, _ = await within("station", providers().stations.nearest(lat, lon), None)
+    soil = None
+    if station is not None and station.get("has_soil_temp"):
+        soil, _ = await within("soil", SqlObservationStore().latest(station["id"]), None)
+    return station, soil
+
+
 async def compute_weather_summary(lat: float, lon: float, hours: int = 6) -> Dict[str, Any]:
-    station = await select_nearest_station_safe(lat, lon)
-    provider = OpenMeteoProvider()
     start = datetime.utcnow().replace(microsecond=0)
     end = start + timedelta(hours=hours)
-    rows = await provider.get_hourly(lat, lon, start, end)
+    om_provider = providers().openmeteo
+    use_nws = bool(os.getenv("NWS_USER_AGENT"))
+
+    async with asyncio.TaskGroup() as tg:
+        station_t = tg.create_task(_station_and_soil(lat, lon))
+        om_t = tg.create_task(within("openmeteo", om_provider.get_hourly(lat, lon, start, end), None))
+        alerts_t = tg.create_task(within("alerts", _nws_alerts(lat, lon), [])) if use_nws else None
+    station, soil = station_t.result()
+    om_data, _ = om_t.result()
+    om = as_forecast(om_data if om_data is not None else om_provider.synthetic(start, end))
+    rows = om.to_rows()
     current = rows[0] if rows else None
 
-    alerts = []
+    alerts: List[Dict[str, Any]] = []
     alerts_status = "skipped_missing_user_agent"
-    if os.getenv("NWS_USER_AGENT"):
-        try:
-            nws = NWSProvider()
-            alerts = await nws.get_alerts(lat, lon)
-            alerts_status = "ok"
-        except Exception:
-            alerts = []
-            alerts_status = "error"
+    if alerts_t is not None:
+        alerts, alerts_status = alerts_t.result()
 
     return {
-        "source": {"provider": "OpenMeteo", "station": station},
+        "source": {"provider": "OpenMeteo", "station": station, "degraded": om.degraded},
         "current": current,
         "hourlies": rows,
+        # Measured 2"/4" soil temps from the nearest station; None falls back to the modelled current.soil_temp_f
+        "soil": soil,
         "alerts": {"items": alerts, "status": alerts_status, "provider": "NWS"},
     }
 
@@ -688,6 +869,14 @@ def get_db_session() -> Iterator[Session]:  # DI-friendly
         yield s
 
 
+def _owned_property(session: Session, property_id: int, user: Dict[str, Any]) -> DBProperty:
+    # Blocking; async handlers call this through run_in_threadpool
+    prop = session.exec(select(DBProperty).where(DBProperty.id == property_id)).first()
+    if not prop or (prop.user_id and prop.user_id != user.get("sub")):
+        raise HTTPException(status_code=404, detail="property not found")
+    return prop
+
+
 class PropertyCreate(BaseModel):
     address: str
     state: Optional[str] = None
@@ -702,28 +891,8 @@ class PropertyCreate(BaseModel):
     user_id: Optional[str] = None
 
 
-def _ensure_sqlite_onboarding_tables(session: Session) -> None:
-    try:
-        bind = session.get_bind()
-        if bind and bind.dialect.name == 'sqlite':
-            session.execute(sa_text(
-                "CREATE TABLE IF NOT EXISTS properties ("
-                "id INTEGER PRIMARY KEY, user_id VARCHAR, address VARCHAR NOT NULL, lat FLOAT, lon FLOAT, timezone VARCHAR, "
-                "program_goal VARCHAR, irrigation VARCHAR, cultivar VARCHAR, mower VARCHAR, hoc_in FLOAT, state VARCHAR, "
-                "pgr_last_gdd0 DATE, pgr_last_gdd10 DATE)"
-            ))
-            session.execute(sa_text(
-                "CREATE TABLE IF NOT EXISTS polygons ("
-                "id INTEGER PRIMARY KEY, property_id INTEGER NOT NULL, name VARCHAR NOT NULL, geojson TEXT, area_sqft FLOAT, "
-                "FOREIGN KEY(property_id) REFERENCES properties(id))"
-            ))
-            session.commit()
-    except Exception:
-        pass
-
 @app.post("/api/properties")
 def create_property(payload: PropertyCreate, user=Depends(verify_bearer_token), session: Session = Depends(get_db_session)):
-    _ensure_sqlite_onboarding_tables(session)
     p = DBProperty(
         user_id=user.get("sub"),
         address=payload.address,
@@ -751,7 +920,6 @@ class PolygonCreate(BaseModel):
 
 @app.post("/api/properties/{property_id}/polygons")
 def add_polygon(property_id: int, payload: PolygonCreate, user=Depends(verify_bearer_token), session: Session = Depends(get_db_session)):
-    _ensure_sqlite_onboarding_tables(session)
     prop = session.exec(select(DBProperty).where(DBProperty.id == property_id)).first()
     if not prop or (prop.user_id and prop.user_id != user.get("sub")):
         raise HTTPException(status_code=404, detail="property not found")
@@ -770,7 +938,6 @@ class PolygonUpdate(BaseModel):
 
 @app.put("/api/properties/{property_id}/polygons/{polygon_id}")
 def update_polygon(property_id: int, polygon_id: int, payload: PolygonUpdate, user=Depends(verify_bearer_token), session: Session = Depends(get_db_session)):
-    _ensure_sqlite_onboarding_tables(session)
     prop = session.exec(select(DBProperty).where(DBProperty.id == property_id)).first()
     if not prop or (prop.user_id and prop.user_id != user.get("sub")):
         raise HTTPException(status_code=404, detail="property not found")
@@ -791,7 +958,6 @@ def update_polygon(property_id: int, polygon_id: int, payload: PolygonUpdate, us
 
 @app.delete("/api/properties/{property_id}/polygons/{polygon_id}")
 def delete_polygon(property_id: int, polygon_id: int, user=Depends(verify_bearer_token), session: Session = Depends(get_db_session)):
-    _ensure_sqlite_onboarding_tables(session)
     prop = session.exec(select(DBProperty).where(DBProperty.id == property_id)).first()
     if not prop or (prop.user_id and prop.user_id != user.get("sub")):
         raise HTTPException(status_code=404, detail="property not found")
@@ -805,7 +971,6 @@ def delete_polygon(property_id: int, polygon_id: int, user=Depends(verify_bearer
 
 @app.get("/api/properties/{property_id}")
 def get_property(property_id: int, user=Depends(verify_bearer_token), session: Session = Depends(get_db_session)):
-    _ensure_sqlite_onboarding_tables(session)
     prop = session.exec(select(DBProperty).where(DBProperty.id == property_id)).first()
     if not prop or (prop.user_id and prop.user_id != user.get("sub")):
         raise HTTPException(status_code=404, detail="property not found")
@@ -825,14 +990,12 @@ def get_property(property_id: int, user=Depends(verify_bearer_token), session: S
 def list_my_properties(mine: Optional[int] = None, user=Depends(verify_bearer_token), session: Session = Depends(get_db_session)):
     if mine != 1:
         raise HTTPException(status_code=400, detail="unsupported")
-    _ensure_sqlite_onboarding_tables(session)
     rows = session.exec(select(DBProperty).where(DBProperty.user_id == user.get("sub"))).all()
     return [{"id": r.id, "address": r.address, "state": r.state} for r in rows]
 
 
 @app.get("/api/properties/{property_id}/polygons")
 def list_polygons(property_id: int, user=Depends(verify_bearer_token), session: Session = Depends(get_db_session)):
-    _ensure_sqlite_onboarding_tables(session)
     prop = session.exec(select(DBProperty).where(DBProperty.id == property_id)).first()
     if not prop or (prop.user_id and prop.user_id != user.get("sub")):
         raise HTTPException(status_code=404, detail="property not found")
@@ -845,15 +1008,6 @@ def api_labels_by_epa(reg_no: str, session: Session = Depends(get_db_session)):
     pdf = epa_ppls_pdf_url(reg_no)
     if not pdf:
         return JSONResponse({"error": "invalid reg_no"}, status_code=400)
-    # ensure table exists for sqlite tests
-    try:
-        bind = session.get_bind()
-        if bind and bind.dialect.name == 'sqlite':
-            session.execute(sa_text("CREATE TABLE IF NOT EXISTS labels (id INTEGER PRIMARY KEY, product_id VARCHAR, epa_reg_no VARCHAR, pdf_url VARCHAR, source VARCHAR, retrieved_at VARCHAR, state_reg_json JSON, signal_word VARCHAR, rup BOOLEAN)"))
-            session.commit()
-    except Exception:
-        pass
-
     # attempt to enrich from curated recipes
     base = os.path.join(os.getcwd(), 'data', 'label_recipes')
     try:
@@ -917,13 +1071,6 @@ def api_labels_picol(reg_no: str, state: Optional[str] = None, session: Session
     # Minimal stub for PICOL supplemental labels
     state_code = (state or 'WA').upper()
     pdf = f"https://picol.cahnrs.wsu.edu/Label/{reg_no}?state={state_code}"
-    try:
-        bind = session.get_bind()
-        if bind and bind.dialect.name == 'sqlite':
-            session.execute(sa_text("CREATE TABLE IF NOT EXISTS labels (id INTEGER PRIMARY KEY, product_id VARCHAR, epa_reg_no VARCHAR, pdf_url VARCHAR, source VARCHAR, retrieved_at VARCHAR, state_reg_json JSON, signal_word VARCHAR, rup BOOLEAN)"))
-            session.commit()
-    except Exception:
-        pass
     exist = session.exec(select(DBLabel).where(DBLabel.epa_reg_no == reg_no)).first()
     if not exist:
         try:
@@ -951,8 +1098,10 @@ def api_list_applications(property_id: int, user=Depends(verify_bearer_token), s
 def api_get_application(application_id: int, user=Depends(verify_bearer_token), session: Session = Depends(get_db_session)):
     row = session.execute(
         sa_text(
-            "SELECT a.id, a.property_id, a.product_id, a.date, a.rate_value, a.rate_unit, a.area_sqft, a.carrier_gpa, a.tank_size_gal, a.gdd_model, a.notes, a.weather_snapshot, p.user_id "
+            "SELECT a.id, a.property_id, a.product_id, a.date, a.rate_value, a.rate_unit, a.area_sqft, a.carrier_gpa, a.tank_size_gal, a.gdd_model, a.notes, "
+            "COALESCE(w.payload, a.weather_snapshot) AS weather_snapshot, p.user_id "
             "FROM applications a JOIN properties p ON p.id = a.property_id "
+            "LEFT JOIN weather_snapshots w ON w.hash = a.weather_snapshot_hash "
             "WHERE a.id = :id"
         ),
         {"id": application_id},
@@ -961,6 +1110,7 @@ def api_get_application(application_id: int, user=Depends(verify_bearer_token),
         raise HTTPException(status_code=404, detail="application not found")
     d = dict(row)
     d.pop("user_id", None)
+    d["weather_snapshot"] = decode_snapshot(d["weather_snapshot"])
     return d
 
 
@@ -986,6 +1136,50 @@ def api_get_application_batch(batch_id: str, user=Depends(verify_bearer_token),
     return out
 
 
+@app.get("/api/properties/{property_id}/gdd")
+async def api_property_gdd(
+    property_id: int,
+    product: str = Query("primo"),
+    model: Optional[str] = Query(None, pattern="^gdd(0|10)$"),
+    user=Depends(verify_bearer_token),
+    session: Session = Depends(get_db_session),
+):
+    """GDD accumulated since the last PGR application, against the product's target."""
+    prop = await run_in_threadpool(_owned_property, session, property_id, user)
+    if prop.lat is None or prop.lon is None:
+        raise HTTPException(status_code=422, detail="property has no location")
+    recipe = await run_in_threadpool(_find_recipe, product)
+    rates = recipe.get("rates") or {}
+    model = model or rates.get("model") or "gdd10"
+    last_app = getattr(prop, f"pgr_last_{model}", None)
+    since = date.fromisoformat(str(last_app)[:10]) if last_app else None
+    today = datetime.utcnow().date()
+
+    target = rates.get("target_gdd")
+    out: Dict[str, Any] = {
+        "property_id": prop.id,
+        "product": recipe.get("name"),
+        "model": model,
+        "last_application": since.isoformat() if since else None,
+        "target_gdd": target,
+        "gdd_since": None,
+        "through": None,
+        "remaining": None,
+        "due": None,
+        "history_truncated": None,
+    }
+    if since is None:
+        return out
+    store = SqlGddStore(bind=session.get_bind())
+    await refresh_property(store, providers().openmeteo, prop.id, prop.lat, prop.lon, since, today)
+    acc = await store.since(prop.id, since.isoformat(), model)
+    gdd = round(acc["gdd"], 1)
+    out.update({"gdd_since": gdd, "through": acc["through"], "history_truncated": acc["history_truncated"]})
+    if target is not None:
+        out.update({"remaining": round(max(float(target) - gdd, 0.0), 1), "due": gdd >= float(target)})
+    return out
+
+
 class PgrLogRequest(BaseModel):
     property_id: int
     model: str  # 'gdd0' | 'gdd10'
@@ -1023,22 +1217,23 @@ class ApplicationsBulkRequest(BaseModel):
     items: List[ApplicationItem]
 
 
+def _insert_applications(session: Session, rows: List[Dict[str, Any]], weather_snapshot: Optional[Dict[str, Any]]) -> None:
+    # The batch shares one snapshot row; items are written in a single executemany
+    snapshot_key = store_snapshot(session, weather_snapshot)
+    session.execute(
+        sa_text(
+            "INSERT INTO applications (property_id, product_id, date, rate_value, rate_unit, area_sqft, carrier_gpa, tank_size_gal, gdd_model, notes, weather_snapshot_hash, batch_id) "
+            "VALUES (:property_id, :product_id, :date, :rate_value, :rate_unit, :area_sqft, :carrier_gpa, :tank_size_gal, :gdd_model, :notes, :weather_snapshot_hash, :batch_id)"
+        ),
+        [{**row, "weather_snapshot_hash": snapshot_key} for row in rows],
+    )
+    session.commit()
+
+
 @app.post("/api/applications/bulk")
 async def api_applications_bulk(req: ApplicationsBulkRequest, user=Depends(verify_bearer_token), session: Session = Depends(get_db_session)):
-    prop = session.exec(select(DBProperty).where(DBProperty.id == req.property_id)).first()
-    if not prop or (prop.user_id and prop.user_id != user.get("sub")):
-        raise HTTPException(status_code=404, detail="property not found")
-    try:
-        bind = session.get_bind()
-        if bind and bind.dialect.name == 'sqlite':
-            session.execute(sa_text("CREATE TABLE IF NOT EXISTS applications (id INTEGER PRIMARY KEY, property_id INTEGER NOT NULL, product_id VARCHAR NOT NULL, date DATE, rate_value FLOAT, rate_unit VARCHAR, area_sqft FLOAT, carrier_gpa FLOAT, tank_size_gal FLOAT, gdd_model VARCHAR, notes TEXT, weather_snapshot JSON, batch_id VARCHAR)"))
-            session.commit()
-    except Exception:
-        pass
-    ins_sql = (
-        "INSERT INTO applications (property_id, product_id, date, rate_value, rate_unit, area_sqft, carrier_gpa, tank_size_gal, gdd_model, notes, weather_snapshot, batch_id) "
-        "VALUES (:property_id, :product_id, :date, :rate_value, :rate_unit, :area_sqft, :carrier_gpa, :tank_size_gal, :gdd_model, :notes, :weather_snapshot, :batch_id)"
-    )
+    # The session is synchronous: its work goes to the threadpool so the loop keeps serving
+    prop = await run_in_threadpool(_owned_property, session, req.property_id, user)
     today = datetime.utcnow().date().isoformat()
     d = req.date or today
     # Generate batch_id as ISO timestamp + property
@@ -1051,23 +1246,21 @@ async def api_applications_bulk(req: ApplicationsBulkRequest, user=Depends(verif
             weather_snapshot = {"status": "skipped_missing_location"}
     except Exception:
         weather_snapshot = {"status": "error"}
-    for it in req.items:
-        session.execute(
-            sa_text(ins_sql),
-            {
-                'property_id': req.property_id,
-                'product_id': it.product_id,
-                'date': d,
-                'rate_value': it.rate_value,
-                'rate_unit': it.rate_unit,
-                'area_sqft': req.area_sqft,
-                'carrier_gpa': req.carrier_gpa,
-                'tank_size_gal': req.tank_size_gal,
-                'gdd_model': req.gdd_model,
-                'notes': req.notes,
-                'weather_snapshot': json.dumps(weather_snapshot),
-                'batch_id': batch_id,
-            },
-        )
-    session.commit()
+    rows = [
+        {
+            'property_id': req.property_id,
+            'product_id': it.product_id,
+            'date': d,
+            'rate_value': it.rate_value,
+            'rate_unit': it.rate_unit,
+            'area_sqft': req.area_sqft,
+            'carrier_gpa': req.carrier_gpa,
+            'tank_size_gal': req.tank_size_gal,
+            'gdd_model': req.gdd_model,
+            'notes': req.notes,
+            'batch_id': batch_id,
+        }
+        for it in req.items
+    ]
+    await run_in_threadpool(_insert_applications, session, rows, weather_snapshot)
     return {"ok": True, "count": len(req.items), "batch_id": batch_id}
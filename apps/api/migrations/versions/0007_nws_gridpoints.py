@@ -0,0 +1,35 @@
+"""nws gridpoint resolution cache
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2025-09-02
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'nws_gridpoints',
+        sa.Column('point_key', sa.String, primary_key=True),
+        sa.Column('grid_id', sa.String, nullable=False),
+        sa.Column('grid_x', sa.Integer, nullable=False),
+        sa.Column('grid_y', sa.Integer, nullable=False),
+        sa.Column('forecast_hourly_url', sa.String, nullable=False),
+        sa.Column('forecast_grid_data_url', sa.String, nullable=True),
+        sa.Column('forecast_zone', sa.String, nullable=True),
+        sa.Column('county', sa.String, nullable=True),
+        sa.Column('state', sa.String, nullable=True),
+        sa.Column('resolved_at', sa.String, nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('nws_gridpoints')
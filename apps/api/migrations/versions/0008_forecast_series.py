@@ -0,0 +1,31 @@
+"""shared forecast series cache
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2025-09-02
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'forecast_series',
+        sa.Column('cell', sa.String, primary_key=True),
+        sa.Column('run_hour', sa.String, primary_key=True),
+        sa.Column('payload', sa.Text, nullable=False),
+        sa.Column('fetched_at', sa.Float, nullable=False),
+    )
+    op.create_index('ix_forecast_series_fetched_at', 'forecast_series', ['fetched_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_forecast_series_fetched_at', table_name='forecast_series')
+    op.drop_table('forecast_series')
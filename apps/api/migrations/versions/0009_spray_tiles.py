@@ -0,0 +1,33 @@
+"""precomputed regional spray tiles
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2025-09-02
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'spray_tiles',
+        sa.Column('region', sa.String, primary_key=True),
+        sa.Column('run_hour', sa.String, primary_key=True),
+        sa.Column('south', sa.Float, nullable=False),
+        sa.Column('west', sa.Float, nullable=False),
+        sa.Column('step', sa.Float, nullable=False),
+        sa.Column('rule_names', sa.String, nullable=False),
+        sa.Column('data', sa.LargeBinary, nullable=False),
+        sa.Column('computed_at', sa.Float, nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('spray_tiles')
@@ -0,0 +1,33 @@
+"""per-property daily gdd with running totals
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2025-09-02
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'gdd_daily',
+        sa.Column('property_id', sa.Integer, sa.ForeignKey('properties.id'), primary_key=True),
+        sa.Column('date', sa.Date, primary_key=True),
+        sa.Column('tmax_c', sa.Float, nullable=False),
+        sa.Column('tmin_c', sa.Float, nullable=False),
+        sa.Column('gdd0', sa.Float, nullable=False),
+        sa.Column('gdd10', sa.Float, nullable=False),
+        sa.Column('cum_gdd0', sa.Float, nullable=False),
+        sa.Column('cum_gdd10', sa.Float, nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('gdd_daily')
@@ -0,0 +1,33 @@
+"""nightly pgr due-date projections
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2025-09-02
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'pgr_due_dates',
+        sa.Column('property_id', sa.Integer, sa.ForeignKey('properties.id'), primary_key=True),
+        sa.Column('model', sa.String, primary_key=True),
+        sa.Column('last_applied', sa.Date, nullable=False),
+        sa.Column('gdd_to_date', sa.Float, nullable=False),
+        sa.Column('target_gdd', sa.Float, nullable=False),
+        sa.Column('due_date', sa.Date, nullable=True),
+        sa.Column('history_truncated', sa.Boolean, nullable=False, server_default=sa.false()),
+        sa.Column('computed_at', sa.String, nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('pgr_due_dates')
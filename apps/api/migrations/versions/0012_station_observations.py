@@ -0,0 +1,39 @@
+"""partitioned station soil-temperature observations
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2025-09-02
+"""
+
+from alembic import op
+
+
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Monthly partitions are created by the ingester as data arrives; the default
+    # partition only catches rows loaded outside that path.
+    op.execute(
+        """
+        CREATE TABLE station_observations (
+            station_id integer NOT NULL REFERENCES stations (id),
+            depth_in smallint NOT NULL,
+            observed_at timestamptz NOT NULL,
+            soil_temp_f real NOT NULL,
+            PRIMARY KEY (station_id, depth_in, observed_at)
+        ) PARTITION BY RANGE (observed_at)
+        """
+    )
+    op.execute("CREATE TABLE station_observations_default PARTITION OF station_observations DEFAULT")
+    op.execute(
+        "CREATE INDEX ix_station_observations_observed_at_brin ON station_observations "
+        "USING brin (observed_at) WITH (pages_per_range = 32)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE station_observations")
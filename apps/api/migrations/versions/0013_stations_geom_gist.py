@@ -0,0 +1,36 @@
+"""gist index on stations.geom for knn lookups
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2025-09-02
+"""
+
+from alembic import op
+
+
+revision = '0013'
+down_revision = '0012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Databases created with geoalchemy2's table events may already carry idx_stations_geom
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_indexes
+                WHERE tablename = 'stations' AND indexdef ILIKE '%USING gist (geom)%'
+            ) THEN
+                CREATE INDEX ix_stations_geom_gist ON stations USING gist (geom);
+            END IF;
+        END $$;
+        """
+    )
+    op.execute("ANALYZE stations")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_stations_geom_gist")
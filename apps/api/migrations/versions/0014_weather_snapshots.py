@@ -0,0 +1,33 @@
+"""content-addressed weather snapshots referenced by applications
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2025-09-02
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0014'
+down_revision = '0013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'weather_snapshots',
+        sa.Column('hash', sa.String(64), primary_key=True),
+        sa.Column('payload', sa.JSON, nullable=False),
+        sa.Column('created_at', sa.String, nullable=False),
+    )
+    # Existing rows keep their inline applications.weather_snapshot; new rows reference a snapshot
+    with op.batch_alter_table('applications') as batch_op:
+        batch_op.add_column(sa.Column('weather_snapshot_hash', sa.String(64), sa.ForeignKey('weather_snapshots.hash'), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('applications') as batch_op:
+        batch_op.drop_column('weather_snapshot_hash')
+    op.drop_table('weather_snapshots')
@@ -1,6 +1,6 @@
 from typing import Optional, Any
 from sqlmodel import SQLModel, Field
-from sqlalchemy import Column, JSON, Integer
+from sqlalchemy import Column, JSON, Integer, LargeBinary, Text
 from geoalchemy2 import Geography
 
 
@@ -49,6 +49,34 @@ class Polygon(SQLModel, table=True):
     area_sqft: Optional[float] = None
 
 
+class Application(SQLModel, table=True):
+    __tablename__ = "applications"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    property_id: int = Field(foreign_key="properties.id")
+    product_id: str
+    date: Optional[str] = None
+    rate_value: Optional[float] = None
+    rate_unit: Optional[str] = None
+    area_sqft: Optional[float] = None
+    carrier_gpa: Optional[float] = None
+    tank_size_gal: Optional[float] = None
+    gdd_model: Optional[str] = None
+    notes: Optional[str] = Field(default=None, sa_column=Column(Text))
+    # Inline snapshot on rows written before weather_snapshots existed
+    weather_snapshot: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    weather_snapshot_hash: Optional[str] = Field(default=None, foreign_key="weather_snapshots.hash")
+    batch_id: Optional[str] = None
+
+
+class WeatherSnapshot(SQLModel, table=True):
+    __tablename__ = "weather_snapshots"
+
+    hash: str = Field(primary_key=True)
+    payload: dict = Field(sa_column=Column(JSON, nullable=False))
+    created_at: str
+
+
 class Label(SQLModel, table=True):
     __tablename__ = "labels"
 
@@ -61,3 +89,76 @@ class Label(SQLModel, table=True):
     state_reg_json: Optional[dict] = Field(default=None, sa_column=Column(JSON))
     signal_word: Optional[str] = None
     rup: Optional[bool] = None
+
+
+class NWSGridpoint(SQLModel, table=True):
+    __tablename__ = "nws_gridpoints"
+
+    point_key: str = Field(primary_key=True)
+    grid_id: str
+    grid_x: int
+    grid_y: int
+    forecast_hourly_url: str
+    forecast_grid_data_url: Optional[str] = None
+    forecast_zone: Optional[str] = None
+    county: Optional[str] = None
+    state: Optional[str] = None
+    resolved_at: Optional[str] = None
+
+
+class ForecastSeries(SQLModel, table=True):
+    __tablename__ = "forecast_series"
+
+    cell: str = Field(primary_key=True)
+    run_hour: str = Field(primary_key=True)
+    payload: str
+    fetched_at: float = Field(index=True)
+
+
+class SprayTile(SQLModel, table=True):
+    __tablename__ = "spray_tiles"
+
+    region: str = Field(primary_key=True)
+    run_hour: str = Field(primary_key=True)
+    south: float
+    west: float
+    step: float
+    rule_names: str
+    data: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    computed_at: float
+
+
+class GddDaily(SQLModel, table=True):
+    __tablename__ = "gdd_daily"
+
+    property_id: int = Field(foreign_key="properties.id", primary_key=True)
+    date: str = Field(primary_key=True)
+    tmax_c: float
+    tmin_c: float
+    gdd0: float
+    gdd10: float
+    cum_gdd0: float
+    cum_gdd10: float
+
+
+class PgrDueDate(SQLModel, table=True):
+    __tablename__ = "pgr_due_dates"
+
+    property_id: int = Field(foreign_key="properties.id", primary_key=True)
+    model: str = Field(primary_key=True)
+    last_applied: str
+    gdd_to_date: float
+    target_gdd: float
+    due_date: Optional[str] = None
+    history_truncated: bool = False
+    computed_at: str
+
+
+class StationObservation(SQLModel, table=True):
+    # Range-partitioned by month on observed_at in Postgres (see migration 0012)
+    __tablename__ = "station_observations"
+
+    station_id: int = Field(foreign_key="stations.id", primary_key=True)
+    depth_in: int = Field(primary_key=True)
+    observed_at: str = Field(primary_key=True)
+    soil_temp_f: float
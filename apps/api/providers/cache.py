@@ -0,0 +1,57 @@
+import time
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+from cachetools import LRUCache
+
+
+FRESH = "fresh"
+STALE = "stale"
+
+
+class SwrCache:
+    """LRU cache with a fresh lifetime plus a stale-while-revalidate window.
+
+    Entries younger than ``fresh_ttl`` are fresh; entries up to ``fresh_ttl + max_stale``
+    may still be served while the caller refreshes them; older entries are dropped.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        fresh_ttl: float = 3600,
+        max_stale: float = 3 * 3600,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.entries: LRUCache = LRUCache(maxsize=maxsize)
+        self.fresh_ttl = fresh_ttl
+        self.max_stale = max_stale
+        self.clock = clock
+
+    def lookup(self, key: Hashable) -> Tuple[Optional[Any], Optional[str]]:
+        item = self.entries.get(key)
+        if item is None:
+            return None, None
+        value, stored_at = item
+        age = self.clock() - stored_at
+        if age < self.fresh_ttl:
+            return value, FRESH
+        if age < self.fresh_ttl + self.max_stale:
+            return value, STALE
+        self.entries.pop(key, None)
+        return None, None
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        return self.lookup(key)[0]
+
+    def put(self, key: Hashable, value: Any, age: float = 0.0) -> None:
+        """Store ``value`` as if it had been fetched ``age`` seconds ago."""
+        self.entries[key] = (value, self.clock() - age)
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self.put(key, value)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.lookup(key)[1] is not None
+
+    def __len__(self) -> int:
+        return len(self.entries)
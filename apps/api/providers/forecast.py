@@ -0,0 +1,170 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+
+# Per-hour variables carried by providers, in response-row order
+FIELDS = (
+    "t_air_f",
+    "wind_mph",
+    "wind_gust_mph",
+    "precip_prob",
+    "precip_in",
+    "dewpoint_f",
+    "soil_temp_f",
+    "et0_in",
+)
+
+
+def parse_utc(ts: Any) -> Optional[int]:
+    """ISO-8601 string (Z, offset or naive-as-UTC) -> epoch seconds."""
+    if not ts:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(ts).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def format_utc(times: np.ndarray) -> List[str]:
+    return [s + "Z" for s in np.datetime_as_string(times.astype("datetime64[s]"), unit="s").tolist()]
+
+
+def nan_to_none(arr: np.ndarray) -> List[Optional[float]]:
+    return [None if v != v else v for v in arr.tolist()]
+
+
+class HourlyForecast(Sequence):
+    """Column-oriented hourly forecast: one float64 array per variable over a shared UTC index.
+
+    Missing values are NaN. It also behaves as a read-only sequence of row dicts so
+    callers that index or iterate rows keep working; ``to_rows()`` is the response edge.
+    """
+
+    __slots__ = ("times", "columns", "provider", "degraded")
+
+    def __init__(
+        self,
+        times: np.ndarray,
+        columns: Mapping[str, np.ndarray],
+        provider: Union[str, np.ndarray],
+        degraded: bool = False,
+    ) -> None:
+        self.times = np.asarray(times, dtype=np.int64)
+        self.columns = dict(columns)
+        self.provider = provider
+        # True for placeholder data produced when the upstream source failed
+        self.degraded = degraded
+
+    @classmethod
+    def from_columns(cls, times: Iterable[Any], columns: Mapping[str, Iterable[Any]], provider: str) -> "HourlyForecast":
+        epochs = [parse_utc(t) for t in times]
+        keep = np.array([e is not None for e in epochs], dtype=bool)
+        n = len(epochs)
+        out: Dict[str, np.ndarray] = {}
+        for name, values in columns.items():
+            if values is None:
+                continue
+            vals = list(values)[:n]
+            vals += [None] * (n - len(vals))
+            out[name] = np.array(vals, dtype=np.float64)[keep]
+        return cls(np.array([e for e in epochs if e is not None], dtype=np.int64), out, provider)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Mapping[str, Any]], provider: str = "OpenMeteo") -> "HourlyForecast":
+        present = [f for f in FIELDS if any(f in r for r in rows)]
+        frame = cls.from_columns(
+            [r.get("ts") for r in rows],
+            {f: [r.get(f) for r in rows] for f in present},
+            provider,
+        )
+        labels = [r.get("provider") for r in rows if parse_utc(r.get("ts")) is not None]
+        if any(labels):
+            frame.provider = np.array([lbl or provider for lbl in labels], dtype=object)
+        return frame
+
+    @classmethod
+    def empty(cls, provider: str) -> "HourlyForecast":
+        return cls(np.empty(0, dtype=np.int64), {}, provider)
+
+    def __len__(self) -> int:
+        return int(self.times.shape[0])
+
+    def __getitem__(self, i: Any) -> Any:
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            return self.take(slice(start, stop, step))
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self.take(slice(i, i + 1)).to_rows()[0]
+
+    def take(self, sel: Any) -> "HourlyForecast":
+        provider = self.provider if isinstance(self.provider, str) else self.provider[sel]
+        return HourlyForecast(self.times[sel], {k: v[sel] for k, v in self.columns.items()}, provider, self.degraded)
+
+    def column(self, name: str) -> np.ndarray:
+        col = self.columns.get(name)
+        return col if col is not None else np.full(len(self), np.nan)
+
+    def providers(self) -> List[str]:
+        if isinstance(self.provider, str):
+            return [self.provider] * len(self)
+        return list(self.provider)
+
+    def reindex(self, times: np.ndarray) -> "tuple[HourlyForecast, np.ndarray]":
+        """Align onto ``times``; returns the aligned frame and a mask of matched hours."""
+        times = np.asarray(times, dtype=np.int64)
+        if len(self) == 0:
+            return HourlyForecast(times, {k: np.full(len(times), np.nan) for k in self.columns}, self.provider, self.degraded), np.zeros(len(times), dtype=bool)
+        order = np.argsort(self.times, kind="stable")
+        sorted_times = self.times[order]
+        pos = np.clip(np.searchsorted(sorted_times, times), 0, len(sorted_times) - 1)
+        matched = sorted_times[pos] == times
+        idx = order[pos]
+        cols = {k: np.where(matched, v[idx], np.nan) for k, v in self.columns.items()}
+        return HourlyForecast(times, cols, self.provider, self.degraded), matched
+
+    def to_payload(self) -> Dict[str, Any]:
+        """JSON-safe form for shared caches; ``from_payload`` is the inverse."""
+        return {
+            "times": self.times.tolist(),
+            "columns": {k: nan_to_none(v) for k, v in self.columns.items()},
+            "provider": self.provider if isinstance(self.provider, str) else list(self.provider),
+        }
+
+    @classmethod
+    def from_payload(cls, data: Mapping[str, Any]) -> "HourlyForecast":
+        provider = data.get("provider") or "OpenMeteo"
+        if not isinstance(provider, str):
+            provider = np.array(provider, dtype=object)
+        return cls(
+            np.array(data.get("times") or [], dtype=np.int64),
+            {k: np.array(v, dtype=np.float64) for k, v in (data.get("columns") or {}).items()},
+            provider,
+        )
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        names = [f for f in FIELDS if f in self.columns] + [k for k in self.columns if k not in FIELDS]
+        cols = [nan_to_none(self.columns[n]) for n in names]
+        provs = self.providers()
+        rows: List[Dict[str, Any]] = []
+        for i, ts in enumerate(format_utc(self.times)):
+            row: Dict[str, Any] = {"ts": ts}
+            for n, c in zip(names, cols):
+                row[n] = c[i]
+            row["provider"] = provs[i]
+            rows.append(row)
+        return rows
+
+
+def as_forecast(data: Any, provider: str = "OpenMeteo") -> HourlyForecast:
+    """Accept either a columnar forecast or legacy row dicts."""
+    if isinstance(data, HourlyForecast):
+        return data
+    return HourlyForecast.from_rows(list(data or []), provider)
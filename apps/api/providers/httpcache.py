@@ -0,0 +1,110 @@
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional
+
+from cachetools import LRUCache
+
+
+def freshness_lifetime(headers: Mapping[str, str]) -> Optional[float]:
+    """Seconds a response may be reused without revalidation, or None if it must not be stored."""
+    headers = _lower(headers)
+    cc = {}
+    for part in (headers.get("cache-control") or "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            cc[name.lower()] = value.strip('"')
+    if "no-store" in cc:
+        return None
+    if "no-cache" in cc:
+        return 0.0
+    age = _to_float(headers.get("age")) or 0.0
+    for directive in ("s-maxage", "max-age"):
+        if directive in cc:
+            ttl = _to_float(cc[directive])
+            if ttl is not None:
+                return max(ttl - age, 0.0)
+    expires = _to_epoch(headers.get("expires"))
+    if expires is not None:
+        base = _to_epoch(headers.get("date")) or time.time()
+        return max(expires - base - age, 0.0)
+    return 0.0
+
+
+class HttpCache:
+    """Validator-aware response body cache (ETag / Last-Modified / freshness lifetime).
+
+    Entries hold the parsed JSON body so a 304 skips both the transfer and the parse.
+    """
+
+    def __init__(self, maxsize: int = 512, clock: Callable[[], float] = time.time) -> None:
+        self.entries: LRUCache = LRUCache(maxsize=maxsize)
+        self.clock = clock
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        return self.entries.get(key)
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return self.clock() < entry["expires_at"]
+
+    def conditional_headers(self, entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if entry is None:
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, key: Hashable, headers: Mapping[str, str], body: Any) -> None:
+        headers = _lower(headers)
+        lifetime = freshness_lifetime(headers)
+        if lifetime is None:
+            self.entries.pop(key, None)
+            return
+        etag = headers.get("etag")
+        last_modified = headers.get("last-modified")
+        if lifetime <= 0 and not (etag or last_modified):
+            return
+        self.entries[key] = {
+            "body": body,
+            "etag": etag,
+            "last_modified": last_modified,
+            "expires_at": self.clock() + lifetime,
+        }
+
+    def refresh(self, key: Hashable, entry: Dict[str, Any], headers: Mapping[str, str]) -> Any:
+        # 304 Not Modified: keep the stored body, adopt any updated validators and lifetime
+        headers = _lower(headers)
+        lifetime = freshness_lifetime(headers)
+        entry["expires_at"] = self.clock() + (lifetime or 0.0)
+        entry["etag"] = headers.get("etag") or entry.get("etag")
+        entry["last_modified"] = headers.get("last-modified") or entry.get("last_modified")
+        self.entries[key] = entry
+        return entry["body"]
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self.entries), "hits": self.hits, "revalidated": self.revalidated, "misses": self.misses}
+
+
+def _lower(headers: Mapping[str, str]) -> Dict[str, str]:
+    return {str(k).lower(): v for k, v in (headers or {}).items()}
+
+
+def _to_float(v: Any) -> Optional[float]:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_epoch(v: Optional[str]) -> Optional[float]:
+    if not v:
+        return None
+    try:
+        return parsedate_to_datetime(v).timestamp()
+    except (TypeError, ValueError):
+        return None
@@ -3,85 +3,225 @@ import asyncio
 from typing import Any, Dict, List, Optional, Callable
 
 import httpx
+from cachetools import LRUCache
+
+from .forecast import HourlyForecast
+from .httpcache import HttpCache
+from .nws_grid import grid_forecast
+from .singleflight import SingleFlight
 
 
 class MissingNWSUserAgent(Exception):
     pass
 
 
+def point_key(lat: float, lon: float) -> str:
+    # api.weather.gov only accepts 4 decimal places on /points
+    return f"{lat:.4f},{lon:.4f}"
+
+
+class GridpointCache:
+    """In-process LRU of point -> gridpoint records, optionally backed by a persistent store.
+
+    A store exposes async ``load(key)``, ``save(key, rec)`` and ``delete(key)``.
+    """
+
+    def __init__(self, maxsize: int = 4096, store: Any = None) -> None:
+        self.lru: LRUCache = LRUCache(maxsize=maxsize)
+        self.store = store
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        rec = self.lru.get(key)
+        if rec is None and self.store is not None:
+            rec = await self.store.load(key)
+            if rec is not None:
+                self.lru[key] = rec
+        return rec
+
+    async def put(self, key: str, rec: Dict[str, Any]) -> None:
+        self.lru[key] = rec
+        if self.store is not None:
+            await self.store.save(key, rec)
+
+    async def invalidate(self, key: str) -> None:
+        self.lru.pop(key, None)
+        if self.store is not None:
+            await self.store.delete(key)
+
+
 class NWSProvider:
     def __init__(
         self,
         client: Optional[httpx.AsyncClient] = None,
         sleeper: Optional[Callable[[float], Any]] = None,
+        gridpoints: Optional[GridpointCache] = None,
+        http_cache: Optional[HttpCache] = None,
     ) -> None:
         ua = os.getenv("NWS_USER_AGENT")
         if not ua:
             raise MissingNWSUserAgent("NWS_USER_AGENT is required to call NWS APIs")
         self.user_agent = ua
-        self.client = client or httpx.AsyncClient(timeout=20, headers={"User-Agent": ua, "Accept": "application/geo+json"})
+        # Headers go on each request so the provider can share the app's pooled client
+        self.headers = {"User-Agent": ua, "Accept": "application/geo+json"}
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(timeout=20)
         self.sleep = sleeper or asyncio.sleep
+        self.flight = SingleFlight()
+        self.gridpoints = gridpoints or GridpointCache()
+        self.http_cache = http_cache or HttpCache()
 
-    async def _get_with_backoff(self, url: str, params: Optional[Dict[str, Any]] = None, max_attempts: int = 3) -> httpx.Response:
+    async def _get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        # Serve fresh bodies locally; otherwise revalidate with the stored validators.
+        # Concurrent identical GETs share one upstream request (and one backoff sequence).
+        key = (url, tuple(sorted((params or {}).items())))
+        entry = self.http_cache.get(key)
+        if entry is not None and self.http_cache.is_fresh(entry):
+            self.http_cache.hits += 1
+            return entry["body"]
+        return await self.flight.do(key, lambda: self._revalidate(key, url, params, entry))
+
+    async def _revalidate(self, key: Any, url: str, params: Optional[Dict[str, Any]], entry: Optional[Dict[str, Any]]) -> Any:
+        resp = await self._get_with_backoff(url, params=params, headers=self.http_cache.conditional_headers(entry))
+        headers = getattr(resp, "headers", None) or {}
+        if resp.status_code == 304 and entry is not None:
+            self.http_cache.revalidated += 1
+            return self.http_cache.refresh(key, entry, headers)
+        self.http_cache.misses += 1
+        body = resp.json()
+        self.http_cache.store(key, headers, body)
+        return body
+
+    async def _get_with_backoff(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        max_attempts: int = 3,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> httpx.Response:
         last_exc: Optional[Exception] = None
         for attempt in range(1, max_attempts + 1):
             try:
-                resp = await self.client.get(url, params=params)
-                # Backoff on 403/429 per requirements
-                if resp.status_code in (403, 429):
-                    raise httpx.HTTPStatusError("backoff", request=resp.request, response=resp)
-                resp.raise_for_status()
-                return resp
-            except Exception as e:  # noqa: BLE001
+                resp = await self.client.get(url, params=params, headers={**self.headers, **(headers or {})})
+            except Exception as e:
                 last_exc = e
-                if attempt == max_attempts:
-                    break
-                await self.sleep(min(2 ** attempt, 5))
+            else:
+                if resp.status_code == 304:
+                    return resp
+                # Backoff on 403/429 per requirements, and on upstream 5xx
+                if resp.status_code in (403, 429) or resp.status_code >= 500:
+                    last_exc = httpx.HTTPStatusError("backoff", request=resp.request, response=resp)
+                else:
+                    # Any other 4xx (e.g. a re-mapped gridpoint's 404) is final: fail fast
+                    resp.raise_for_status()
+                    return resp
+            if attempt == max_attempts:
+                break
+            await self.sleep(min(2 ** attempt, 5))
         assert last_exc is not None
         raise last_exc
 
+    async def aclose(self) -> None:
+        if self._owns_client:
+            await self.client.aclose()
+
     async def get_alerts(self, lat: float, lon: float) -> List[Dict[str, Any]]:
         url = f"https://api.weather.gov/alerts/active"
-        resp = await self._get_with_backoff(url, params={"point": f"{lat},{lon}"})
-        data = resp.json()
-        feats = data.get("features", [])
-        results: List[Dict[str, Any]] = []
-        for f in feats:
-            props = f.get("properties", {})
-            results.append({
-                "id": f.get("id"),
-                "area": props.get("areaDesc"),
-                "event": props.get("event"),
-                "severity": props.get("severity"),
-                "headline": props.get("headline"),
-                "effective": props.get("effective"),
-                "expires": props.get("expires"),
-                "senderName": props.get("senderName"),
-            })
-        return results
-
-    async def get_forecast_hourly(self, lat: float, lon: float) -> List[Dict[str, Any]]:
-        # Discover gridpoint
-        pt_url = f"https://api.weather.gov/points/{lat},{lon}"
-        pt_resp = await self._get_with_backoff(pt_url)
-        pt_data = pt_resp.json()
-        hourly_url = pt_data.get("properties", {}).get("forecastHourly")
-        if not hourly_url:
-            return []
-        fc_resp = await self._get_with_backoff(hourly_url)
-        fc = fc_resp.json()
+        data = await self._get_json(url, params={"point": f"{lat},{lon}"})
+        return [alert_item(f) for f in data.get("features", [])]
+
+    async def get_active_alerts(self, states: List[str]) -> List[Dict[str, Any]]:
+        # Raw GeoJSON features for whole states; used to build the local alert index
+        data = await self._get_json("https://api.weather.gov/alerts/active", params={"area": ",".join(states)})
+        return data.get("features", [])
+
+    async def resolve_point(self, lat: float, lon: float, refresh: bool = False) -> Dict[str, Any]:
+        key = point_key(lat, lon)
+        if not refresh:
+            rec = await self.gridpoints.get(key)
+            if rec is not None:
+                return rec
+        pt_data = await self._get_json(f"https://api.weather.gov/points/{key}")
+        props = pt_data.get("properties", {}) or {}
+        rec = {
+            "grid_id": props.get("gridId"),
+            "grid_x": props.get("gridX"),
+            "grid_y": props.get("gridY"),
+            "forecast_hourly_url": props.get("forecastHourly"),
+            "forecast_grid_data_url": props.get("forecastGridData"),
+            "forecast_zone": _zone_code(props.get("forecastZone")),
+            "county": _zone_code(props.get("county")),
+            "state": ((props.get("relativeLocation") or {}).get("properties") or {}).get("state"),
+        }
+        if rec["forecast_hourly_url"]:
+            await self.gridpoints.put(key, rec)
+        return rec
+
+    async def _gridpoint_json(self, lat: float, lon: float, url_field: str) -> Optional[Dict[str, Any]]:
+        # Gridpoint discovery is cached, so steady state is a single forecast request
+        rec = await self.resolve_point(lat, lon)
+        if not rec.get(url_field):
+            return None
+        try:
+            return await self._get_json(rec[url_field])
+        except httpx.HTTPStatusError as e:
+            if e.response is None or e.response.status_code != 404:
+                raise
+            # Grid was re-mapped upstream; drop the stale mapping and resolve again
+            await self.gridpoints.invalidate(point_key(lat, lon))
+            rec = await self.resolve_point(lat, lon, refresh=True)
+            if not rec.get(url_field):
+                return None
+            return await self._get_json(rec[url_field])
+
+    async def get_forecast_hourly(self, lat: float, lon: float) -> HourlyForecast:
+        fc = await self._gridpoint_json(lat, lon, "forecast_hourly_url")
+        if fc is None:
+            return HourlyForecast.empty("NWS")
         periods = fc.get("properties", {}).get("periods", [])
-        rows: List[Dict[str, Any]] = []
-        for p in periods:
-            rows.append({
-                "ts": p.get("startTime"),
-                "wind_mph": _parse_wind(p.get("windSpeed")),
-                "wind_gust_mph": _parse_wind(p.get("windGust")),
-                "precip_prob": (p.get("probabilityOfPrecipitation", {}) or {}).get("value", 0.0) / 100.0 if isinstance((p.get("probabilityOfPrecipitation", {}) or {}).get("value", None), (int, float)) else None,
-                "precip_in": None,  # NWS hourly doesn't include qty directly
-                "provider": "NWS",
-            })
-        return rows
+        return HourlyForecast.from_columns(
+            [p.get("startTime") for p in periods],
+            {
+                "wind_mph": [_parse_wind(p.get("windSpeed")) for p in periods],
+                "wind_gust_mph": [_parse_wind(p.get("windGust")) for p in periods],
+                "precip_prob": [_prob_value(p.get("probabilityOfPrecipitation")) for p in periods],
+                # NWS hourly doesn't include qty directly
+                "precip_in": [None] * len(periods),
+            },
+            "NWS",
+        )
+
+    async def get_forecast_grid(self, lat: float, lon: float) -> HourlyForecast:
+        """Raw gridData layers (wind, gust, PoP, QPF) expanded to hourly numeric columns."""
+        data = await self._gridpoint_json(lat, lon, "forecast_grid_data_url")
+        if data is None:
+            return HourlyForecast.empty("NWS")
+        return grid_forecast(data.get("properties", {}) or {})
+
+
+def alert_item(f: Dict[str, Any]) -> Dict[str, Any]:
+    props = f.get("properties", {})
+    return {
+        "id": f.get("id"),
+        "area": props.get("areaDesc"),
+        "event": props.get("event"),
+        "severity": props.get("severity"),
+        "headline": props.get("headline"),
+        "effective": props.get("effective"),
+        "expires": props.get("expires"),
+        "senderName": props.get("senderName"),
+    }
+
+
+def _prob_value(q: Any) -> Optional[float]:
+    v = (q or {}).get("value")
+    return v / 100.0 if isinstance(v, (int, float)) else None
+
+
+def _zone_code(url: Any) -> Optional[str]:
+    # ".../zones/forecast/TXZ119" -> "TXZ119"
+    if not url:
+        return None
+    return str(url).rstrip("/").rsplit("/", 1)[-1]
 
 
 def _parse_wind(s: Any) -> Optional[float]:
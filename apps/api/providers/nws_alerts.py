@@ -0,0 +1,156 @@
+import asyncio
+import json
+import logging
+import math
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .nws import NWSProvider, alert_item
+
+log = logging.getLogger(__name__)
+
+DEFAULT_STATES = ("OK", "TX")
+POLL_SECONDS = 60.0
+# Grid bucket size for the polygon index; alert polygons are typically county-sized
+CELL_DEG = 0.5
+
+Ring = np.ndarray  # (n, 2) lon/lat vertices
+
+
+def _in_ring(ring: Ring, lon: float, lat: float) -> bool:
+    # Even-odd ray cast evaluated over every edge at once
+    x, y = ring[:, 0], ring[:, 1]
+    x2, y2 = np.roll(x, -1), np.roll(y, -1)
+    crosses = (y > lat) != (y2 > lat)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_at = x + (lat - y) * (x2 - x) / (y2 - y)
+    return bool(np.count_nonzero(crosses & (lon < x_at)) % 2)
+
+
+def _polygons(geometry: Optional[Dict[str, Any]]) -> List[List[Ring]]:
+    if not geometry:
+        return []
+    coords = geometry.get("coordinates") or []
+    if geometry.get("type") == "Polygon":
+        coords = [coords]
+    elif geometry.get("type") != "MultiPolygon":
+        return []
+    return [[np.asarray(ring, dtype=np.float64)[:, :2] for ring in poly if len(ring) >= 3] for poly in coords]
+
+
+class AlertIndex:
+    """Immutable point-in-alert index over one snapshot of active alerts.
+
+    Polygon alerts are bucketed by bounding box on a coarse lat/lon grid, so a query
+    only tests the few polygons sharing the point's cell. Alerts without geometry are
+    matched through their UGC zone/county codes.
+    """
+
+    def __init__(self, features: Sequence[Dict[str, Any]], states: Iterable[str], loaded_at: float, cell_deg: float = CELL_DEG) -> None:
+        self.states: Set[str] = {s.upper() for s in states}
+        self.loaded_at = loaded_at
+        self.cell_deg = cell_deg
+        self.items: List[Dict[str, Any]] = []
+        self.shapes: List[List[List[Ring]]] = []
+        self.bounds: List[Tuple[float, float, float, float]] = []
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        self.ugc: Dict[str, List[int]] = {}
+        for f in features:
+            idx = len(self.items)
+            self.items.append(alert_item(f))
+            polys = _polygons(f.get("geometry"))
+            self.shapes.append(polys)
+            rings = [r for p in polys for r in p if len(r)]
+            if rings:
+                pts = np.concatenate(rings)
+                b = (float(pts[:, 0].min()), float(pts[:, 1].min()), float(pts[:, 0].max()), float(pts[:, 1].max()))
+                self.bounds.append(b)
+                for cx in range(self._cell(b[0]), self._cell(b[2]) + 1):
+                    for cy in range(self._cell(b[1]), self._cell(b[3]) + 1):
+                        self.cells.setdefault((cx, cy), []).append(idx)
+            else:
+                # Only geometry-less alerts match by zone; a storm-based polygon must contain the point
+                self.bounds.append((math.inf, math.inf, -math.inf, -math.inf))
+                for code in ((f.get("properties") or {}).get("geocode") or {}).get("UGC") or []:
+                    self.ugc.setdefault(code, []).append(idx)
+
+    def _cell(self, v: float) -> int:
+        return int(math.floor(v / self.cell_deg))
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def query(self, lat: float, lon: float, zones: Iterable[Optional[str]] = ()) -> List[Dict[str, Any]]:
+        hits: Set[int] = set()
+        for idx in self.cells.get((self._cell(lon), self._cell(lat)), []):
+            x0, y0, x1, y1 = self.bounds[idx]
+            if not (x0 <= lon <= x1 and y0 <= lat <= y1):
+                continue
+            if any(sum(_in_ring(r, lon, lat) for r in poly) % 2 for poly in self.shapes[idx]):
+                hits.add(idx)
+        for code in zones:
+            if code:
+                hits.update(self.ugc.get(code, []))
+        return [self.items[i] for i in sorted(hits)]
+
+
+class AlertPoller:
+    """Refreshes an ``AlertIndex`` for whole states on a fixed interval.
+
+    ``current()`` returns None until the first load and again if refreshes have been
+    failing for a few intervals, so callers fall back to per-point requests.
+    """
+
+    def __init__(
+        self,
+        nws: NWSProvider,
+        states: Sequence[str] = DEFAULT_STATES,
+        interval: float = POLL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.nws = nws
+        self.states = [s.strip().upper() for s in states if s.strip()]
+        self.interval = interval
+        self.clock = clock
+        self.index: Optional[AlertIndex] = None
+        self.failures = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def refresh(self) -> AlertIndex:
+        features = await self.nws.get_active_alerts(self.states)
+        self.index = AlertIndex(features, self.states, loaded_at=self.clock())
+        return self.index
+
+    def current(self) -> Optional[AlertIndex]:
+        if self.index is None or self.clock() - self.index.loaded_at > 3 * self.interval:
+            return None
+        return self.index
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                self.failures += 1
+                log.warning(json.dumps({"event": "nws_alert_poll_error", "error": str(e)}))
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "states": self.states,
+            "indexed": len(self.index) if self.index is not None else None,
+            "age_s": round(self.clock() - self.index.loaded_at, 1) if self.index is not None else None,
+            "poll_failures": self.failures,
+        }
@@ -0,0 +1,81 @@
+import re
+from typing import Any, Dict, Mapping, Tuple
+
+import numpy as np
+
+from .forecast import HourlyForecast, parse_utc
+
+
+# gridData layer -> (response column, accumulated over the interval?)
+LAYERS = {
+    "windSpeed": ("wind_mph", False),
+    "windGust": ("wind_gust_mph", False),
+    "probabilityOfPrecipitation": ("precip_prob", False),
+    "quantitativePrecipitation": ("precip_in", True),
+}
+
+# Multipliers into the units our rules use (mph, inches, 0..1 probability)
+UNIT_SCALE = {
+    "wmoUnit:km_h-1": 0.621371,
+    "wmoUnit:m_s-1": 2.236936,
+    "wmoUnit:mm": 1 / 25.4,
+    "wmoUnit:percent": 0.01,
+}
+
+_DURATION = re.compile(r"P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?)?$")
+
+
+def duration_hours(iso: str) -> int:
+    """ISO-8601 duration such as "PT3H" or "P1DT6H" -> whole hours (minimum 1)."""
+    m = _DURATION.match(iso or "")
+    if not m:
+        return 1
+    days, hours, minutes = (int(g) if g else 0 for g in m.groups())
+    return max(1, days * 24 + hours + minutes // 60)
+
+
+def expand_layer(layer: Mapping[str, Any], accumulated: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """Expand ``validTime`` intervals ("start/PT3H") into hourly epoch times and values.
+
+    Point values repeat across their interval; accumulations (QPF) are spread evenly.
+    """
+    values = layer.get("values") or []
+    starts, spans, vals = [], [], []
+    for v in values:
+        start, _, dur = str(v.get("validTime", "")).partition("/")
+        epoch = parse_utc(start)
+        if epoch is None:
+            continue
+        starts.append(epoch)
+        spans.append(duration_hours(dur))
+        vals.append(v.get("value"))
+    if not starts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+    start_arr = np.array(starts, dtype=np.int64)
+    span_arr = np.array(spans, dtype=np.int64)
+    val_arr = np.array(vals, dtype=np.float64) * UNIT_SCALE.get(layer.get("uom", ""), 1.0)
+    if accumulated:
+        val_arr = val_arr / span_arr
+    offsets = np.arange(int(span_arr.sum())) - np.repeat(np.cumsum(span_arr) - span_arr, span_arr)
+    times = np.repeat(start_arr, span_arr) + offsets * 3600
+    return times, np.repeat(val_arr, span_arr)
+
+
+def grid_forecast(props: Mapping[str, Any]) -> HourlyForecast:
+    """Decode a gridData ``properties`` object into one hourly frame on a shared index."""
+    expanded: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+    for layer_name, (column, accumulated) in LAYERS.items():
+        layer = props.get(layer_name)
+        if layer:
+            expanded[column] = expand_layer(layer, accumulated)
+    if not expanded:
+        return HourlyForecast.empty("NWS")
+
+    times = np.unique(np.concatenate([t for t, _ in expanded.values()]))
+    columns: Dict[str, np.ndarray] = {}
+    for column, (t, v) in expanded.items():
+        aligned = np.full(len(times), np.nan)
+        aligned[np.searchsorted(times, t)] = v
+        columns[column] = aligned
+    return HourlyForecast(times, columns, "NWS")
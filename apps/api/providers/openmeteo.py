@@ -1,32 +1,217 @@
+import asyncio
 import os
-from datetime import datetime, timedelta
-from typing import Any, Dict, List
+import random
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
 
 import httpx
-from cachetools import TTLCache
+import numpy as np
+from cachetools import LRUCache
+
+from .cache import FRESH, SwrCache
+from .forecast import FIELDS, HourlyForecast
+from .singleflight import SingleFlight
+
+
+# Open-Meteo's best-match model over CONUS is HRRR (3 km); snapping to this grid lets
+# every property inside one model cell share a single cached series.
+DEFAULT_GRID_DEG = 0.03
+SERIES_HOURS = 48
+# Coordinates per multi-location request, and how many such requests may run at once
+MULTI_CHUNK = 50
+MULTI_CONCURRENCY = 4
+# Failed fetches are remembered briefly so an outage isn't hammered; the hold doubles
+# on each consecutive failure up to the cap and is jittered so cells don't retry in lockstep
+NEGATIVE_TTL_S = 30.0
+NEGATIVE_MAX_S = 300.0
+NEGATIVE_JITTER = 0.2
+
+
+def snap_to_grid(lat: float, lon: float, grid_deg: float = DEFAULT_GRID_DEG) -> Tuple[float, float]:
+    return round(round(lat / grid_deg) * grid_deg, 4), round(round(lon / grid_deg) * grid_deg, 4)
+
+
+def hour_bucket(ts: datetime) -> datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
 
 
 class OpenMeteoProvider:
-    def __init__(self, client: httpx.AsyncClient | None = None, ttl_seconds: int = 3600) -> None:
+    def __init__(
+        self,
+        client: httpx.AsyncClient | None = None,
+        ttl_seconds: int = 3600,
+        grid_deg: float = DEFAULT_GRID_DEG,
+        chunk_size: int = MULTI_CHUNK,
+        max_stale_seconds: int = 3 * 3600,
+        store: Any = None,
+    ) -> None:
         self.client = client or httpx.AsyncClient(timeout=20)
-        self.cache: TTLCache = TTLCache(maxsize=128, ttl=ttl_seconds)
+        self.cache = SwrCache(maxsize=1024, fresh_ttl=ttl_seconds, max_stale=max_stale_seconds)
+        self.grid_deg = grid_deg
+        self.chunk_size = chunk_size
+        self.flight = SingleFlight()
+        self._background: Set[asyncio.Task] = set()
+        self.stale_served = 0
+        # key -> (retry_after, consecutive_failures); kept apart from the forecast cache
+        self.failures: LRUCache = LRUCache(maxsize=1024)
+        # Optional second tier shared across workers (see services.forecast_store)
+        self.store = store
+        self.shared_hits = 0
 
-    async def get_hourly(self, lat: float, lon: float, start: datetime, end: datetime) -> List[Dict[str, Any]]:
-        # cache key per lat/lon/hour window
-        key = f"{lat:.4f},{lon:.4f}:{start.isoformat()}:{end.isoformat()}"
-        if key in self.cache:
-            return self.cache[key]
+    def series_key(self, lat: float, lon: float, start: datetime) -> str:
+        cell_lat, cell_lon = snap_to_grid(lat, lon, self.grid_deg)
+        return f"{cell_lat:.4f},{cell_lon:.4f}:{hour_bucket(start).isoformat()}"
 
-        # Build request; we request next 48 hours max
+    async def get_hourly(self, lat: float, lon: float, start: datetime, end: datetime) -> HourlyForecast:
         hours = int((end - start).total_seconds() // 3600)
+        series = await self._get_series(lat, lon, start, hours)
+        return series.take(slice(0, hours))
+
+    async def _get_series(self, lat: float, lon: float, start: datetime, hours: int = SERIES_HOURS) -> HourlyForecast:
+        # One cached 48-hour series per grid cell and forecast hour; callers slice windows from it
+        key = self.series_key(lat, lon, start)
+        cached = self._cached(key, lat, lon, start, hours)
+        if cached is not None:
+            return cached
+        if self._failing(key):
+            return self.synthetic(hour_bucket(start), hour_bucket(start) + timedelta(hours=SERIES_HOURS))
+        return await self.flight.do(key, lambda: self._load_or_fetch(key, lat, lon, start))
+
+    def _cached(self, key: str, lat: float, lon: float, start: datetime, hours: int) -> Optional[HourlyForecast]:
+        """Fresh entry, or a stale one served while a background task refreshes it."""
+        value, state = self.cache.lookup(key)
+        if state == FRESH:
+            return value
+        if state is None:
+            # At the top of the hour the new bucket is empty; the previous bucket's series
+            # still covers the window shifted by one hour, so serve that while refetching
+            prev, prev_state = self.cache.lookup(self.series_key(lat, lon, start - timedelta(hours=1)))
+            if prev_state is None or len(prev) - 1 < hours:
+                return None
+            value = prev.take(slice(1, None))
+        self.stale_served += 1
+        self._refresh_in_background(key, lat, lon, start)
+        return value
+
+    def _failing(self, key: str) -> bool:
+        entry = self.failures.get(key)
+        return entry is not None and self.cache.clock() < entry[0]
+
+    def _record_failure(self, keys: List[str]) -> None:
+        now = self.cache.clock()
+        for key in keys:
+            _, attempts = self.failures.get(key, (0.0, 0))
+            hold = min(NEGATIVE_TTL_S * 2 ** attempts, NEGATIVE_MAX_S)
+            hold *= random.uniform(1 - NEGATIVE_JITTER, 1 + NEGATIVE_JITTER)
+            self.failures[key] = (now + hold, attempts + 1)
+
+    def _refresh_in_background(self, key: str, lat: float, lon: float, start: datetime) -> None:
+        if self.flight.pending(key) is not None or self._failing(key):
+            return
+        task = asyncio.ensure_future(self.flight.do(key, lambda: self._load_or_fetch(key, lat, lon, start)))
+        self._background.add(task)
+        task.add_done_callback(self._background_done)
+
+    def _background_done(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled():
+            task.exception()  # failures were already recorded by the fetch fallback
+
+    async def aclose(self) -> None:
+        for task in list(self._background):
+            task.cancel()
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+
+    def synthetic(self, start: datetime, end: datetime) -> HourlyForecast:
+        # Placeholder series used when upstream is unavailable or over budget
+        hours = int((end - start).total_seconds() // 3600)
+        frame = _frame_from_hourly(_synthetic_payload(hour_bucket(start))["hourly"]).take(slice(0, hours))
+        frame.degraded = True
+        return frame
+
+    async def get_hourly_many(
+        self, points: Sequence[Tuple[float, float]], start: datetime, end: datetime
+    ) -> List[HourlyForecast]:
+        """Forecasts for many locations, fetching uncached grid cells in multi-coordinate requests."""
+        hours = int((end - start).total_seconds() // 3600)
+        bucket = hour_bucket(start)
+        keys = [self.series_key(lat, lon, start) for lat, lon in points]
+        found: Dict[str, HourlyForecast] = {}
+        missing: Dict[str, Tuple[float, float]] = {}
+        for (lat, lon), key in zip(points, keys):
+            if key in found or key in missing:
+                continue
+            cached = self._cached(key, lat, lon, start, hours)
+            if cached is not None:
+                found[key] = cached
+            elif self._failing(key):
+                found[key] = self.synthetic(bucket, bucket + timedelta(hours=SERIES_HOURS))
+            else:
+                missing[key] = snap_to_grid(lat, lon, self.grid_deg)
+
+        fresh, stale = await self._load_shared([k for k in missing if self.flight.pending(k) is None])
+        found.update(fresh)
+        missing = {k: c for k, c in missing.items() if k not in fresh}
+
+        # Cells another request is already fetching are awaited rather than re-requested
+        inflight = {k: t for k in missing if (t := self.flight.pending(k)) is not None}
+        todo = [k for k in missing if k not in inflight]
+        chunks = [todo[i:i + self.chunk_size] for i in range(0, len(todo), self.chunk_size)]
+        gate = asyncio.Semaphore(MULTI_CONCURRENCY)
+
+        async def run(chunk: List[str]) -> Dict[str, HourlyForecast]:
+            async with gate:
+                return await self._fetch_cells(chunk, [missing[k] for k in chunk], bucket)
+
+        for fetched in await asyncio.gather(*(run(c) for c in chunks)):
+            # An aging shared entry beats placeholder rows when upstream is failing
+            found.update({k: stale[k] if f.degraded and k in stale else f for k, f in fetched.items()})
+        for k, task in inflight.items():
+            found[k] = await asyncio.shield(task)
+        return [found[k].take(slice(0, hours)) for k in keys]
+
+    async def _load_shared(self, keys: List[str]) -> Tuple[Dict[str, HourlyForecast], Dict[str, HourlyForecast]]:
+        """Read the shared tier into the local cache; returns (fresh, stale) entries by key."""
+        fresh: Dict[str, HourlyForecast] = {}
+        stale: Dict[str, HourlyForecast] = {}
+        if self.store is None or not keys:
+            return fresh, stale
+        for key, (frame, age) in (await self.store.load_many(keys)).items():
+            if age >= self.cache.fresh_ttl + self.cache.max_stale:
+                continue
+            self.cache.put(key, frame, age)
+            if age < self.cache.fresh_ttl:
+                fresh[key] = frame
+                self.shared_hits += 1
+            else:
+                stale[key] = frame
+        return fresh, stale
+
+    async def _load_or_fetch(self, key: str, lat: float, lon: float, start: datetime) -> HourlyForecast:
+        fresh, stale = await self._load_shared([key])
+        if key in fresh:
+            return fresh[key]
+        frame = await self._fetch_series(key, lat, lon, start)
+        if frame.degraded and key in stale:
+            return stale[key]
+        return frame
+
+    async def _fetch_series(self, key: str, lat: float, lon: float, start: datetime) -> HourlyForecast:
+        fetched = await self._fetch_cells([key], [snap_to_grid(lat, lon, self.grid_deg)], hour_bucket(start))
+        return fetched[key]
+
+    async def _fetch_cells(self, keys: List[str], cells: List[Tuple[float, float]], bucket: datetime) -> Dict[str, HourlyForecast]:
+        # Open-Meteo accepts comma-separated coordinate lists and answers with one object per location
         params = {
-            "latitude": lat,
-            "longitude": lon,
+            "latitude": ",".join(f"{c[0]:.4f}" for c in cells) if len(cells) > 1 else cells[0][0],
+            "longitude": ",".join(f"{c[1]:.4f}" for c in cells) if len(cells) > 1 else cells[0][1],
             "hourly": "temperature_2m,precipitation_probability,precipitation,wind_speed_10m,wind_gusts_10m,dew_point_2m,soil_temperature_0cm,et0_fao_evapotranspiration",
             "wind_speed_unit": "mph",
             "temperature_unit": "fahrenheit",
             "precipitation_unit": "inch",
-            "forecast_days": 2,
+            "start_hour": bucket.strftime("%Y-%m-%dT%H:%M"),
+            "end_hour": (bucket + timedelta(hours=SERIES_HOURS - 1)).strftime("%Y-%m-%dT%H:%M"),
             "timezone": "UTC",
         }
         url = "https://api.open-meteo.com/v1/forecast"
@@ -34,62 +219,130 @@ class OpenMeteoProvider:
             resp = await self.client.get(url, params=params)
             resp.raise_for_status()
             data = resp.json()
+            payloads = data if isinstance(data, list) else [data]
+            if len(payloads) != len(keys):
+                raise ValueError("location count mismatch")
         except Exception:
-            # If network fails, return synthetic empty rows to avoid crashing callers; tests will mock.
-            data = {
-                "hourly": {
-                    "time": [
-                        (start + timedelta(hours=i)).isoformat() + "Z" for i in range(hours)
-                    ],
-                    "wind_speed_10m": [0.0] * hours,
-                    "wind_gusts_10m": [None] * hours,
-                    "precipitation_probability": [0] * hours,
-                    "precipitation": [0.0] * hours,
-                    "soil_temperature_0cm": [16.0] * hours,
-                    "et0_fao_evapotranspiration": [0.0] * hours,
-                }
+            # Placeholder rows keep callers working, but they are flagged degraded and never
+            # cached as a forecast; the failure itself is held only for the short negative TTL
+            self._record_failure(keys)
+            placeholder = self.synthetic(bucket, bucket + timedelta(hours=SERIES_HOURS))
+            return {key: placeholder for key in keys}
+
+        out: Dict[str, HourlyForecast] = {}
+        for key, payload in zip(keys, payloads):
+            frame = _frame_from_hourly(payload.get("hourly", {}))
+            self.cache[key] = frame
+            self.failures.pop(key, None)
+            out[key] = frame
+        if self.store is not None:
+            await self.store.save_many(out)
+        return out
+
+    async def get_daily_temps(self, lat: float, lon: float, start: date, end: date) -> List[Tuple[str, float, float]]:
+        """Daily (ISO date, max °C, min °C) for ``start``..``end`` inclusive; days without data are skipped.
+
+        The forecast API reaches back about three months, which covers a PGR interval.
+        """
+        params = {
+            "latitude": lat,
+            "longitude": lon,
+            "daily": "temperature_2m_max,temperature_2m_min",
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+            "timezone": "UTC",
+        }
+        resp = await self.client.get("https://api.open-meteo.com/v1/forecast", params=params)
+        resp.raise_for_status()
+        return _daily_rows(resp.json().get("daily", {}) or {})
+
+    async def get_daily_temps_many(
+        self, points: Sequence[Tuple[float, float]], past_days: int = 92, forecast_days: int = 16
+    ) -> List[List[Tuple[str, float, float]]]:
+        """Daily max/min °C from ``past_days`` ago through the forecast horizon, per point.
+
+        Points go out in multi-coordinate requests of ``chunk_size``; a failed chunk
+        yields empty series for its points.
+        """
+        chunks = [list(points[i:i + self.chunk_size]) for i in range(0, len(points), self.chunk_size)]
+        gate = asyncio.Semaphore(MULTI_CONCURRENCY)
+
+        async def run(chunk: List[Tuple[float, float]]) -> List[List[Tuple[str, float, float]]]:
+            params = {
+                "latitude": ",".join(f"{p[0]:.4f}" for p in chunk),
+                "longitude": ",".join(f"{p[1]:.4f}" for p in chunk),
+                "daily": "temperature_2m_max,temperature_2m_min",
+                "past_days": past_days,
+                "forecast_days": forecast_days,
+                "timezone": "UTC",
             }
+            async with gate:
+                try:
+                    resp = await self.client.get("https://api.open-meteo.com/v1/forecast", params=params)
+                    resp.raise_for_status()
+                    data = resp.json()
+                except Exception:
+                    return [[] for _ in chunk]
+            payloads = data if isinstance(data, list) else [data]
+            if len(payloads) != len(chunk):
+                return [[] for _ in chunk]
+            return [_daily_rows(p.get("daily", {}) or {}) for p in payloads]
 
-        h = data.get("hourly", {})
-        times = h.get("time", [])
-        result: List[Dict[str, Any]] = []
-        for i, ts in enumerate(times[:hours]):
-            result.append(
-                {
-                    "ts": ts,
-                    "t_air_f": _get_idx(h.get("temperature_2m"), i),
-                    "wind_mph": _get_idx(h.get("wind_speed_10m"), i),
-                    "wind_gust_mph": _get_idx(h.get("wind_gusts_10m"), i),
-                    "precip_prob": _norm_prob(_get_idx(h.get("precipitation_probability"), i)),
-                    "precip_in": _get_idx(h.get("precipitation"), i),
-                    "dewpoint_f": _get_idx(h.get("dew_point_2m"), i),
-                    "soil_temp_f": _get_idx(h.get("soil_temperature_0cm"), i),
-                    "et0_in": _mm_to_in(_get_idx(h.get("et0_fao_evapotranspiration"), i)),
-                    "provider": "OpenMeteo",
-                }
-            )
-
-        self.cache[key] = result
-        return result
+        out: List[List[Tuple[str, float, float]]] = []
+        for rows in await asyncio.gather(*(run(c) for c in chunks)):
+            out.extend(rows)
+        return out
 
     async def health_check(self) -> bool:  # pragma: no cover
         return True
 
 
-def _get_idx(arr, i):
-    try:
-        return None if arr is None else (arr[i] if i < len(arr) else None)
-    except Exception:
-        return None
+def _frame_from_hourly(h: Dict[str, Any]) -> HourlyForecast:
+    frame = HourlyForecast.from_columns(
+        h.get("time", [])[:SERIES_HOURS],
+        {
+            "t_air_f": h.get("temperature_2m"),
+            "wind_mph": h.get("wind_speed_10m"),
+            "wind_gust_mph": h.get("wind_gusts_10m"),
+            "precip_prob": h.get("precipitation_probability"),
+            "precip_in": h.get("precipitation"),
+            "dewpoint_f": h.get("dew_point_2m"),
+            "soil_temp_f": h.get("soil_temperature_0cm"),
+            "et0_in": h.get("et0_fao_evapotranspiration"),
+        },
+        "OpenMeteo",
+    )
+    for name in FIELDS:
+        frame.columns.setdefault(name, np.full(len(frame), np.nan))
+    prob = frame.columns["precip_prob"]
+    frame.columns["precip_prob"] = np.where(prob > 1, prob / 100.0, prob)
+    frame.columns["et0_in"] = frame.columns["et0_in"] / 25.4
+    return frame
 
 
-def _norm_prob(v):
-    if v is None:
-        return None
-    try:
-        return float(v) / 100.0 if v > 1 else float(v)
-    except Exception:
-        return None
+def _daily_rows(d: Dict[str, Any]) -> List[Tuple[str, float, float]]:
+    out = []
+    for day, hi, lo in zip(d.get("time", []), d.get("temperature_2m_max", []), d.get("temperature_2m_min", [])):
+        if hi is not None and lo is not None:
+            out.append((str(day), float(hi), float(lo)))
+    return out
+
+
+def _synthetic_payload(bucket: datetime) -> Dict[str, Any]:
+    hours = SERIES_HOURS
+    return {
+        "hourly": {
+            "time": [
+                (bucket + timedelta(hours=i)).isoformat() + "Z" for i in range(hours)
+            ],
+            "wind_speed_10m": [0.0] * hours,
+            "wind_gusts_10m": [None] * hours,
+            "precipitation_probability": [0] * hours,
+            "precipitation": [0.0] * hours,
+            "soil_temperature_0cm": [16.0] * hours,
+            "et0_fao_evapotranspiration": [0.0] * hours,
+        }
+    }
 
 
 def _c_to_f(c):
@@ -100,11 +353,3 @@ def _c_to_f(c):
     except Exception:
         return None
 
-
-def _mm_to_in(mm):
-    if mm is None:
-        return None
-    try:
-        return float(mm) / 25.4
-    except Exception:
-        return None
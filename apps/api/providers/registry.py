@@ -0,0 +1,121 @@
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from ..db import db_configured
+from ..services.forecast_store import forecast_store_from_env
+from ..services.nws_gridpoints import SqlGridpointStore
+from ..services.spray_tiles import SqlTileStore, TileCache
+from ..services.station_index import RELOAD_SECONDS, StationDirectory
+from .nws import GridpointCache, NWSProvider
+from .nws_alerts import DEFAULT_STATES, POLL_SECONDS, AlertPoller
+from .openmeteo import OpenMeteoProvider
+
+log = logging.getLogger(__name__)
+
+
+class ProviderRegistry:
+    """Process-wide weather providers sharing one pooled HTTP client.
+
+    Created once in the app lifespan so provider caches survive across requests.
+    The NWS provider is built lazily because it requires NWS_USER_AGENT.
+    """
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None) -> None:
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(timeout=20)
+        ttl = int(os.getenv("FORECAST_FRESH_TTL_S", "3600"))
+        max_stale = int(os.getenv("FORECAST_MAX_STALE_S", str(3 * 3600)))
+        # In-process cache in front, shared Postgres/Redis tier behind it
+        self.forecast_store = forecast_store_from_env(retention_s=ttl + max_stale)
+        self.openmeteo = OpenMeteoProvider(
+            client=self.client,
+            ttl_seconds=ttl,
+            max_stale_seconds=max_stale,
+            store=self.forecast_store,
+        )
+        self.tiles = TileCache(store=SqlTileStore() if db_configured() else None)
+        self.stations = StationDirectory(interval=float(os.getenv("STATION_INDEX_RELOAD_S", str(RELOAD_SECONDS))))
+        self._nws: Optional[NWSProvider] = None
+        self.alert_poller: Optional[AlertPoller] = None
+        self.alerts_local = 0
+        self.alerts_remote = 0
+
+    def nws(self) -> NWSProvider:
+        # Raises MissingNWSUserAgent until the env var is configured
+        if self._nws is None:
+            store = SqlGridpointStore() if db_configured() else None
+            self._nws = NWSProvider(client=self.client, gridpoints=GridpointCache(store=store))
+        return self._nws
+
+    def start(self) -> None:
+        """Start background work; the alert poller runs only when NWS is configured."""
+        self.stations.start()
+        if self.alert_poller is None and os.getenv("NWS_USER_AGENT"):
+            states = os.getenv("NWS_ALERT_STATES", ",".join(DEFAULT_STATES)).split(",")
+            interval = float(os.getenv("NWS_ALERT_POLL_S", str(POLL_SECONDS)))
+            self.alert_poller = AlertPoller(self.nws(), states=states, interval=interval)
+            self.alert_poller.start()
+
+    async def alerts(self, lat: float, lon: float) -> List[Dict[str, Any]]:
+        """Active alerts at a point, answered from the regional index when it covers the point."""
+        nws = self.nws()
+        index = self.alert_poller.current() if self.alert_poller is not None else None
+        if index is None:
+            self.alerts_remote += 1
+            return await nws.get_alerts(lat, lon)
+        try:
+            rec = await nws.resolve_point(lat, lon)
+        except Exception as e:
+            log.warning(json.dumps({"event": "nws_point_error", "lat": lat, "lon": lon, "error": str(e)}))
+            rec = {}
+        # Only points known to sit in an indexed state are answered locally
+        state = (rec.get("state") or "").upper()
+        if state not in index.states:
+            self.alerts_remote += 1
+            return await nws.get_alerts(lat, lon)
+        self.alerts_local += 1
+        return index.query(lat, lon, zones=(rec.get("forecast_zone"), rec.get("county")))
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {
+            "openmeteo": {
+                "cache_entries": len(self.openmeteo.cache),
+                "stale_served": self.openmeteo.stale_served,
+                "failing_cells": len(self.openmeteo.failures),
+                "shared_backend": self.forecast_store.name if self.forecast_store else None,
+                "shared_hits": self.openmeteo.shared_hits,
+                "singleflight": self.openmeteo.flight.stats(),
+            },
+            "spray_tiles": {"regions": sorted(self.tiles.tiles), "hits": self.tiles.hits},
+            "stations": self.stations.stats(),
+        }
+        if self._nws is not None:
+            out["nws"] = {
+                "gridpoints": len(self._nws.gridpoints.lru),
+                "http_cache": self._nws.http_cache.stats(),
+                "singleflight": self._nws.flight.stats(),
+                "alerts": {
+                    "local": self.alerts_local,
+                    "remote": self.alerts_remote,
+                    "index": self.alert_poller.stats() if self.alert_poller is not None else None,
+                },
+            }
+        return out
+
+    async def aclose(self) -> None:
+        await self.openmeteo.aclose()
+        await self.stations.aclose()
+        if self.forecast_store is not None:
+            await self.forecast_store.aclose()
+        if self.alert_poller is not None:
+            await self.alert_poller.aclose()
+            self.alert_poller = None
+        if self._nws is not None:
+            await self._nws.aclose()
+            self._nws = None
+        if self._owns_client:
+            await self.client.aclose()
@@ -0,0 +1,37 @@
+import asyncio
+import json
+import logging
+import os
+from typing import Awaitable, Tuple, TypeVar
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Per-source latency budgets (seconds) for weather handlers; override via env
+_DEFAULT_TIMEOUTS = {"station": 1.5, "openmeteo": 8.0, "nws": 5.0, "alerts": 4.0, "soil": 1.5}
+
+
+def source_timeout(source: str) -> float:
+    raw = os.getenv(f"{source.upper()}_TIMEOUT_S")
+    try:
+        return float(raw) if raw else _DEFAULT_TIMEOUTS[source]
+    except ValueError:
+        return _DEFAULT_TIMEOUTS[source]
+
+
+async def within(source: str, aw: Awaitable[T], fallback: T) -> Tuple[T, str]:
+    """Await one upstream source under its own budget.
+
+    Returns ``(value, status)`` with status ``ok``, ``timeout`` or ``error``; on
+    anything but ``ok`` the fallback is returned so callers degrade instead of failing.
+    """
+    try:
+        return await asyncio.wait_for(aw, source_timeout(source)), "ok"
+    except asyncio.TimeoutError:
+        log.warning(json.dumps({"event": "source_timeout", "source": source}))
+        return fallback, "timeout"
+    except Exception as e:
+        log.warning(json.dumps({"event": "source_error", "source": source, "error": str(e)}))
+        return fallback, "error"
+
@@ -0,0 +1,156 @@
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Engine
+
+from ..db import SqlStore, db_configured
+from ..providers.forecast import HourlyForecast
+
+log = logging.getLogger(__name__)
+
+# Rows older than the retention window are deleted once every this many saves
+PRUNE_EVERY = 200
+
+Stored = Dict[str, Tuple[HourlyForecast, float]]
+
+
+def split_key(key: str) -> Tuple[str, str]:
+    """Series key "cell:run_hour" -> (cell, run_hour)."""
+    cell, _, run_hour = key.partition(":")
+    return cell, run_hour
+
+
+class SqlForecastStore(SqlStore):
+    """Forecast series shared by every worker, keyed by grid cell and model run hour.
+
+    Values come back with their age in seconds so the in-process cache can apply its
+    own freshness rules.
+    """
+
+    name = "postgres"
+
+    def __init__(self, bind: Optional[Engine] = None, retention_s: float = 4 * 3600) -> None:
+        super().__init__(bind)
+        self.retention_s = retention_s
+        self._saves = 0
+
+    def _load(self, keys: List[str]) -> Stored:
+        by_run: Dict[str, List[str]] = {}
+        for key in keys:
+            cell, run_hour = split_key(key)
+            by_run.setdefault(run_hour, []).append(cell)
+        stmt = text(
+            "SELECT cell, run_hour, payload, fetched_at FROM forecast_series "
+            "WHERE run_hour = :run_hour AND cell IN :cells"
+        ).bindparams(bindparam("cells", expanding=True))
+        now = time.time()
+        out: Stored = {}
+        with self._engine().connect() as conn:
+            for run_hour, cells in by_run.items():
+                for row in conn.execute(stmt, {"run_hour": run_hour, "cells": cells}).mappings():
+                    frame = HourlyForecast.from_payload(json.loads(row["payload"]))
+                    out[f"{row['cell']}:{row['run_hour']}"] = (frame, now - float(row["fetched_at"]))
+        return out
+
+    def _save(self, items: Dict[str, HourlyForecast]) -> None:
+        now = time.time()
+        params = []
+        for key, frame in items.items():
+            cell, run_hour = split_key(key)
+            params.append({"cell": cell, "run_hour": run_hour, "payload": json.dumps(frame.to_payload()), "fetched_at": now})
+        with self._engine().begin() as conn:
+            conn.execute(
+                text(
+                    "INSERT INTO forecast_series (cell, run_hour, payload, fetched_at) "
+                    "VALUES (:cell, :run_hour, :payload, :fetched_at) "
+                    "ON CONFLICT (cell, run_hour) DO UPDATE SET payload = excluded.payload, fetched_at = excluded.fetched_at"
+                ),
+                params,
+            )
+            self._saves += 1
+            if self._saves % PRUNE_EVERY == 0:
+                conn.execute(text("DELETE FROM forecast_series WHERE fetched_at < :cutoff"), {"cutoff": now - self.retention_s})
+
+    async def load_many(self, keys: Iterable[str]) -> Stored:
+        keys = list(keys)
+        if not keys:
+            return {}
+        return await self._in_thread_or({}, "forecast_store_load_error", self._load, keys, backend=self.name)
+
+    async def save_many(self, items: Dict[str, HourlyForecast]) -> None:
+        if not items:
+            return
+        await self._in_thread_or(None, "forecast_store_save_error", self._save, items, backend=self.name)
+
+    async def aclose(self) -> None:
+        return None
+
+
+class RedisForecastStore:
+    """Same contract as ``SqlForecastStore`` over any Redis-protocol server.
+
+    Entries expire on their own after the retention window. Requires the optional
+    ``redis`` package; it is imported lazily so deployments without it are unaffected.
+    """
+
+    name = "redis"
+    prefix = "bb:forecast:"
+
+    def __init__(self, url: str, retention_s: float = 4 * 3600, client: Any = None) -> None:
+        if client is None:
+            from redis import asyncio as redis_asyncio  # optional dependency
+
+            client = redis_asyncio.from_url(url)
+        self.client = client
+        self.retention_s = retention_s
+
+    async def load_many(self, keys: Iterable[str]) -> Stored:
+        keys = list(keys)
+        if not keys:
+            return {}
+        try:
+            values = await self.client.mget([self.prefix + k for k in keys])
+        except Exception as e:
+            log.warning(json.dumps({"event": "forecast_store_load_error", "backend": self.name, "error": str(e)}))
+            return {}
+        now = time.time()
+        out: Stored = {}
+        for key, raw in zip(keys, values):
+            if raw is None:
+                continue
+            rec = json.loads(raw)
+            out[key] = (HourlyForecast.from_payload(rec["frame"]), now - float(rec["fetched_at"]))
+        return out
+
+    async def save_many(self, items: Dict[str, HourlyForecast]) -> None:
+        if not items:
+            return
+        now = time.time()
+        try:
+            pipe = self.client.pipeline()
+            for key, frame in items.items():
+                rec = json.dumps({"fetched_at": now, "frame": frame.to_payload()})
+                pipe.set(self.prefix + key, rec, ex=int(self.retention_s))
+            await pipe.execute()
+        except Exception as e:
+            log.warning(json.dumps({"event": "forecast_store_save_error", "backend": self.name, "error": str(e)}))
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+def forecast_store_from_env(retention_s: float) -> Optional[Any]:
+    """FORECAST_CACHE_BACKEND=postgres|redis|none; defaults to postgres when a database is configured."""
+    backend = os.getenv("FORECAST_CACHE_BACKEND", "postgres" if db_configured() else "none").lower()
+    if backend == "postgres" and db_configured():
+        return SqlForecastStore(retention_s=retention_s)
+    if backend == "redis":
+        try:
+            return RedisForecastStore(os.getenv("REDIS_URL", "redis://localhost:6379/0"), retention_s=retention_s)
+        except ImportError:
+            log.warning(json.dumps({"event": "forecast_store_unavailable", "backend": backend, "error": "redis package not installed"}))
+    return None
@@ -0,0 +1,137 @@
+import json
+import logging
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import text
+
+from ..db import SqlStore
+
+log = logging.getLogger(__name__)
+
+# Base temperatures (°C) for the two turf GDD models
+BASES = {"gdd0": 0.0, "gdd10": 10.0}
+# Recent days are re-ingested on every refresh because forecasts become observations
+REVISE_DAYS = 2
+# Open-Meteo's forecast endpoint serves roughly three months of history
+MAX_BACKFILL_DAYS = 92
+
+Day = Tuple[str, float, float]  # (ISO date, tmax °C, tmin °C)
+
+
+def daily_gdd(tmax: np.ndarray, tmin: np.ndarray, base: float) -> np.ndarray:
+    return np.maximum((tmax + tmin) / 2.0 - base, 0.0)
+
+
+class SqlGddStore(SqlStore):
+    """Per-property daily GDD with running totals in ``gdd_daily``.
+
+    Each row stores the cumulative sum through that day, so "GDD since D" is the
+    latest total minus the total on the day before D: two indexed row lookups.
+    Ingesting days only recomputes totals from the earliest changed day onward.
+    """
+
+    def _ingest(self, property_id: int, days: Sequence[Day]) -> int:
+        if not days:
+            return 0
+        first = min(d[0] for d in days)
+        with self._engine().begin() as conn:
+            prev = conn.execute(
+                text(
+                    "SELECT cum_gdd0, cum_gdd10 FROM gdd_daily WHERE property_id = :p AND date < :d "
+                    "ORDER BY date DESC LIMIT 1"
+                ),
+                {"p": property_id, "d": first},
+            ).first()
+            tail = conn.execute(
+                text("SELECT date, tmax_c, tmin_c FROM gdd_daily WHERE property_id = :p AND date >= :d"),
+                {"p": property_id, "d": first},
+            ).all()
+            merged: Dict[str, Tuple[float, float]] = {str(r[0]): (r[1], r[2]) for r in tail}
+            merged.update({d: (hi, lo) for d, hi, lo in days})
+            dates = sorted(merged)
+            tmax = np.array([merged[d][0] for d in dates], dtype=np.float64)
+            tmin = np.array([merged[d][1] for d in dates], dtype=np.float64)
+            rows: List[Dict[str, Any]] = [{"p": property_id, "d": d, "hi": float(tmax[i]), "lo": float(tmin[i])} for i, d in enumerate(dates)]
+            for j, (model, base) in enumerate(BASES.items()):
+                g = daily_gdd(tmax, tmin, base)
+                cum = np.cumsum(g) + (float(prev[j]) if prev is not None else 0.0)
+                for i, row in enumerate(rows):
+                    row[model] = float(g[i])
+                    row[f"cum_{model}"] = float(cum[i])
+            conn.execute(
+                text(
+                    "INSERT INTO gdd_daily (property_id, date, tmax_c, tmin_c, gdd0, gdd10, cum_gdd0, cum_gdd10) "
+                    "VALUES (:p, :d, :hi, :lo, :gdd0, :gdd10, :cum_gdd0, :cum_gdd10) "
+                    "ON CONFLICT (property_id, date) DO UPDATE SET tmax_c = excluded.tmax_c, tmin_c = excluded.tmin_c, "
+                    "gdd0 = excluded.gdd0, gdd10 = excluded.gdd10, cum_gdd0 = excluded.cum_gdd0, cum_gdd10 = excluded.cum_gdd10"
+                ),
+                rows,
+            )
+        return len(rows)
+
+    def _span(self, property_id: int) -> Tuple[Optional[str], Optional[str]]:
+        with self._engine().connect() as conn:
+            first, last = conn.execute(
+                text("SELECT MIN(date), MAX(date) FROM gdd_daily WHERE property_id = :p"),
+                {"p": property_id},
+            ).one()
+        return (str(first) if first else None, str(last) if last else None)
+
+    def _since(self, property_id: int, since: str, model: str) -> Dict[str, Any]:
+        col = f"cum_{model}"
+        with self._engine().connect() as conn:
+            latest = conn.execute(
+                text(f"SELECT date, {col} FROM gdd_daily WHERE property_id = :p ORDER BY date DESC LIMIT 1"),
+                {"p": property_id},
+            ).first()
+            before = conn.execute(
+                text(f"SELECT {col} FROM gdd_daily WHERE property_id = :p AND date < :d ORDER BY date DESC LIMIT 1"),
+                {"p": property_id, "d": since},
+            ).first()
+            first = conn.execute(
+                text("SELECT date FROM gdd_daily WHERE property_id = :p ORDER BY date LIMIT 1"),
+                {"p": property_id},
+            ).first()
+        if latest is None or str(latest[0]) < since:
+            return {"gdd": 0.0, "through": str(latest[0]) if latest else None, "history_truncated": False}
+        return {
+            "gdd": float(latest[1]) - (float(before[0]) if before else 0.0),
+            "through": str(latest[0]),
+            # Stored days start after the application, so the total undercounts
+            "history_truncated": str(first[0]) > since,
+        }
+
+    async def ingest(self, property_id: int, days: Sequence[Day]) -> int:
+        return await self._in_thread(self._ingest, property_id, list(days))
+
+    async def span(self, property_id: int) -> Tuple[Optional[str], Optional[str]]:
+        """First and last stored dates (None, None when nothing is stored)."""
+        return await self._in_thread(self._span, property_id)
+
+    async def since(self, property_id: int, since: str, model: str) -> Dict[str, Any]:
+        if model not in BASES:
+            raise ValueError(f"unknown GDD model {model}")
+        return await self._in_thread(self._since, property_id, since, model)
+
+
+async def refresh_property(store: SqlGddStore, provider: Any, property_id: int, lat: float, lon: float, since: date, today: date) -> int:
+    """Fetch only the days not yet stored and ingest them.
+
+    Stored history is extended back to ``since`` (at most ``MAX_BACKFILL_DAYS``) and
+    forward through ``today`` with a short revision window. A property that already
+    covers both ends is left alone, so repeat reads make no upstream call.
+    """
+    first, last = await store.span(property_id)
+    need_from = max(since, today - timedelta(days=MAX_BACKFILL_DAYS))
+    backfill = first is None or need_from.isoformat() < first
+    if not backfill and last is not None and last >= today.isoformat():
+        return 0
+    start = need_from if backfill else min(date.fromisoformat(last) - timedelta(days=REVISE_DAYS), today)
+    try:
+        days = await provider.get_daily_temps(lat, lon, start, today)
+    except Exception as e:
+        log.warning(json.dumps({"event": "gdd_fetch_error", "property_id": property_id, "error": str(e)}))
+        return 0
+    return await store.ingest(property_id, days)
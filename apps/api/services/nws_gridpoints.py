@@ -0,0 +1,51 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+
+from ..db import SqlStore
+
+_COLUMNS = (
+    "grid_id", "grid_x", "grid_y", "forecast_hourly_url", "forecast_grid_data_url",
+    "forecast_zone", "county", "state",
+)
+
+
+class SqlGridpointStore(SqlStore):
+    """Persistent point -> NWS gridpoint mapping shared by every worker."""
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._engine().connect() as conn:
+            row = conn.execute(
+                text(f"SELECT {', '.join(_COLUMNS)} FROM nws_gridpoints WHERE point_key = :k"),
+                {"k": key},
+            ).mappings().first()
+        return dict(row) if row else None
+
+    def _save(self, key: str, rec: Dict[str, Any]) -> None:
+        cols = ", ".join(_COLUMNS)
+        vals = ", ".join(f":{c}" for c in _COLUMNS)
+        updates = ", ".join(f"{c} = excluded.{c}" for c in _COLUMNS + ("resolved_at",))
+        params = {c: rec.get(c) for c in _COLUMNS}
+        params.update({"point_key": key, "resolved_at": datetime.utcnow().isoformat() + "Z"})
+        with self._engine().begin() as conn:
+            conn.execute(
+                text(
+                    f"INSERT INTO nws_gridpoints (point_key, {cols}, resolved_at) VALUES (:point_key, {vals}, :resolved_at) "
+                    f"ON CONFLICT (point_key) DO UPDATE SET {updates}"
+                ),
+                params,
+            )
+
+    def _delete(self, key: str) -> None:
+        with self._engine().begin() as conn:
+            conn.execute(text("DELETE FROM nws_gridpoints WHERE point_key = :k"), {"k": key})
+
+    async def load(self, key: str) -> Optional[Dict[str, Any]]:
+        return await self._in_thread_or(None, "gridpoint_load_error", self._load, key)
+
+    async def save(self, key: str, rec: Dict[str, Any]) -> None:
+        await self._in_thread_or(None, "gridpoint_save_error", self._save, key, rec)
+
+    async def delete(self, key: str) -> None:
+        await self._in_thread_or(None, "gridpoint_delete_error", self._delete, key)
@@ -1,4 +1,7 @@
-from typing import Dict, Tuple, Optional
+import math
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
 
 
 def ok_to_spray_hour(
@@ -13,3 +16,93 @@ def ok_to_spray_hour(
     status = "OK" if score == 3 else ("CAUTION" if score == 2 else "NOT_OK")
     return status, rules
 
+
+# Declarative defaults; each rule passes when all of its conditions hold. Bounds are
+# inclusive ``min``/``max`` or exclusive ``below``; ``missing`` substitutes for NaN
+# (omit it to let a missing value pass). ``hours`` > 1 makes the rule look ahead.
+DEFAULT_RULES: Tuple[Dict[str, Any], ...] = (
+    {"name": "wind", "when": [{"field": "wind_mph", "min": 3, "max": 10, "missing": 0.0}]},
+    {"name": "gust", "when": [{"field": "wind_gust_mph", "below": 15}]},
+    {
+        "name": "rain",
+        "when": [
+            {"field": "precip_prob", "below": 0.20, "missing": 0.0},
+            {"field": "precip_in", "max": 0.0, "missing": 0.0},
+        ],
+        "hours": 1,
+    },
+)
+
+
+class RuleSet:
+    """Compiled spray rules evaluated over whole forecast arrays.
+
+    Inputs are float arrays shaped ``(..., hours)``, so one call can score many
+    locations at once. A rule with ``hours`` = n passes at hour i only if its
+    conditions hold for hours i..i+n-1; hours past the end of the forecast are
+    unknown, so the rule fails where its window runs off the end. Status is OK when every rule passes, CAUTION when exactly one fails.
+    """
+
+    def __init__(self, rules: Sequence[Dict[str, Any]] = DEFAULT_RULES, name: Optional[str] = None) -> None:
+        self.rules = [dict(r) for r in rules]
+        self.name = name
+
+    @property
+    def lookahead(self) -> int:
+        return max(int(r.get("hours", 1)) for r in self.rules) - 1
+
+    def _condition(self, cond: Dict[str, Any], columns: Mapping[str, np.ndarray], shape: Tuple[int, ...]) -> np.ndarray:
+        col = columns.get(cond["field"])
+        v = np.full(shape, np.nan) if col is None else np.asarray(col, dtype=np.float64)
+        missing = np.isnan(v)
+        if cond.get("missing") is not None:
+            v = np.where(missing, cond["missing"], v)
+            missing = np.zeros(shape, dtype=bool)
+        ok = np.ones(shape, dtype=bool)
+        with np.errstate(invalid="ignore"):
+            if cond.get("min") is not None:
+                ok &= v >= cond["min"]
+            if cond.get("max") is not None:
+                ok &= v <= cond["max"]
+            if cond.get("below") is not None:
+                ok &= v < cond["below"]
+        return ok | missing
+
+    def evaluate(self, columns: Mapping[str, np.ndarray]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        shape = next(np.shape(c) for c in columns.values() if c is not None)
+        results: Dict[str, np.ndarray] = {}
+        for rule in self.rules:
+            ok = np.ones(shape, dtype=bool)
+            for cond in rule["when"]:
+                ok &= self._condition(cond, columns, shape)
+            hours = int(rule.get("hours", 1))
+            if hours > 1:
+                ok = _holds_for(ok, hours)
+            results[rule["name"]] = ok
+        failed = sum((~ok).astype(np.int16) for ok in results.values())
+        status = np.where(failed == 0, "OK", np.where(failed == 1, "CAUTION", "NOT_OK"))
+        return status, results
+
+
+def _holds_for(ok: np.ndarray, hours: int) -> np.ndarray:
+    # Rolling "all" over the next ``hours`` entries via a prefix sum of failures;
+    # windows that run past the last entry cannot be confirmed and fail
+    n = ok.shape[-1]
+    fails = np.cumsum(~ok, axis=-1)
+    fails = np.concatenate([np.zeros(ok.shape[:-1] + (1,), dtype=fails.dtype), fails], axis=-1)
+    end = np.arange(n) + hours
+    held = (fails[..., np.minimum(end, n)] - fails[..., :n]) == 0
+    return held & (end <= n)
+
+
+DEFAULT_RULESET = RuleSet()
+
+
+def ruleset_for_recipe(recipe: Mapping[str, Any]) -> RuleSet:
+    """Default rules with the rain rule stretched over the product's rainfast period."""
+    rainfast = float(((recipe.get("rates") or {}).get("rainfast_hours")) or 0.0)
+    rules = [dict(r) for r in DEFAULT_RULES]
+    for r in rules:
+        if r["name"] == "rain":
+            r["hours"] = max(1, math.ceil(rainfast))
+    return RuleSet(rules, name=recipe.get("name"))
@@ -0,0 +1,227 @@
+"""Nightly projection of every property's next PGR application date.
+
+  DATABASE_URL=... python -m apps.api.services.pgr_due [--workers N]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from ..db import engine
+from ..providers.openmeteo import OpenMeteoProvider, snap_to_grid
+from .gdd import BASES, MAX_BACKFILL_DAYS, daily_gdd
+from .labels import load_label_recipes
+
+log = logging.getLogger(__name__)
+
+FORECAST_DAYS = 16
+# Cells handed to each worker task; each task issues multi-location requests for its cells
+CELLS_PER_TASK = 500
+WRITE_BATCH = 5000
+DEFAULT_TARGET_GDD = 200.0
+
+Cell = Tuple[float, float]
+# (property_id, model, last applied, anchor, gdd through anchor, stored due date).
+# ``anchor`` is the last day already accounted for: the last gdd_daily row when the
+# stored running totals cover the application, otherwise the day before it.
+Member = Tuple[int, str, str, str, float, Optional[str]]
+
+
+def targets_from_recipes(data_dir: str) -> Dict[str, float]:
+    """GDD target per model, taken from the PGR recipes (first recipe per model wins)."""
+    out: Dict[str, float] = {}
+    for r in sorted(load_label_recipes(data_dir), key=lambda r: r.get("__file", "")):
+        rates = r.get("rates") or {}
+        if r.get("type") == "pgr" and rates.get("model") in BASES and rates.get("target_gdd"):
+            out.setdefault(rates["model"], float(rates["target_gdd"]))
+    for model in BASES:
+        out.setdefault(model, DEFAULT_TARGET_GDD)
+    return out
+
+
+def _day_before(iso: str) -> str:
+    return (date.fromisoformat(iso) - timedelta(days=1)).isoformat()
+
+
+def load_cells(bind: Engine, targets: Dict[str, float]) -> Dict[Cell, List[Member]]:
+    """Properties with a recorded PGR application, grouped by forecast grid cell.
+
+    Each member carries what ``gdd_daily`` already knows (a few primary-key probes
+    per property), so only days past the stored running totals come from upstream.
+    """
+    cells: Dict[Cell, List[Member]] = {}
+    with bind.connect() as conn:
+        for model in BASES:
+            rows = conn.execute(
+                text(
+                    f"SELECT p.id, p.lat, p.lon, p.pgr_last_{model}, "
+                    "(SELECT MIN(g.date) FROM gdd_daily g WHERE g.property_id = p.id), "
+                    f"l.date, l.cum_{model}, b.cum_{model}, "
+                    "(SELECT MIN(g.date) FROM gdd_daily g WHERE g.property_id = p.id "
+                    f"AND g.date >= p.pgr_last_{model} AND g.cum_{model} >= COALESCE(b.cum_{model}, 0) + :target) "
+                    "FROM properties p "
+                    "LEFT JOIN gdd_daily l ON l.property_id = p.id AND l.date = "
+                    "(SELECT MAX(date) FROM gdd_daily WHERE property_id = p.id) "
+                    "LEFT JOIN gdd_daily b ON b.property_id = p.id AND b.date = "
+                    f"(SELECT MAX(date) FROM gdd_daily WHERE property_id = p.id AND date < p.pgr_last_{model}) "
+                    f"WHERE p.lat IS NOT NULL AND p.lon IS NOT NULL AND p.pgr_last_{model} IS NOT NULL"
+                ),
+                {"target": targets[model]},
+            )
+            for pid, lat, lon, last, first, through, cum_through, cum_before, due in rows:
+                applied = str(last)[:10]
+                members = cells.setdefault(snap_to_grid(lat, lon), [])
+                if first is not None and str(first)[:10] <= applied <= str(through)[:10]:
+                    acc = float(cum_through) - float(cum_before or 0.0)
+                    members.append((pid, model, applied, str(through)[:10], acc, str(due)[:10] if due else None))
+                else:
+                    members.append((pid, model, applied, _day_before(applied), 0.0, None))
+    return cells
+
+
+def past_days_needed(cells: Dict[Cell, List[Member]], today: date) -> int:
+    """Days of history the upstream series must cover for every member's anchor."""
+    oldest = min((m[3] for members in cells.values() for m in members), default=today.isoformat())
+    return max(0, min((today - date.fromisoformat(oldest)).days - 1, MAX_BACKFILL_DAYS))
+
+
+def project_cell(
+    days: Sequence[Tuple[str, float, float]], members: Sequence[Member], targets: Dict[str, float], today: date
+) -> List[Dict[str, Any]]:
+    """Due dates for every member of one cell from one shared daily series.
+
+    Each member continues from its anchor total; the series only supplies later days.
+    """
+    if not days:
+        return []
+    dates = np.array([d[0] for d in days], dtype="datetime64[D]")
+    tmax = np.array([d[1] for d in days])
+    tmin = np.array([d[2] for d in days])
+    t = int(np.searchsorted(dates, np.datetime64(today), side="right"))
+    out: List[Dict[str, Any]] = []
+    for model, base in BASES.items():
+        group = [m for m in members if m[1] == model]
+        if not group:
+            continue
+        cum = np.cumsum(daily_gdd(tmax, tmin, base))
+        anchor = np.array([m[3] for m in group], dtype="datetime64[D]")
+        acc = np.array([m[4] for m in group])
+        # Series total through each anchor (0 when the anchor predates the series)
+        k = np.searchsorted(dates, anchor, side="right")
+        prior = np.where(k > 0, cum[np.maximum(k - 1, 0)], 0.0)
+        to_date = acc + np.maximum((cum[t - 1] if t > 0 else 0.0) - prior, 0.0)
+        due = np.searchsorted(cum, prior + targets[model] - acc)
+        for i, (pid, _, applied, _, _, stored_due) in enumerate(group):
+            if acc[i] >= targets[model]:
+                due_date = stored_due
+            else:
+                # None when the target lies beyond the forecast horizon
+                due_date = str(dates[due[i]]) if due[i] < len(dates) else None
+            out.append({
+                "property_id": pid,
+                "model": model,
+                "last_applied": applied,
+                "gdd_to_date": round(float(to_date[i]), 1),
+                "target_gdd": targets[model],
+                "due_date": due_date,
+                # Days between the anchor and the series start are missing
+                "history_truncated": bool(anchor[i] + 1 < dates[0]),
+            })
+    return out
+
+
+async def _project_cells(
+    provider: OpenMeteoProvider, cells: Dict[Cell, List[Member]], targets: Dict[str, float], today: date
+) -> List[Dict[str, Any]]:
+    keys = list(cells)
+    series = await provider.get_daily_temps_many(
+        keys, past_days=past_days_needed(cells, today), forecast_days=FORECAST_DAYS
+    )
+    rows: List[Dict[str, Any]] = []
+    for cell, days in zip(keys, series):
+        rows.extend(project_cell(days, cells[cell], targets, today))
+    return rows
+
+
+def _worker(cells: Dict[Cell, List[Member]], targets: Dict[str, float], today_iso: str) -> List[Dict[str, Any]]:
+    # Runs in a child process: its own event loop and HTTP client
+    async def run() -> List[Dict[str, Any]]:
+        provider = OpenMeteoProvider()
+        try:
+            return await _project_cells(provider, cells, targets, date.fromisoformat(today_iso))
+        finally:
+            await provider.client.aclose()
+
+    return asyncio.run(run())
+
+
+def write_due_dates(bind: Engine, rows: Sequence[Dict[str, Any]]) -> None:
+    computed_at = datetime.utcnow().isoformat() + "Z"
+    stmt = text(
+        "INSERT INTO pgr_due_dates (property_id, model, last_applied, gdd_to_date, target_gdd, due_date, "
+        "history_truncated, computed_at) VALUES (:property_id, :model, :last_applied, :gdd_to_date, :target_gdd, "
+        ":due_date, :history_truncated, :computed_at) "
+        "ON CONFLICT (property_id, model) DO UPDATE SET last_applied = excluded.last_applied, "
+        "gdd_to_date = excluded.gdd_to_date, target_gdd = excluded.target_gdd, due_date = excluded.due_date, "
+        "history_truncated = excluded.history_truncated, computed_at = excluded.computed_at"
+    )
+    with bind.begin() as conn:
+        for i in range(0, len(rows), WRITE_BATCH):
+            conn.execute(stmt, [{**r, "computed_at": computed_at} for r in rows[i:i + WRITE_BATCH]])
+
+
+def compute_due_dates(
+    bind: Optional[Engine] = None,
+    workers: Optional[int] = None,
+    today: Optional[date] = None,
+    provider: Optional[OpenMeteoProvider] = None,
+    data_dir: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Project and store due dates for all properties; each grid cell is fetched once.
+
+    ``workers=0`` (or an injected ``provider``) runs everything in this process.
+    """
+    bind = bind or engine()
+    today = today or datetime.utcnow().date()
+    targets = targets_from_recipes(data_dir or os.path.join(os.getcwd(), "data", "label_recipes"))
+    t0 = time.perf_counter()
+    cells = load_cells(bind, targets)
+
+    if provider is not None or workers == 0:
+        async def local() -> List[Dict[str, Any]]:
+            p = provider or OpenMeteoProvider()
+            return await _project_cells(p, cells, targets, today)
+
+        rows = asyncio.run(local())
+    else:
+        keys = list(cells)
+        chunks = [{k: cells[k] for k in keys[i:i + CELLS_PER_TASK]} for i in range(0, len(keys), CELLS_PER_TASK)]
+        rows = []
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            for part in pool.map(_worker, chunks, [targets] * len(chunks), [today.isoformat()] * len(chunks)):
+                rows.extend(part)
+
+    write_due_dates(bind, rows)
+    summary = {"cells": len(cells), "rows": len(rows), "seconds": round(time.perf_counter() - t0, 1)}
+    log.info(json.dumps({"event": "pgr_due_dates", **summary}))
+    return summary
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (0 = run in-process)")
+    args = parser.parse_args(argv)
+    print(json.dumps(compute_due_dates(workers=args.workers)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Soil-temperature observations from Mesonet CSV feeds.
+
+Run every few minutes per feed (a URL or a local file):
+
+  DATABASE_URL=... python -m apps.api.services.soil_obs OK_MESONET https://.../latest.csv
+  DATABASE_URL=... python -m apps.api.services.soil_obs TEX_MESONET ./fixtures/texmesonet.csv
+"""
+import argparse
+import csv
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+import httpx
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from ..db import SqlStore
+
+log = logging.getLogger(__name__)
+
+# Column layout per provider (matches stations.provider). ``soil`` maps depth in
+# inches to the CSV column; OK Mesonet reports 5/10 cm under sod in °C.
+FEEDS: Dict[str, Dict[str, Any]] = {
+    "OK_MESONET": {"station": "STID", "time": "TIME", "unit": "C", "soil": {2: "TS05", 4: "TS10"}},
+    "TEX_MESONET": {"station": "Station_ID", "time": "Date_Time", "unit": "F", "soil": {2: "Soil_Temp_2in", 4: "Soil_Temp_4in"}},
+}
+# Mesonet encodes missing/flagged values as -996 .. -999
+MISSING_BELOW = -900.0
+COPY_COLUMNS = "station_id, observed_at, depth_in, soil_temp_f"
+
+Observation = Tuple[int, datetime, int, float]
+
+
+def read_lines(source: str) -> Iterator[str]:
+    """Lines from an http(s) URL (streamed) or a local file path."""
+    if source.startswith(("http://", "https://")):
+        with httpx.stream("GET", source, timeout=30.0) as resp:
+            resp.raise_for_status()
+            yield from resp.iter_lines()
+    else:
+        with open(source, newline="") as f:
+            yield from f
+
+
+def _parse_time(value: str) -> Optional[datetime]:
+    try:
+        ts = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts.astimezone(timezone.utc)
+
+
+def parse_feed(lines: Iterable[str], feed: Dict[str, Any], station_ids: Dict[str, int]) -> Iterator[Observation]:
+    """Stream ``(station_id, observed_at, depth_in, soil_temp_f)`` rows from CSV lines.
+
+    Unknown stations, unparseable times and missing readings are skipped.
+    """
+    for row in csv.DictReader(lines):
+        sid = station_ids.get(str(row.get(feed["station"]) or "").strip().lower())
+        observed_at = _parse_time(str(row.get(feed["time"]) or ""))
+        if sid is None or observed_at is None:
+            continue
+        for depth, column in feed["soil"].items():
+            try:
+                value = float(row.get(column) or "")
+            except ValueError:
+                continue
+            if value <= MISSING_BELOW:
+                continue
+            temp_f = value * 9.0 / 5.0 + 32.0 if feed["unit"] == "C" else value
+            yield sid, observed_at, depth, round(temp_f, 1)
+
+
+def _month_start(ts: datetime) -> datetime:
+    return ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def ensure_partitions(conn: Connection, months: Iterable[datetime]) -> None:
+    """Create monthly partitions (``station_observations_yYYYYmMM``) if missing."""
+    for start in months:
+        start = _month_start(start.astimezone(timezone.utc))
+        end = _month_start(start + timedelta(days=32))
+        conn.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS station_observations_y{start:%Y}m{start:%m} "
+                f"PARTITION OF station_observations FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+        )
+
+
+class SqlObservationStore(SqlStore):
+    """Soil temperature readings per station and depth in ``station_observations``."""
+
+    def station_ids(self, provider: str) -> Dict[str, int]:
+        """Feed station code (stations.metadata_json.site_id, lowercased) -> stations.id."""
+        out: Dict[str, int] = {}
+        with self._engine().connect() as conn:
+            rows = conn.execute(text("SELECT id, metadata_json FROM stations WHERE provider = :p"), {"p": provider})
+            for sid, meta in rows:
+                if isinstance(meta, str):
+                    meta = json.loads(meta)
+                site = (meta or {}).get("site_id")
+                if site:
+                    out[str(site).lower()] = sid
+        return out
+
+    def ingest(self, provider: str, lines: Iterable[str]) -> int:
+        """Load one feed document; rows already stored (feeds overlap) are ignored."""
+        feed = FEEDS[provider]
+        rows = parse_feed(lines, feed, self.station_ids(provider))
+        with self._engine().begin() as conn:
+            if conn.dialect.name == "postgresql":
+                return self._copy(conn, rows)
+            # SQLite (tests/dev): plain executemany
+            batch = [{"s": s, "t": t.isoformat(), "d": d, "v": v} for s, t, d, v in rows]
+            if not batch:
+                return 0
+            result = conn.execute(
+                text(
+                    f"INSERT INTO station_observations ({COPY_COLUMNS}) VALUES (:s, :t, :d, :v) "
+                    "ON CONFLICT DO NOTHING"
+                ),
+                batch,
+            )
+            return result.rowcount
+
+    def _copy(self, conn: Connection, rows: Iterable[Observation]) -> int:
+        # COPY into an unindexed staging table, then move rows into their partitions
+        conn.execute(
+            text(
+                "CREATE TEMP TABLE station_observations_stage "
+                "(LIKE station_observations INCLUDING DEFAULTS) ON COMMIT DROP"
+            )
+        )
+        cur = conn.connection.dbapi_connection.cursor()
+        with cur.copy(f"COPY station_observations_stage ({COPY_COLUMNS}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(row)
+        months = conn.execute(
+            text("SELECT DISTINCT date_trunc('month', observed_at AT TIME ZONE 'UTC') FROM station_observations_stage")
+        ).scalars().all()
+        ensure_partitions(conn, [m.replace(tzinfo=timezone.utc) for m in months])
+        result = conn.execute(
+            text(
+                f"INSERT INTO station_observations ({COPY_COLUMNS}) "
+                f"SELECT {COPY_COLUMNS} FROM station_observations_stage ON CONFLICT DO NOTHING"
+            )
+        )
+        return result.rowcount
+
+    def _latest(self, station_id: int, max_age_h: float) -> Optional[Dict[str, Any]]:
+        since = datetime.now(timezone.utc) - timedelta(hours=max_age_h)
+        with self._engine().connect() as conn:
+            # Served by the (station_id, depth_in, observed_at) primary key; the time bound prunes partitions
+            rows = conn.execute(
+                text(
+                    "SELECT depth_in, observed_at, soil_temp_f FROM station_observations o "
+                    "WHERE station_id = :s AND depth_in IN (2, 4) AND observed_at >= :since "
+                    "AND observed_at = (SELECT MAX(observed_at) FROM station_observations "
+                    "WHERE station_id = o.station_id AND depth_in = o.depth_in AND observed_at >= :since)"
+                ),
+                {"s": station_id, "since": since.isoformat() if conn.dialect.name == "sqlite" else since},
+            ).all()
+        if not rows:
+            return None
+        out: Dict[str, Any] = {"station_id": station_id, "depth_2in_f": None, "depth_4in_f": None, "observed_at": None}
+        for depth, observed_at, temp_f in rows:
+            out[f"depth_{depth}in_f"] = temp_f
+            ts = observed_at if isinstance(observed_at, str) else observed_at.isoformat()
+            out["observed_at"] = max(out["observed_at"] or ts, ts)
+        return out
+
+    async def latest(self, station_id: int, max_age_h: float = 6.0) -> Optional[Dict[str, Any]]:
+        return await self._in_thread_or(
+            None, "soil_obs_read_error", self._latest, station_id, max_age_h, station_id=station_id
+        )
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("provider", choices=sorted(FEEDS))
+    parser.add_argument("source", help="feed URL or local CSV path")
+    args = parser.parse_args(argv)
+    n = SqlObservationStore().ingest(args.provider, read_lines(args.source))
+    log.info(json.dumps({"event": "soil_obs_ingested", "provider": args.provider, "rows": n}))
+    print(json.dumps({"provider": args.provider, "rows": n}))
+
+
+if __name__ == "__main__":
+    main()
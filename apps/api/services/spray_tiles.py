@@ -0,0 +1,304 @@
+"""Precomputed ok-to-spray tiles for configured service regions.
+
+Run hourly (e.g. a Render cron job):
+
+  DATABASE_URL=... python -m apps.api.services.spray_tiles
+"""
+import asyncio
+import io
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import text
+
+from ..db import SqlStore, db_configured
+from ..providers.forecast import HourlyForecast
+from ..providers.openmeteo import DEFAULT_GRID_DEG, SERIES_HOURS, OpenMeteoProvider, hour_bucket, snap_to_grid
+from .ok_to_spray import DEFAULT_RULESET, RuleSet
+
+log = logging.getLogger(__name__)
+
+# name:south,west,north,east;... covering the metros most users live in
+DEFAULT_REGIONS = "dfw:32.55,-97.55,33.25,-96.45;okc:35.25,-97.75,35.70,-97.25"
+FIELDS = ("wind_mph", "wind_gust_mph", "precip_prob", "precip_in")
+STATUS_CODES = ("OK", "CAUTION", "NOT_OK")
+
+
+def parse_regions(spec: str) -> Dict[str, Tuple[float, float, float, float]]:
+    out: Dict[str, Tuple[float, float, float, float]] = {}
+    for part in (spec or "").split(";"):
+        name, _, bounds = part.strip().partition(":")
+        try:
+            south, west, north, east = (float(x) for x in bounds.split(","))
+        except ValueError:
+            continue
+        out[name.strip()] = (south, west, north, east)
+    return out
+
+
+def regions_from_env() -> Dict[str, Tuple[float, float, float, float]]:
+    return parse_regions(os.getenv("SPRAY_TILE_REGIONS", DEFAULT_REGIONS))
+
+
+class RegionTile:
+    """One region's forecast on a regular lat/lon grid, plus per-hour spray status.
+
+    Arrays are shaped ``(hours, rows, cols)``: float32 forecast columns, a uint8 status
+    code (index into STATUS_CODES) and a uint8 bitmap of passing rules. Grid points lie
+    on the Open-Meteo cell grid, so a point maps to the same cell a live fetch would use.
+    """
+
+    def __init__(
+        self,
+        region: str,
+        south: float,
+        west: float,
+        step: float,
+        times: np.ndarray,
+        columns: Dict[str, np.ndarray],
+        status: np.ndarray,
+        rules: np.ndarray,
+        rule_names: List[str],
+        computed_at: float,
+    ) -> None:
+        self.region = region
+        self.south = south
+        self.west = west
+        self.step = step
+        self.times = np.asarray(times, dtype=np.int64)
+        self.columns = columns
+        self.status = status
+        self.rules = rules
+        self.rule_names = rule_names
+        self.computed_at = computed_at
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.status.shape[1], self.status.shape[2]
+
+    def cell(self, lat: float, lon: float) -> Optional[Tuple[int, int]]:
+        # Snap like the live path; a cell between coarser tile points is not covered
+        lat, lon = snap_to_grid(lat, lon)
+        r, c = (lat - self.south) / self.step, (lon - self.west) / self.step
+        ri, ci = int(round(r)), int(round(c))
+        if abs(r - ri) > 1e-6 or abs(c - ci) > 1e-6:
+            return None
+        rows, cols = self.shape
+        return (ri, ci) if 0 <= ri < rows and 0 <= ci < cols else None
+
+    def forecast(self, lat: float, lon: float, start: datetime, hours: int) -> Optional[HourlyForecast]:
+        """Series for the nearest grid point, or None if the tile doesn't cover the request."""
+        rc = self.cell(lat, lon)
+        if rc is None:
+            return None
+        first = _utc_epoch(hour_bucket(start))
+        i = int(np.searchsorted(self.times, first))
+        if i >= len(self.times) or self.times[i] != first or i + hours > len(self.times):
+            return None
+        r, c = rc
+        cols = {k: v[i:i + hours, r, c].astype(np.float64) for k, v in self.columns.items()}
+        return HourlyForecast(self.times[i:i + hours], cols, "OpenMeteo")
+
+    def to_bytes(self) -> bytes:
+        buf = io.BytesIO()
+        np.savez_compressed(
+            buf,
+            times=self.times,
+            status=self.status,
+            rules=self.rules,
+            **{f"col_{k}": v for k, v in self.columns.items()},
+        )
+        return buf.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes, meta: Dict[str, Any]) -> "RegionTile":
+        with np.load(io.BytesIO(data)) as z:
+            columns = {k[4:]: z[k] for k in z.files if k.startswith("col_")}
+            return cls(
+                meta["region"], meta["south"], meta["west"], meta["step"], z["times"], columns,
+                z["status"], z["rules"], list(meta["rule_names"]), meta["computed_at"],
+            )
+
+    def overlay(self, hour: int) -> Dict[str, Any]:
+        rows, cols = self.shape
+        return {
+            "region": self.region,
+            "ts": datetime.utcfromtimestamp(int(self.times[hour])).isoformat() + "Z",
+            "south": self.south,
+            "west": self.west,
+            "step": self.step,
+            "rows": rows,
+            "cols": cols,
+            "legend": list(STATUS_CODES),
+            "status": self.status[hour].tolist(),
+        }
+
+
+def _utc_epoch(dt: datetime) -> int:
+    # Naive datetimes are UTC throughout the API
+    return int((dt - datetime(1970, 1, 1)).total_seconds())
+
+
+async def compute_tile(
+    region: str,
+    bounds: Tuple[float, float, float, float],
+    provider: OpenMeteoProvider,
+    start: Optional[datetime] = None,
+    step: float = DEFAULT_GRID_DEG,
+    ruleset: RuleSet = DEFAULT_RULESET,
+) -> RegionTile:
+    # Align origin and spacing to the provider's cache grid so tile points are real cells
+    step = round(max(1, round(step / DEFAULT_GRID_DEG)) * DEFAULT_GRID_DEG, 4)
+    south, west = snap_to_grid(bounds[0], bounds[1])
+    north, east = snap_to_grid(bounds[2], bounds[3])
+    rows = int(round((north - south) / step)) + 1
+    cols = int(round((east - west) / step)) + 1
+    lats = np.round(south + step * np.arange(rows), 4)
+    lons = np.round(west + step * np.arange(cols), 4)
+    points = [(float(la), float(lo)) for la in lats for lo in lons]
+    start = hour_bucket(start or datetime.utcnow())
+    frames = await provider.get_hourly_many(points, start, start + timedelta(hours=SERIES_HOURS))
+    if any(f.degraded for f in frames):
+        raise RuntimeError(f"upstream forecast unavailable for region {region}")
+    hours = min(len(f) for f in frames)
+
+    # (points, hours) -> (hours, rows, cols)
+    stacked = {k: np.stack([f.column(k)[:hours] for f in frames]) for k in FIELDS}
+    status, rules = ruleset.evaluate(stacked)
+    code = np.zeros(status.shape, dtype=np.uint8)
+    for i, name in enumerate(STATUS_CODES):
+        code[status == name] = i
+    bits = np.zeros(status.shape, dtype=np.uint8)
+    for i, ok in enumerate(rules.values()):
+        bits |= ok.astype(np.uint8) << i
+
+    def grid(a: np.ndarray, dtype: Any) -> np.ndarray:
+        return a.T.reshape(hours, rows, cols).astype(dtype)
+
+    return RegionTile(
+        region, south, west, step, frames[0].times[:hours],
+        {k: grid(v, np.float32) for k, v in stacked.items()},
+        grid(code, np.uint8), grid(bits, np.uint8), list(rules), time.time(),
+    )
+
+
+class SqlTileStore(SqlStore):
+    """Latest computed tile per region in ``spray_tiles``."""
+
+    def _save(self, tile: RegionTile) -> None:
+        params = {
+            "region": tile.region,
+            "run_hour": datetime.utcfromtimestamp(int(tile.times[0])).isoformat(),
+            "south": tile.south,
+            "west": tile.west,
+            "step": tile.step,
+            "rule_names": ",".join(tile.rule_names),
+            "data": tile.to_bytes(),
+            "computed_at": tile.computed_at,
+        }
+        with self._engine().begin() as conn:
+            conn.execute(
+                text(
+                    "INSERT INTO spray_tiles (region, run_hour, south, west, step, rule_names, data, computed_at) "
+                    "VALUES (:region, :run_hour, :south, :west, :step, :rule_names, :data, :computed_at) "
+                    "ON CONFLICT (region, run_hour) DO UPDATE SET data = excluded.data, computed_at = excluded.computed_at"
+                ),
+                params,
+            )
+            conn.execute(text("DELETE FROM spray_tiles WHERE region = :region AND run_hour < :run_hour"), params)
+
+    def _load_latest(self) -> List[RegionTile]:
+        with self._engine().connect() as conn:
+            rows = conn.execute(
+                text(
+                    "SELECT t.* FROM spray_tiles t JOIN (SELECT region, MAX(run_hour) AS run_hour FROM spray_tiles GROUP BY region) m "
+                    "ON t.region = m.region AND t.run_hour = m.run_hour"
+                )
+            ).mappings().all()
+        return [
+            RegionTile.from_bytes(bytes(r["data"]), {**r, "rule_names": r["rule_names"].split(",")})
+            for r in rows
+        ]
+
+    async def save(self, tile: RegionTile) -> None:
+        await self._in_thread_or(None, "spray_tile_save_error", self._save, tile, region=tile.region)
+
+    async def load_latest(self) -> List[RegionTile]:
+        return await self._in_thread_or([], "spray_tile_load_error", self._load_latest)
+
+
+class TileCache:
+    """In-process view of the latest tiles, re-read from the store every few minutes."""
+
+    def __init__(self, store: Optional[SqlTileStore] = None, reload_s: float = 300, max_age_s: float = 2 * 3600) -> None:
+        self.store = store
+        self.reload_s = reload_s
+        self.max_age_s = max_age_s
+        self.tiles: Dict[str, RegionTile] = {}
+        self._loaded_at: Optional[float] = None
+        self.hits = 0
+
+    def put(self, tile: RegionTile) -> None:
+        self.tiles[tile.region] = tile
+
+    async def refresh(self) -> None:
+        if self.store is None:
+            return
+        now = time.monotonic()
+        if self._loaded_at is not None and now - self._loaded_at < self.reload_s:
+            return
+        self._loaded_at = now
+        for tile in await self.store.load_latest():
+            self.put(tile)
+
+    async def forecast(self, lat: float, lon: float, start: datetime, hours: int) -> Optional[Tuple[RegionTile, HourlyForecast]]:
+        await self.refresh()
+        for tile in self.tiles.values():
+            if time.time() - tile.computed_at > self.max_age_s:
+                continue
+            frame = tile.forecast(lat, lon, start, hours)
+            if frame is not None:
+                self.hits += 1
+                return tile, frame
+        return None
+
+
+async def refresh_tiles(provider: OpenMeteoProvider, store: Optional[SqlTileStore], cache: Optional[TileCache] = None) -> List[RegionTile]:
+    """Compute every configured region once and persist the results."""
+    step = float(os.getenv("SPRAY_TILE_STEP_DEG", str(DEFAULT_GRID_DEG)))
+    tiles = []
+    for region, bounds in regions_from_env().items():
+        try:
+            tile = await compute_tile(region, bounds, provider, step=step)
+        except Exception as e:
+            # Keep serving the previous tile; the endpoint falls back to live data once it ages out
+            log.warning(json.dumps({"event": "spray_tile_error", "region": region, "error": str(e)}))
+            continue
+        if store is not None:
+            await store.save(tile)
+        if cache is not None:
+            cache.put(tile)
+        tiles.append(tile)
+        log.info(json.dumps({"event": "spray_tile_refreshed", "region": region, "shape": list(tile.shape)}))
+    return tiles
+
+
+async def _main() -> None:
+    from ..providers.registry import ProviderRegistry
+
+    if not db_configured():
+        raise SystemExit("DATABASE_URL or POSTGRES_URL required")
+    registry = ProviderRegistry()
+    try:
+        await refresh_tiles(registry.openmeteo, SqlTileStore())
+    finally:
+        await registry.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,55 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+def find_windows(
+    status: np.ndarray,
+    ts: Sequence[str],
+    min_hours: int = 2,
+    include_caution: bool = True,
+) -> List[Dict[str, Any]]:
+    """All maximal runs of sprayable hours lasting at least ``min_hours``, best first.
+
+    One run-length encoding pass over the status array. Runs are ranked by fewest
+    CAUTION hours, then longest, then earliest; ``end`` is the last hour in the run.
+    """
+    status = np.asarray(status)
+    accept = ["OK", "CAUTION"] if include_caution else ["OK"]
+    good = np.isin(status, accept).astype(np.int8)
+    edges = np.diff(np.concatenate(([0], good, [0])))
+    starts = np.flatnonzero(edges == 1)
+    stops = np.flatnonzero(edges == -1)
+    lengths = stops - starts
+    keep = lengths >= max(1, min_hours)
+    starts, stops, lengths = starts[keep], stops[keep], lengths[keep]
+    if not len(starts):
+        return []
+
+    ok_prefix = np.concatenate(([0], np.cumsum(status == "OK")))
+    ok_hours = ok_prefix[stops] - ok_prefix[starts]
+    caution = lengths - ok_hours
+    order = np.lexsort((starts, -lengths, caution))
+    return [
+        {
+            "start": ts[starts[i]],
+            "end": ts[stops[i] - 1],
+            "hours": int(lengths[i]),
+            "ok_hours": int(ok_hours[i]),
+            "caution_hours": int(caution[i]),
+        }
+        for i in order
+    ]
+
+
+def first_ok_window(status: np.ndarray, ts: Sequence[str], hours: int = 2) -> Optional[Dict[str, str]]:
+    """Earliest ``hours``-long stretch of OK hours (the historical ``ok_window``)."""
+    good = np.asarray(status) == "OK"
+    if hours <= 0 or len(good) < hours:
+        return None
+    run = np.convolve(good.astype(np.int16), np.ones(hours, dtype=np.int16), mode="valid")
+    hits = np.flatnonzero(run == hours)
+    if not len(hits):
+        return None
+    i = int(hits[0])
+    return {"start": ts[i], "end": ts[i + hours - 1]}
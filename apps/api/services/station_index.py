@@ -0,0 +1,176 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from ..db import SqlStore, db_configured
+from .station_select import select_nearest_station_safe, select_nearest_stations_safe
+
+log = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+RELOAD_SECONDS = 300
+STATION_FIELDS = ("id", "provider", "name", "lat", "lon", "state", "has_soil_temp")
+
+
+def unit_vectors(lat: Any, lon: Any) -> np.ndarray:
+    """Degrees -> points on the unit sphere, shape (..., 3)."""
+    la, lo = np.radians(lat), np.radians(lon)
+    return np.stack([np.cos(la) * np.cos(lo), np.cos(la) * np.sin(lo), np.sin(la)], axis=-1)
+
+
+class StationIndex:
+    """Stations as unit-sphere vectors for nearest / k-nearest / radius queries.
+
+    The greatest dot product is the smallest great-circle distance, so every query is
+    one (N, 3) @ (3,) product. At the few hundred stations we carry this beats a tree
+    and needs nothing beyond numpy.
+    """
+
+    def __init__(self, stations: Sequence[Dict[str, Any]], loaded_at: float = 0.0, version: Any = None) -> None:
+        self.stations = [dict(s) for s in stations]
+        self.loaded_at = loaded_at
+        self.version = version
+        self.xyz = unit_vectors(
+            np.array([s["lat"] for s in self.stations], dtype=np.float64),
+            np.array([s["lon"] for s in self.stations], dtype=np.float64),
+        ).reshape(-1, 3)
+        self.soil = np.array([bool(s.get("has_soil_temp")) for s in self.stations], dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.stations)
+
+    def _cosines(self, lat: float, lon: float, soil_only: bool) -> np.ndarray:
+        cos = self.xyz @ unit_vectors(lat, lon)
+        if soil_only:
+            cos = np.where(self.soil, cos, -np.inf)
+        return cos
+
+    def _result(self, i: int, cos: float) -> Dict[str, Any]:
+        angle = float(np.arccos(np.clip(cos, -1.0, 1.0)))
+        return {**{k: self.stations[i].get(k) for k in STATION_FIELDS}, "distance_km": round(angle * EARTH_RADIUS_KM, 3)}
+
+    def k_nearest(self, lat: float, lon: float, k: int = 1, soil_only: bool = True) -> List[Dict[str, Any]]:
+        cos = self._cosines(lat, lon, soil_only)
+        k = min(k, int(np.isfinite(cos).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-cos, k - 1)[:k] if k < len(cos) else np.arange(len(cos))
+        top = top[np.argsort(-cos[top], kind="stable")]
+        return [self._result(int(i), cos[i]) for i in top]
+
+    def nearest(self, lat: float, lon: float, soil_only: bool = True) -> Optional[Dict[str, Any]]:
+        hits = self.k_nearest(lat, lon, 1, soil_only)
+        return hits[0] if hits else None
+
+    def within(self, lat: float, lon: float, radius_km: float, soil_only: bool = True) -> List[Dict[str, Any]]:
+        cos = self._cosines(lat, lon, soil_only)
+        idx = np.flatnonzero(cos >= np.cos(min(radius_km / EARTH_RADIUS_KM, np.pi)))
+        idx = idx[np.argsort(-cos[idx], kind="stable")]
+        return [self._result(int(i), cos[i]) for i in idx]
+
+
+class StationDirectory(SqlStore):
+    """Keeps a ``StationIndex`` in step with the ``stations`` table.
+
+    Loaded at startup, then a cheap fingerprint query every ``interval`` seconds
+    rebuilds the index only when the table changed. Until an index exists, lookups
+    go to the database.
+    """
+
+    def __init__(
+        self,
+        bind: Optional[Engine] = None,
+        interval: float = RELOAD_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__(bind)
+        self.interval = interval
+        self.clock = clock
+        self.index: Optional[StationIndex] = None
+        self.failures = 0
+        self.fallbacks = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def _fingerprint(self) -> Tuple[Any, ...]:
+        with self._engine().connect() as conn:
+            row = conn.execute(
+                text(
+                    "SELECT COUNT(*), MAX(id), SUM(priority), "
+                    "SUM(CASE WHEN has_soil_temp THEN 1 ELSE 0 END), SUM(lat + lon) FROM stations"
+                )
+            ).first()
+        return tuple(row)
+
+    def _load(self, version: Tuple[Any, ...]) -> StationIndex:
+        with self._engine().connect() as conn:
+            rows = conn.execute(
+                text(f"SELECT {', '.join(STATION_FIELDS)} FROM stations ORDER BY priority DESC, id")
+            ).mappings().all()
+        return StationIndex(rows, loaded_at=self.clock(), version=version)
+
+    def _refresh(self) -> StationIndex:
+        version = self._fingerprint()
+        if self.index is not None and self.index.version == version:
+            self.index.loaded_at = self.clock()
+            return self.index
+        self.index = self._load(version)
+        return self.index
+
+    async def refresh(self) -> StationIndex:
+        return await self._in_thread(self._refresh)
+
+    async def nearest(self, lat: float, lon: float) -> Optional[Dict[str, Any]]:
+        """Nearest soil-temperature station; same shape as ``select_nearest_station_safe``."""
+        if self.index is None:
+            self.fallbacks += 1
+            return await select_nearest_station_safe(lat, lon)
+        hit = self.index.nearest(lat, lon)
+        if hit is not None:
+            hit.pop("distance_km")
+        return hit
+
+    async def nearest_many(self, points: Sequence[Tuple[float, float]]) -> List[Optional[Dict[str, Any]]]:
+        """``nearest`` for many points; the fallback is a single batched query."""
+        if self.index is None:
+            self.fallbacks += 1
+            return await select_nearest_stations_safe(points)
+        out = []
+        for lat, lon in points:
+            hit = self.index.nearest(lat, lon)
+            if hit is not None:
+                hit.pop("distance_km")
+            out.append(hit)
+        return out
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                self.failures += 1
+                log.warning(json.dumps({"event": "station_index_error", "error": str(e)}))
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None and (self._bind is not None or db_configured()):
+            self._task = asyncio.ensure_future(self._run())
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "indexed": len(self.index) if self.index is not None else None,
+            "age_s": round(self.clock() - self.index.loaded_at, 1) if self.index is not None else None,
+            "refresh_failures": self.failures,
+            "db_fallbacks": self.fallbacks,
+        }
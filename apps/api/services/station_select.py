@@ -1,25 +1,69 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from sqlalchemy import text
-from ..db import engine
+from ..db import async_engine
 
 
-async def select_nearest_station_safe(lat: float, lon: float) -> Optional[Dict[str, Any]]:
+# geom <-> point is the KNN operator: with ix_stations_geom_gist the planner walks the
+# GiST index nearest-first and stops at LIMIT instead of scoring every row.
+_NEAREST_SQL = """
+    SELECT id, provider, name, lat, lon, state, has_soil_temp
+    FROM stations
+    WHERE has_soil_temp = true AND priority >= :min_priority
+    ORDER BY geom <-> ST_SetSRID(ST_MakePoint(:lon, :lat), 4326)::geography
+    LIMIT 1
+"""
+
+# One round trip for many points: each unnested point drives its own KNN probe
+_NEAREST_MANY_SQL = """
+    SELECT p.idx, s.id, s.provider, s.name, s.lat, s.lon, s.state, s.has_soil_temp
+    FROM unnest(CAST(:lats AS double precision[]), CAST(:lons AS double precision[])) WITH ORDINALITY AS p(lat, lon, idx)
+    LEFT JOIN LATERAL (
+        SELECT id, provider, name, lat, lon, state, has_soil_temp
+        FROM stations
+        WHERE has_soil_temp = true AND priority >= :min_priority
+        ORDER BY geom <-> ST_SetSRID(ST_MakePoint(p.lon, p.lat), 4326)::geography
+        LIMIT 1
+    ) s ON true
+    ORDER BY p.idx
+"""
+
+
+async def select_nearest_station_safe(lat: float, lon: float, min_priority: int = 0) -> Optional[Dict[str, Any]]:
     try:
-        with engine().connect() as conn:
-            row = conn.execute(
-                text(
-                    """
-                    SELECT id, provider, name, lat, lon, state, has_soil_temp
-                    FROM stations
-                    WHERE has_soil_temp = true
-                    ORDER BY ST_DistanceSphere(geom::geometry, ST_SetSRID(ST_MakePoint(:lon,:lat),4326)) ASC
-                    LIMIT 1
-                    """
-                ),
-                {"lat": lat, "lon": lon},
-            ).mappings().first()
+        async with async_engine().connect() as conn:
+            result = await conn.execute(
+                text(_NEAREST_SQL),
+                {"lat": lat, "lon": lon, "min_priority": min_priority},
+            )
+            row = result.mappings().first()
             if row:
                 return dict(row)
             return None
     except Exception:
         return None
+
+
+async def select_nearest_stations_safe(
+    points: Sequence[Tuple[float, float]], min_priority: int = 0
+) -> List[Optional[Dict[str, Any]]]:
+    """Nearest soil-temperature station for each point, in input order."""
+    if not points:
+        return []
+    try:
+        async with async_engine().connect() as conn:
+            result = await conn.execute(
+                text(_NEAREST_MANY_SQL),
+                {
+                    "lats": [float(p[0]) for p in points],
+                    "lons": [float(p[1]) for p in points],
+                    "min_priority": min_priority,
+                },
+            )
+            rows = result.mappings().all()
+    except Exception:
+        return [None] * len(points)
+    out: List[Optional[Dict[str, Any]]] = [None] * len(points)
+    for r in rows:
+        if r["id"] is not None:
+            out[int(r["idx"]) - 1] = {k: v for k, v in r.items() if k != "idx"}
+    return out
@@ -0,0 +1,38 @@
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+
+def snapshot_hash(payload: Dict[str, Any]) -> str:
+    """SHA-256 of the canonical JSON form, so equal payloads share one row."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def store_snapshot(session: Session, payload: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Insert the payload once (no-op if already stored) and return its key."""
+    if payload is None:
+        return None
+    key = snapshot_hash(payload)
+    session.execute(
+        text(
+            "INSERT INTO weather_snapshots (hash, payload, created_at) VALUES (:h, :p, :t) "
+            "ON CONFLICT (hash) DO NOTHING"
+        ),
+        {"h": key, "p": json.dumps(payload, default=str), "t": datetime.utcnow().isoformat() + "Z"},
+    )
+    return key
+
+
+def decode_snapshot(value: Any) -> Any:
+    # Postgres returns JSON columns parsed; SQLite hands back the stored text
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
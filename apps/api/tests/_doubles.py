@@ -0,0 +1,29 @@
+"""Test doubles shared by the provider and service tests."""
+
+
+class FakeResp:
+    """Stand-in for ``httpx.Response`` in provider tests."""
+
+    def __init__(self, payload=None, status_code=200, headers=None):
+        self._payload = payload
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.request = None
+
+    def raise_for_status(self):
+        return True
+
+    def json(self):
+        if self._payload is None:
+            raise AssertionError("response has no body (304 bodies must not be parsed)")
+        return self._payload
+
+
+class Clock:
+    """Injectable monotonic clock; tests move ``now`` by hand."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
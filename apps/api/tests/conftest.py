@@ -1,7 +1,34 @@
+import asyncio
 import os, sys
 
+import pytest
+
 # Ensure repository root is on sys.path for absolute imports like `apps.api.*`
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
+
+@pytest.fixture(autouse=True)
+def _module_session_override(request, monkeypatch):
+    # Modules install their get_db_session override at import, so the last import wins;
+    # pin each module's own ``override_session`` for its tests
+    override = getattr(request.module, "override_session", None)
+    if override is not None:
+        from apps.api.main import app, get_db_session
+
+        monkeypatch.setitem(app.dependency_overrides, get_db_session, override)
+
+
+@pytest.fixture(autouse=True)
+def _provider_registry(monkeypatch):
+    # The app lifespan owns the registry; tests that call handlers without it get their
+    # own, closed afterwards like the lifespan would
+    from apps.api.main import app
+    from apps.api.providers.registry import ProviderRegistry
+
+    reg = ProviderRegistry()
+    monkeypatch.setattr(app.state, "providers", reg, raising=False)
+    yield reg
+    asyncio.run(reg.aclose())
+
@@ -3,6 +3,7 @@ from sqlmodel import create_engine, Session
 from sqlalchemy.pool import StaticPool
 from sqlalchemy import text as sa_text
 
+from apps.api.db import bootstrap_schema
 from apps.api.main import app, get_db_session
 
 
@@ -19,9 +20,8 @@ client = TestClient(app)
 
 
 def setup_module(module=None):
+    bootstrap_schema(TEST_ENGINE)
     with Session(TEST_ENGINE) as s:
-        s.execute(sa_text("CREATE TABLE IF NOT EXISTS properties (id INTEGER PRIMARY KEY, address VARCHAR NOT NULL)"))
-        s.execute(sa_text("CREATE TABLE IF NOT EXISTS applications (id INTEGER PRIMARY KEY, property_id INTEGER NOT NULL, product_id VARCHAR NOT NULL, date DATE, rate_value FLOAT, rate_unit VARCHAR, area_sqft FLOAT, carrier_gpa FLOAT, tank_size_gal FLOAT, gdd_model VARCHAR, notes TEXT, weather_snapshot JSON, batch_id VARCHAR, FOREIGN KEY(property_id) REFERENCES properties(id))"))
         s.execute(sa_text("INSERT INTO properties (address) VALUES ('123 Bermuda Ln')"))
         pid = s.execute(sa_text("SELECT id FROM properties LIMIT 1")).scalar()
         batch_id = '2025-01-01T00:00:00_1'
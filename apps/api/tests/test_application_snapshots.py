@@ -0,0 +1,63 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, create_engine
+
+from apps.api import main
+from apps.api.auth import verify_bearer_token
+from apps.api.db import bootstrap_schema
+from apps.api.main import app, get_db_session
+from apps.api.models import Property as DBProperty
+from apps.api.services.weather_snapshots import snapshot_hash
+
+
+SNAPSHOT = {"source": {"provider": "OpenMeteo"}, "current": {"wind_mph": 4.0}, "hourlies": [{"wind_mph": 4.0}] * 48}
+
+
+def test_snapshot_hash_is_canonical():
+    assert snapshot_hash({"a": 1, "b": [1, 2]}) == snapshot_hash({"b": [1, 2], "a": 1})
+    assert snapshot_hash({"a": 1}) != snapshot_hash({"a": 2})
+
+
+def test_bulk_insert_shares_one_snapshot(monkeypatch):
+    eng = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    bootstrap_schema(eng)
+    with Session(eng) as s:
+        s.add(DBProperty(address="1 Turf Way", user_id="u1", lat=32.9, lon=-97.0))
+        s.commit()
+
+    def session_override():
+        with Session(eng) as s:
+            yield s
+
+    async def fake_summary(lat, lon, hours=6):
+        return SNAPSHOT
+
+    inserts = []
+
+    @event.listens_for(eng, "before_cursor_execute")
+    def count_inserts(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO applications"):
+            inserts.append(executemany)
+
+    monkeypatch.setitem(app.dependency_overrides, get_db_session, session_override)
+    monkeypatch.setitem(app.dependency_overrides, verify_bearer_token, lambda: {"sub": "u1"})
+    monkeypatch.setattr(main, "compute_weather_summary", fake_summary)
+    client = TestClient(app)
+
+    items = [{"product_id": p, "rate_value": 0.4, "rate_unit": "fl_oz_per_1k"} for p in ("primo", "tnex", "drive")]
+    for _ in range(2):
+        r = client.post("/api/applications/bulk", json={"property_id": 1, "items": items})
+        assert r.status_code == 200 and r.json()["count"] == 3
+
+    # One executemany per batch, one snapshot row across identical payloads
+    assert inserts == [True, True]
+    with eng.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM weather_snapshots")).scalar() == 1
+        hashes = conn.execute(text("SELECT DISTINCT weather_snapshot_hash FROM applications")).scalars().all()
+        app_id = conn.execute(text("SELECT MIN(id) FROM applications")).scalar()
+    assert hashes == [snapshot_hash(SNAPSHOT)]
+
+    got = client.get(f"/api/applications/{app_id}").json()
+    assert got["weather_snapshot"] == SNAPSHOT
+    assert got["product_id"] == "primo"
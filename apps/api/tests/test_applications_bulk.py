@@ -1,14 +1,13 @@
 from fastapi.testclient import TestClient
 from sqlmodel import create_engine, Session
 from sqlalchemy.pool import StaticPool
+from apps.api.db import bootstrap_schema
 from apps.api.main import app, get_db_session
 from apps.api.models import Property as DBProperty
 
 
 TEST_ENGINE = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
-with TEST_ENGINE.connect() as conn:
-    conn.exec_driver_sql("CREATE TABLE IF NOT EXISTS properties (id INTEGER PRIMARY KEY, user_id VARCHAR, address VARCHAR NOT NULL, lat FLOAT, lon FLOAT, timezone VARCHAR, program_goal VARCHAR, irrigation VARCHAR, cultivar VARCHAR, mower VARCHAR, hoc_in FLOAT, state VARCHAR, pgr_last_gdd0 DATE, pgr_last_gdd10 DATE)")
-    conn.exec_driver_sql("CREATE TABLE IF NOT EXISTS applications (id INTEGER PRIMARY KEY, property_id INTEGER NOT NULL, product_id VARCHAR NOT NULL, date DATE, rate_value FLOAT, rate_unit VARCHAR, area_sqft FLOAT, carrier_gpa FLOAT, tank_size_gal FLOAT, gdd_model VARCHAR, notes TEXT, weather_snapshot JSON, batch_id VARCHAR, FOREIGN KEY(property_id) REFERENCES properties(id))")
+bootstrap_schema(TEST_ENGINE)
 
 
 def override_session():
@@ -21,11 +20,6 @@ client = TestClient(app)
 
 
 def test_applications_bulk_inserts():
-    # Ensure tables exist in this in-memory engine session
-    from sqlalchemy import text as sa_text
-    with Session(TEST_ENGINE) as s:
-        s.execute(sa_text("CREATE TABLE IF NOT EXISTS applications (id INTEGER PRIMARY KEY, property_id INTEGER NOT NULL, product_id VARCHAR NOT NULL, date DATE, rate_value FLOAT, rate_unit VARCHAR, area_sqft FLOAT, carrier_gpa FLOAT, tank_size_gal FLOAT, gdd_model VARCHAR, notes TEXT, weather_snapshot JSON, batch_id VARCHAR, FOREIGN KEY(property_id) REFERENCES properties(id))"))
-        s.commit()
     # Seed property via API to ensure route/session alignment
     r_create = client.post('/api/properties', json={
         'address': '123 Bermuda Ln', 'state': 'TX'
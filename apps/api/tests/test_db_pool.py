@@ -0,0 +1,67 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.orm import Session
+
+from apps.api import db
+from apps.api.db import POOL_METRICS, PoolMetrics, TimedQueuePool, pool_options
+from apps.api.main import app
+
+
+def test_pool_options_from_env(monkeypatch):
+    assert pool_options("sqlite://") == {}
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS", "5000")
+    opts = pool_options("postgresql+psycopg://u:p@db/x")
+    assert opts["pool_size"] == 3 and opts["max_overflow"] == 0
+    assert opts["pool_pre_ping"] is False
+    assert opts["pool_recycle"] == 1800
+    assert opts["connect_args"] == {"options": "-c statement_timeout=5000"}
+
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS", "0")
+    assert "connect_args" not in pool_options("postgresql+psycopg://u:p@db/x")
+
+
+def test_histogram_buckets():
+    m = PoolMetrics()
+    for s in (0.0005, 0.003, 0.2, 9.0):
+        m.observe(s)
+    snap = m.snapshot()
+    assert snap["checkouts"] == 4
+    assert snap["wait_ms_buckets"]["le_1"] == 1
+    assert snap["wait_ms_buckets"]["le_5"] == 1
+    assert snap["wait_ms_buckets"]["le_500"] == 1
+    assert snap["wait_ms_buckets"]["inf"] == 1
+    assert snap["wait_max_ms"] == 9000.0
+
+
+def test_timed_pool_counts_checkouts_and_timeouts(tmp_path):
+    metrics = POOL_METRICS["sync"]
+    before_checkouts, before_timeouts = metrics.checkouts, metrics.timeouts
+    eng = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=TimedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05
+    )
+    held = eng.connect()
+    with pytest.raises(exc.TimeoutError):
+        eng.connect()
+    held.close()
+    with eng.connect():
+        pass
+    # ORM sessions check out through the same public Pool.connect()
+    with Session(eng) as session:
+        session.execute(text("SELECT 1"))
+    assert metrics.checkouts - before_checkouts == 4
+    assert metrics.timeouts - before_timeouts == 1
+    snap = metrics.snapshot(eng.pool)
+    assert snap["size"] == 1 and snap["checked_out"] == 0
+    eng.dispose()
+
+
+def test_metrics_endpoint_reports_pool(monkeypatch):
+    monkeypatch.setattr(db, "_engine", None)
+    monkeypatch.setattr(db, "_async_engine", None)
+    r = TestClient(app).get("/metrics")
+    assert r.status_code == 200
+    assert r.json()["db_pool"] == {}
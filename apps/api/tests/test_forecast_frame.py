@@ -0,0 +1,52 @@
+import itertools
+
+import numpy as np
+
+from apps.api.providers.forecast import HourlyForecast, as_forecast
+from apps.api.services.ok_to_spray import DEFAULT_RULESET, ok_to_spray_hour
+
+
+def test_from_columns_normalizes_times_and_missing_values():
+    f = HourlyForecast.from_columns(
+        ["2024-01-01T00:00", "2024-01-01T01:00Z", "2023-12-31T20:00:00-06:00"],
+        {"wind_mph": [4.0, None, 6.0]},
+        "OpenMeteo",
+    )
+    rows = f.to_rows()
+    assert [r["ts"] for r in rows] == ["2024-01-01T00:00:00Z", "2024-01-01T01:00:00Z", "2024-01-01T02:00:00Z"]
+    assert rows[1]["wind_mph"] is None
+    assert f.columns["wind_mph"].dtype == np.float64
+    assert f[0]["provider"] == "OpenMeteo" and len(f[1:]) == 2
+
+
+def test_reindex_aligns_across_offsets():
+    om = HourlyForecast.from_columns(["2024-01-01T00:00Z", "2024-01-01T01:00Z", "2024-01-01T02:00Z"], {"wind_mph": [1, 1, 1]}, "OpenMeteo")
+    nws = HourlyForecast.from_columns(["2023-12-31T19:00:00-05:00", "2023-12-31T21:00:00-05:00"], {"wind_mph": [5, 7]}, "NWS")
+    aligned, matched = nws.reindex(om.times)
+    assert matched.tolist() == [True, False, True]
+    assert aligned.to_rows()[2]["wind_mph"] == 7.0
+    assert aligned.to_rows()[1]["wind_mph"] is None
+
+
+def test_as_forecast_accepts_legacy_rows():
+    f = as_forecast([{"ts": "2024-01-01T00:00:00Z", "wind_mph": 5.0, "provider": "NWS"}])
+    assert f.to_rows() == [{"ts": "2024-01-01T00:00:00Z", "wind_mph": 5.0, "provider": "NWS"}]
+
+
+def test_column_scoring_matches_hourly_rules():
+    values = {
+        "wind": [None, 2, 3, 10, 11],
+        "gust": [None, 10, 15],
+        "prob": [None, 0.1, 0.2],
+        "qty": [None, 0.0, 0.1],
+    }
+    combos = list(itertools.product(*values.values()))
+    cols = {
+        name: np.array([c[i] for c in combos], dtype=np.float64)
+        for i, name in enumerate(("wind_mph", "wind_gust_mph", "precip_prob", "precip_in"))
+    }
+    status, rules = DEFAULT_RULESET.evaluate(cols)
+    for i, combo in enumerate(combos):
+        exp_status, exp_rules = ok_to_spray_hour(*combo)
+        assert status[i] == exp_status
+        assert {k: bool(v[i]) for k, v in rules.items()} == exp_rules
@@ -0,0 +1,114 @@
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import create_engine
+
+from apps.api.models import ForecastSeries
+from apps.api.providers.openmeteo import OpenMeteoProvider
+from apps.api.services.forecast_store import RedisForecastStore, SqlForecastStore
+
+from _doubles import FakeResp
+
+
+class CountingClient:
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+
+    async def get(self, url, params=None):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("upstream down")
+        start = datetime.strptime(params["start_hour"], "%Y-%m-%dT%H:%M")
+        return FakeResp({"hourly": {
+            "time": [(start + timedelta(hours=i)).isoformat() for i in range(48)],
+            "wind_speed_10m": [4.0] * 48,
+            "wind_gusts_10m": [None] * 48,
+        }})
+
+
+def _sql_store():
+    eng = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    ForecastSeries.__table__.create(eng)
+    return SqlForecastStore(bind=eng)
+
+
+START = datetime(2024, 1, 1, 12)
+
+
+@pytest.mark.asyncio
+async def test_second_worker_reads_shared_series():
+    store = _sql_store()
+    first = CountingClient()
+    await OpenMeteoProvider(client=first, store=store).get_hourly(32.8, -96.8, START, START + timedelta(hours=2))
+
+    # A fresh process-local cache, same table: no upstream round trip
+    second = CountingClient()
+    prov = OpenMeteoProvider(client=second, store=store)
+    rows = await prov.get_hourly(32.8, -96.8, START, START + timedelta(hours=2))
+    assert second.calls == 0
+    assert rows[0]["wind_mph"] == 4.0
+    assert rows[0]["wind_gust_mph"] is None
+    assert prov.shared_hits == 1
+
+    frames = await OpenMeteoProvider(client=second, store=store).get_hourly_many([(32.8, -96.8)], START, START + timedelta(hours=3))
+    assert second.calls == 0
+    assert len(frames[0]) == 3
+
+
+@pytest.mark.asyncio
+async def test_aging_shared_entry_beats_placeholder_when_upstream_fails():
+    store = _sql_store()
+    await OpenMeteoProvider(client=CountingClient(), store=store).get_hourly(32.8, -96.8, START, START + timedelta(hours=2))
+    with store._engine().begin() as conn:
+        conn.exec_driver_sql("UPDATE forecast_series SET fetched_at = fetched_at - 7200")
+
+    prov = OpenMeteoProvider(client=CountingClient(fail=True), ttl_seconds=3600, store=store)
+    frames = await prov.get_hourly_many([(32.8, -96.8)], START, START + timedelta(hours=2))
+    assert not frames[0].degraded
+    assert frames[0][0]["wind_mph"] == 4.0
+
+
+class FakePipeline:
+    def __init__(self, data):
+        self.data = data
+        self.ops = []
+
+    def set(self, key, value, ex=None):
+        self.ops.append((key, value, ex))
+
+    async def execute(self):
+        for key, value, _ in self.ops:
+            self.data[key] = value
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def mget(self, keys):
+        return [self.data.get(k) for k in keys]
+
+    def pipeline(self):
+        return FakePipeline(self.data)
+
+    async def aclose(self):
+        return None
+
+
+@pytest.mark.asyncio
+async def test_redis_store_round_trip():
+    redis = FakeRedis()
+    store = RedisForecastStore("redis://unused", client=redis)
+    await OpenMeteoProvider(client=CountingClient(), store=store).get_hourly(32.8, -96.8, START, START + timedelta(hours=2))
+    (key, raw), = redis.data.items()
+    assert key.startswith("bb:forecast:")
+    assert json.loads(raw)["fetched_at"] <= time.time()
+
+    client = CountingClient()
+    rows = await OpenMeteoProvider(client=client, store=store).get_hourly(32.8, -96.8, START, START + timedelta(hours=2))
+    assert client.calls == 0
+    assert rows[1]["wind_mph"] == 4.0
@@ -0,0 +1,139 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, create_engine
+
+from apps.api.auth import verify_bearer_token
+from apps.api.main import app, get_db_session
+from apps.api.models import GddDaily, Property as DBProperty
+from apps.api.providers.registry import ProviderRegistry
+from apps.api.services.gdd import MAX_BACKFILL_DAYS, SqlGddStore
+
+from _doubles import FakeResp
+
+
+def _engine():
+    eng = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    DBProperty.__table__.create(eng)
+    GddDaily.__table__.create(eng)
+    return eng
+
+
+def _days(start, temps):
+    return [((start + timedelta(days=i)).isoformat(), hi, lo) for i, (hi, lo) in enumerate(temps)]
+
+
+@pytest.mark.asyncio
+async def test_running_totals_and_since():
+    store = SqlGddStore(bind=_engine())
+    d0 = date(2024, 5, 1)
+    # Means 20, 15, 5 °C -> gdd10 10, 5, 0 ; gdd0 20, 15, 5
+    await store.ingest(1, _days(d0, [(25, 15), (20, 10), (10, 0)]))
+    assert (await store.since(1, d0.isoformat(), "gdd10"))["gdd"] == 15.0
+    assert (await store.since(1, (d0 + timedelta(days=1)).isoformat(), "gdd0"))["gdd"] == 20.0
+
+    # Appending only touches new rows; revising a past day recomputes the tail
+    await store.ingest(1, _days(d0 + timedelta(days=3), [(30, 20)]))
+    assert (await store.since(1, d0.isoformat(), "gdd10"))["gdd"] == 30.0
+    await store.ingest(1, _days(d0 + timedelta(days=1), [(30, 20)]))
+    acc = await store.since(1, d0.isoformat(), "gdd10")
+    assert acc == {"gdd": 40.0, "through": "2024-05-04", "history_truncated": False}
+    assert (await store.since(1, "2024-04-20", "gdd10"))["history_truncated"] is True
+    assert (await store.since(1, "2024-06-01", "gdd10"))["gdd"] == 0.0
+    assert (await store.since(2, d0.isoformat(), "gdd10"))["gdd"] == 0.0
+
+
+class DailyClient:
+    """Every day averages 20 °C."""
+
+    def __init__(self):
+        self.ranges = []
+
+    async def get(self, url, params=None):
+        start, end = date.fromisoformat(params["start_date"]), date.fromisoformat(params["end_date"])
+        self.ranges.append((start, end))
+        n = (end - start).days + 1
+        return FakeResp({"daily": {
+            "time": [(start + timedelta(days=i)).isoformat() for i in range(n)],
+            "temperature_2m_max": [25.0] * n,
+            "temperature_2m_min": [15.0] * n,
+        }})
+
+
+def _endpoint(monkeypatch, eng):
+    def override_session():
+        with Session(eng) as s:
+            yield s
+
+    client_http = DailyClient()
+    monkeypatch.setitem(app.dependency_overrides, get_db_session, override_session)
+    monkeypatch.setitem(app.dependency_overrides, verify_bearer_token, lambda: {"sub": "u1"})
+    monkeypatch.setattr(app.state, "providers", ProviderRegistry(client=client_http), raising=False)
+    return TestClient(app), client_http
+
+
+def test_gdd_endpoint_since_last_pgr(monkeypatch):
+    eng = _engine()
+    last = datetime.utcnow().date() - timedelta(days=9)
+    with Session(eng) as s:
+        s.add(DBProperty(address="1 Turf Way", lat=32.8, lon=-96.8, user_id="u1", pgr_last_gdd10=last.isoformat()))
+        s.commit()
+    client, client_http = _endpoint(monkeypatch, eng)
+
+    r = client.get("/api/properties/1/gdd?product=primo")
+    assert r.status_code == 200
+    data = r.json()
+    assert data["product"] == "Primo MAXX" and data["model"] == "gdd10"
+    assert data["gdd_since"] == 100.0  # 10 days x 10 GDD
+    assert data["target_gdd"] == 200 and data["remaining"] == 100.0 and data["due"] is False
+
+    # Already current through today: the next read makes no upstream call
+    assert client.get("/api/properties/1/gdd?product=primo").json()["gdd_since"] == 100.0
+    assert len(client_http.ranges) == 1
+
+    # A day behind: only the short revision window is re-fetched
+    with eng.begin() as conn:
+        conn.execute(text("DELETE FROM gdd_daily WHERE date = :d"), {"d": datetime.utcnow().date().isoformat()})
+    client.get("/api/properties/1/gdd?product=primo")
+    start, end = client_http.ranges[-1]
+    assert len(client_http.ranges) == 2 and (end - start).days == 3
+
+
+def test_gdd_endpoint_backfills_older_application(monkeypatch):
+    eng = _engine()
+    today = datetime.utcnow().date()
+    with Session(eng) as s:
+        s.add(DBProperty(address="1 Turf Way", lat=32.8, lon=-96.8, user_id="u1",
+                         pgr_last_gdd0=(today - timedelta(days=5)).isoformat(),
+                         pgr_last_gdd10=(today - timedelta(days=30)).isoformat()))
+        s.add(DBProperty(address="2 Turf Way", lat=32.8, lon=-96.8, user_id="u1"))
+        s.commit()
+    client, client_http = _endpoint(monkeypatch, eng)
+
+    # The recent gdd0 application is read first; gdd10 still needs its older days
+    assert client.get("/api/properties/1/gdd?model=gdd0").json()["gdd_since"] == 120.0  # 6 days x 20
+    data = client.get("/api/properties/1/gdd?model=gdd10").json()
+    assert data["gdd_since"] == 310.0  # 31 days x 10
+    assert data["due"] is True and data["history_truncated"] is False
+    assert client_http.ranges[-1] == (today - timedelta(days=30), today)
+
+    # No application recorded: nothing to fetch or store
+    data = client.get("/api/properties/2/gdd").json()
+    assert data["gdd_since"] is None and len(client_http.ranges) == 2
+
+
+def test_gdd_endpoint_flags_history_beyond_backfill(monkeypatch):
+    eng = _engine()
+    today = datetime.utcnow().date()
+    with Session(eng) as s:
+        s.add(DBProperty(address="1 Turf Way", lat=32.8, lon=-96.8, user_id="u1",
+                         pgr_last_gdd10=(today - timedelta(days=120)).isoformat()))
+        s.commit()
+    client, client_http = _endpoint(monkeypatch, eng)
+
+    data = client.get("/api/properties/1/gdd").json()
+    assert client_http.ranges == [(today - timedelta(days=MAX_BACKFILL_DAYS), today)]
+    assert data["history_truncated"] is True
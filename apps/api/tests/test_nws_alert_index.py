@@ -0,0 +1,125 @@
+import pytest
+
+from apps.api.providers.nws import NWSProvider
+from apps.api.providers.nws_alerts import AlertIndex, AlertPoller
+from apps.api.providers.registry import ProviderRegistry
+
+from _doubles import Clock, FakeResp
+
+
+def _feature(id_, ugc, geometry=None, event="Wind Advisory"):
+    return {
+        "id": id_,
+        "geometry": geometry,
+        "properties": {"event": event, "areaDesc": "Dallas", "geocode": {"UGC": ugc}},
+    }
+
+
+# Square around Dallas with a hole over downtown
+DALLAS_BOX = {
+    "type": "Polygon",
+    "coordinates": [
+        [[-97.2, 32.5], [-96.4, 32.5], [-96.4, 33.1], [-97.2, 33.1], [-97.2, 32.5]],
+        [[-96.85, 32.75], [-96.75, 32.75], [-96.75, 32.82], [-96.85, 32.82], [-96.85, 32.75]],
+    ],
+}
+TULSA_MULTI = {
+    "type": "MultiPolygon",
+    "coordinates": [[[[-96.1, 36.0], [-95.8, 36.0], [-95.8, 36.3], [-96.1, 36.3], [-96.1, 36.0]]]],
+}
+FEATURES = [
+    _feature("a", ["TXC113"], DALLAS_BOX),
+    _feature("b", ["OKC143"], TULSA_MULTI, event="Heat Advisory"),
+    _feature("c", ["TXZ119", "TXZ120"], None, event="Red Flag Warning"),
+]
+
+
+def test_point_in_polygon_and_zone_matches():
+    index = AlertIndex(FEATURES, ["OK", "TX"], loaded_at=0.0)
+    assert [a["id"] for a in index.query(32.6, -97.0)] == ["a"]
+    assert index.query(32.78, -96.8) == []  # inside the hole
+    assert [a["id"] for a in index.query(36.15, -95.99)] == ["b"]
+    assert [a["id"] for a in index.query(32.6, -97.0, zones=["TXZ119", "TXC113"])] == ["a", "c"]
+    assert index.query(35.0, -90.0) == []
+
+
+def test_polygon_alert_ignores_county_code_outside_polygon():
+    warning = {"type": "Polygon", "coordinates": [[[-96.9, 32.7], [-96.8, 32.7], [-96.8, 32.8], [-96.9, 32.8], [-96.9, 32.7]]]}
+    index = AlertIndex([_feature("tor", ["TXC113"], warning, event="Tornado Warning")], ["TX"], loaded_at=0.0)
+    assert [a["id"] for a in index.query(32.75, -96.85, zones=("TXC113",))] == ["tor"]
+    # Same county, well outside the storm polygon
+    assert index.query(32.6, -97.7, zones=("TXZ119", "TXC113")) == []
+
+
+class RoutingClient:
+    def __init__(self, state="TX", points_status=200):
+        self.urls = []
+        self.state = state
+        self.points_status = points_status
+
+    async def get(self, url, params=None, headers=None):
+        self.urls.append((url, params))
+        if "/points/" in url and self.points_status != 200:
+            return FakeResp({}, self.points_status)
+        if "/points/" in url:
+            return FakeResp({"properties": {
+                "forecastHourly": "https://api.weather.gov/gridpoints/FWD/80,108/forecast/hourly",
+                "forecastZone": "https://api.weather.gov/zones/forecast/TXZ119",
+                "county": "https://api.weather.gov/zones/county/TXC113",
+                "relativeLocation": {"properties": {"state": self.state}},
+            }})
+        if params and "area" in params:
+            return FakeResp({"features": FEATURES})
+        return FakeResp({"features": [_feature("remote", [])]})
+
+    async def aclose(self):
+        return None
+
+
+@pytest.mark.asyncio
+async def test_registry_answers_covered_points_locally(monkeypatch):
+    monkeypatch.setenv('NWS_USER_AGENT', 'BermudaBuddy/1.0 (test@example.com)')
+    client = RoutingClient()
+    reg = ProviderRegistry(client=client)
+    reg._nws = NWSProvider(client=client)
+    reg.alert_poller = AlertPoller(reg._nws, states=["OK", "TX"], clock=Clock())
+    await reg.alert_poller.refresh()
+    assert client.urls[0][1] == {"area": "OK,TX"}
+
+    alerts = await reg.alerts(32.6, -97.0)
+    assert [a["id"] for a in alerts] == ["a", "c"]
+    await reg.alerts(32.9, -97.1)
+    assert not any(p and "point" in p for _, p in client.urls)
+    assert reg.alerts_local == 2
+
+    # Index too old -> per-point request
+    reg.alert_poller.clock.now = 1000
+    assert [a["id"] for a in await reg.alerts(32.6, -97.0)] == ["remote"]
+
+
+@pytest.mark.asyncio
+async def test_uncovered_state_falls_back_to_point_query(monkeypatch):
+    monkeypatch.setenv('NWS_USER_AGENT', 'BermudaBuddy/1.0 (test@example.com)')
+    client = RoutingClient(state="LA")
+    reg = ProviderRegistry(client=client)
+    reg._nws = NWSProvider(client=client)
+    reg.alert_poller = AlertPoller(reg._nws, states=["OK", "TX"], clock=Clock())
+    await reg.alert_poller.refresh()
+    assert [a["id"] for a in await reg.alerts(30.2, -92.0)] == ["remote"]
+    assert reg.alerts_remote == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("client", [RoutingClient(state=None), RoutingClient(points_status=503)])
+async def test_unknown_state_falls_back_to_point_query(monkeypatch, client):
+    monkeypatch.setenv('NWS_USER_AGENT', 'BermudaBuddy/1.0 (test@example.com)')
+    async def no_sleep(t):
+        return None
+
+    reg = ProviderRegistry(client=client)
+    reg._nws = NWSProvider(client=client, sleeper=no_sleep)
+    reg.alert_poller = AlertPoller(reg._nws, states=["OK", "TX"], clock=Clock())
+    await reg.alert_poller.refresh()
+    # Inside the Dallas polygon, but the point's state could not be confirmed
+    assert [a["id"] for a in await reg.alerts(32.6, -97.0)] == ["remote"]
+    assert reg.alerts_remote == 1 and reg.alerts_local == 0
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from apps.api.main import app
+from apps.api.providers.nws import NWSProvider
+from apps.api.providers.nws_grid import duration_hours, expand_layer
+
+from _doubles import FakeResp
+
+
+GRID = {
+    "properties": {
+        "windSpeed": {"uom": "wmoUnit:km_h-1", "values": [
+            {"validTime": "2024-01-01T00:00:00+00:00/PT2H", "value": 16.09344},
+            {"validTime": "2024-01-01T02:00:00+00:00/PT1H", "value": 32.18688},
+        ]},
+        "windGust": {"uom": "wmoUnit:km_h-1", "values": [
+            {"validTime": "2024-01-01T00:00:00+00:00/PT3H", "value": None},
+        ]},
+        "probabilityOfPrecipitation": {"uom": "wmoUnit:percent", "values": [
+            {"validTime": "2024-01-01T00:00:00+00:00/PT3H", "value": 40},
+        ]},
+        "quantitativePrecipitation": {"uom": "wmoUnit:mm", "values": [
+            {"validTime": "2024-01-01T00:00:00+00:00/PT6H", "value": 15.24},
+        ]},
+    }
+}
+
+
+def test_duration_hours():
+    assert duration_hours("PT3H") == 3
+    assert duration_hours("P1DT6H") == 30
+    assert duration_hours("P2D") == 48
+    assert duration_hours("PT30M") == 1
+    assert duration_hours("bogus") == 1
+
+
+def test_expand_layer_repeats_and_spreads_accumulations():
+    times, values = expand_layer(GRID["properties"]["quantitativePrecipitation"], accumulated=True)
+    assert len(times) == 6
+    assert np.all(np.diff(times) == 3600)
+    assert np.allclose(values, 0.1)
+
+
+class RoutingClient:
+    async def get(self, url, params=None, headers=None):
+        if "/points/" in url:
+            return FakeResp({"properties": {
+                "forecastHourly": "https://api.weather.gov/gridpoints/FWD/80,108/forecast/hourly",
+                "forecastGridData": "https://api.weather.gov/gridpoints/FWD/80,108",
+            }})
+        return FakeResp(GRID)
+
+
+@pytest.mark.asyncio
+async def test_get_forecast_grid_aligns_layers(monkeypatch):
+    monkeypatch.setenv('NWS_USER_AGENT', 'BermudaBuddy/1.0 (test@example.com)')
+    frame = await NWSProvider(client=RoutingClient()).get_forecast_grid(32.8, -96.8)
+    rows = frame.to_rows()
+    assert len(rows) == 6
+    assert rows[0]["ts"] == "2024-01-01T00:00:00Z"
+    assert rows[1]["wind_mph"] == pytest.approx(10.0, abs=1e-4)
+    assert rows[2]["wind_mph"] == pytest.approx(20.0, abs=1e-4)
+    assert rows[3]["wind_mph"] is None
+    assert rows[0]["wind_gust_mph"] is None
+    assert rows[2]["precip_prob"] == pytest.approx(0.4)
+    assert rows[5]["precip_in"] == pytest.approx(0.1)
+
+
+def test_ok_to_spray_uses_grid_precip(monkeypatch):
+    async def fake_om(self, lat, lon, start, end):
+        return [
+            {"ts": "2024-01-01T00:00:00Z", "wind_mph": 1.0, "wind_gust_mph": 2.0, "precip_prob": 0.0, "precip_in": 0.0},
+            {"ts": "2024-01-01T01:00:00Z", "wind_mph": 1.0, "wind_gust_mph": 2.0, "precip_prob": 0.0, "precip_in": 0.0},
+        ]
+
+    from apps.api.providers import openmeteo
+    monkeypatch.setattr(openmeteo.OpenMeteoProvider, 'get_hourly', fake_om)
+    monkeypatch.setenv('NWS_USER_AGENT', 'BermudaBuddy/1.0 (test@example.com)')
+    real = NWSProvider.get_forecast_grid
+
+    async def fake_grid(self, lat, lon):
+        return await real(NWSProvider(client=RoutingClient()), lat, lon)
+
+    monkeypatch.setattr(NWSProvider, 'get_forecast_grid', fake_grid)
+    r = TestClient(app).get("/api/weather/ok-to-spray?lat=32.8&lon=-96.8&hours=2&wind_source=nws_grid")
+    assert r.status_code == 200
+    row = r.json()["table"][0]
+    assert row["wind_mph"] == pytest.approx(10.0, abs=1e-4)
+    assert row["wind_gust_mph"] == 2.0
+    assert row["precip_prob"] == pytest.approx(0.4)
+    assert row["provider"] == "NWS+OpenMeteo"
@@ -0,0 +1,98 @@
+import httpx
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import create_engine
+
+from apps.api.models import NWSGridpoint
+from apps.api.providers.nws import GridpointCache, NWSProvider
+from apps.api.services.fanout import within
+from apps.api.services.nws_gridpoints import SqlGridpointStore
+
+from _doubles import FakeResp
+
+
+POINT = {
+    "properties": {
+        "gridId": "FWD",
+        "gridX": 80,
+        "gridY": 108,
+        "forecastHourly": "https://api.weather.gov/gridpoints/FWD/80,108/forecast/hourly",
+        "forecastGridData": "https://api.weather.gov/gridpoints/FWD/80,108",
+        "forecastZone": "https://api.weather.gov/zones/forecast/TXZ119",
+        "county": "https://api.weather.gov/zones/county/TXC113",
+        "relativeLocation": {"properties": {"state": "TX"}},
+    }
+}
+HOURLY = {"properties": {"periods": [{"startTime": "2024-01-01T00:00:00-06:00", "windSpeed": "5 mph"}]}}
+
+
+class RoutingClient:
+    def __init__(self):
+        self.urls = []
+
+    async def get(self, url, params=None, headers=None):
+        self.urls.append(url)
+        return FakeResp(POINT if "/points/" in url else HOURLY)
+
+
+@pytest.fixture
+def nws_env(monkeypatch):
+    monkeypatch.setenv('NWS_USER_AGENT', 'BermudaBuddy/1.0 (test@example.com)')
+
+
+@pytest.mark.asyncio
+async def test_gridpoint_resolution_is_cached(nws_env):
+    client = RoutingClient()
+    nws = NWSProvider(client=client)
+    await nws.get_forecast_hourly(32.80001, -96.80001)
+    rows = await nws.get_forecast_hourly(32.80001, -96.80001)
+    assert rows[0]["wind_mph"] == 5.0
+    assert sum("/points/" in u for u in client.urls) == 1
+    assert client.urls[0] == "https://api.weather.gov/points/32.8000,-96.8000"
+
+
+@pytest.mark.asyncio
+async def test_gridpoint_store_survives_new_provider(nws_env):
+    eng = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    NWSGridpoint.__table__.create(eng)
+    store = SqlGridpointStore(bind=eng)
+
+    first = RoutingClient()
+    await NWSProvider(client=first, gridpoints=GridpointCache(store=store)).get_forecast_hourly(32.8, -96.8)
+
+    # Fresh process-local LRU, same persistent table: no /points round trip
+    second = RoutingClient()
+    nws = NWSProvider(client=second, gridpoints=GridpointCache(store=store))
+    await nws.get_forecast_hourly(32.8, -96.8)
+    assert second.urls == [POINT["properties"]["forecastHourly"]]
+    rec = await nws.resolve_point(32.8, -96.8)
+    assert rec["forecast_zone"] == "TXZ119" and rec["state"] == "TX"
+
+
+@pytest.mark.asyncio
+async def test_remapped_gridpoint_404_fails_fast_within_budget(nws_env):
+    stale = "https://api.weather.gov/gridpoints/FWD/79,108/forecast/hourly"
+    eng = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    NWSGridpoint.__table__.create(eng)
+    store = SqlGridpointStore(bind=eng)
+    await store.save("32.8000,-96.8000", {"forecast_hourly_url": stale, "grid_id": "FWD", "grid_x": 79, "grid_y": 108})
+
+    class RemappedClient(RoutingClient):
+        async def get(self, url, params=None, headers=None):
+            self.urls.append(url)
+            if url == stale:
+                return httpx.Response(404, request=httpx.Request("GET", url))
+            return FakeResp(POINT if "/points/" in url else HOURLY)
+
+    slept = []
+
+    async def fake_sleep(t):
+        slept.append(t)
+
+    client = RemappedClient()
+    nws = NWSProvider(client=client, sleeper=fake_sleep, gridpoints=GridpointCache(store=store))
+    rows, status = await within("nws", nws.get_forecast_hourly(32.8, -96.8), None)
+    assert status == "ok" and rows[0]["wind_mph"] == 5.0
+    # One 404, no backoff sleeps, and the persisted mapping now points at the new grid
+    assert client.urls.count(stale) == 1 and slept == []
+    assert (await store.load("32.8000,-96.8000"))["forecast_hourly_url"] == POINT["properties"]["forecastHourly"]
@@ -0,0 +1,51 @@
+import pytest
+
+from apps.api.providers.httpcache import HttpCache, freshness_lifetime
+from apps.api.providers.nws import NWSProvider
+
+from _doubles import Clock, FakeResp
+
+
+class ScriptedClient:
+    def __init__(self, responses):
+        self.responses = responses
+        self.sent_headers = []
+
+    async def get(self, url, params=None, headers=None):
+        self.sent_headers.append(headers)
+        return self.responses.pop(0)
+
+
+def test_freshness_lifetime_parsing():
+    assert freshness_lifetime({"Cache-Control": "public, max-age=300, s-maxage=120"}) == 120
+    assert freshness_lifetime({"cache-control": "max-age=300", "age": "100"}) == 200
+    assert freshness_lifetime({"cache-control": "no-store"}) is None
+    assert freshness_lifetime({
+        "date": "Mon, 01 Jan 2024 00:00:00 GMT",
+        "expires": "Mon, 01 Jan 2024 00:10:00 GMT",
+    }) == 600
+
+
+@pytest.mark.asyncio
+async def test_nws_serves_fresh_then_revalidates_with_304(monkeypatch):
+    monkeypatch.setenv('NWS_USER_AGENT', 'BermudaBuddy/1.0 (test@example.com)')
+    body = {"features": [{"id": "a1", "properties": {"event": "Heat Advisory"}}]}
+    client = ScriptedClient([
+        FakeResp(body, 200, {"ETag": '"v1"', "Cache-Control": "max-age=30"}),
+        FakeResp(None, 304, {"Cache-Control": "max-age=30"}),
+    ])
+    clock = Clock(1_000.0)
+    nws = NWSProvider(client=client, http_cache=HttpCache(clock=clock))
+
+    first = await nws.get_alerts(32.8, -96.8)
+    # Within max-age: no upstream call at all
+    again = await nws.get_alerts(32.8, -96.8)
+    assert len(client.sent_headers) == 1
+    assert client.sent_headers[0]["User-Agent"] == "BermudaBuddy/1.0 (test@example.com)"
+    assert again == first
+
+    clock.now += 60
+    revalidated = await nws.get_alerts(32.8, -96.8)
+    assert client.sent_headers[1]["If-None-Match"] == '"v1"'
+    assert revalidated[0]["event"] == "Heat Advisory"
+    assert nws.http_cache.stats()["revalidated"] == 1
@@ -22,7 +22,7 @@ class FakeClient:
         self._responses = responses
         self.calls = []
 
-    async def get(self, url, params=None):
+    async def get(self, url, params=None, headers=None):
         self.calls.append((url, params))
         if not self._responses:
             return FakeResp(200, {"features": []})
@@ -1,4 +1,6 @@
-from apps.api.services.ok_to_spray import ok_to_spray_hour
+import numpy as np
+
+from apps.api.services.ok_to_spray import ok_to_spray_hour, ruleset_for_recipe
 
 
 def test_ok_rules_all_ok():
@@ -18,3 +20,26 @@ def test_ok_rules_not_ok():
     assert status == 'NOT_OK'
     assert list(rules.values()).count(False) >= 2
 
+
+def test_rainfast_lookahead_over_many_locations():
+    rs = ruleset_for_recipe({"name": "Test", "rates": {"rainfast_hours": 2.5}})
+    assert rs.lookahead == 2
+    prob = np.zeros((2, 6))
+    prob[0, 4] = 0.6  # rain at hour 4 for the first location only
+    cols = {"wind_mph": np.full((2, 6), 5.0), "wind_gust_mph": np.full((2, 6), np.nan), "precip_prob": prob, "precip_in": np.zeros((2, 6))}
+    status, rules = rs.evaluate(cols)
+    assert rules["rain"][0].tolist() == [True, True, False, False, False, False]
+    # The last hours' rainfast windows run past the forecast: unknown, not dry
+    assert status[1].tolist() == ["OK"] * 4 + ["CAUTION"] * 2
+
+
+def test_rainfast_lookahead_sees_rain_past_the_table():
+    rs = ruleset_for_recipe({"name": "Test", "rates": {"rainfast_hours": 3}})
+    prob = np.zeros(8)
+    prob[6] = 0.6  # rain lands just after a 6-hour table
+    cols = {"wind_mph": np.full(8, 5.0), "precip_prob": prob}
+    _, rules = rs.evaluate(cols)
+    assert rules["rain"][:6].tolist() == [True, True, True, True, False, False]
+    # Cut at the table edge the same hours are unknown rather than dry
+    _, rules = rs.evaluate({k: v[:6] for k, v in cols.items()})
+    assert rules["rain"].tolist() == [True, True, True, True, False, False]
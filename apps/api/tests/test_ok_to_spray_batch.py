@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from apps.api.main import app
+from apps.api.providers.openmeteo import OpenMeteoProvider
+from apps.api.providers.registry import ProviderRegistry
+
+from _doubles import FakeResp
+
+
+class MultiClient:
+    """Answers multi-coordinate requests with one hourly object per location."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def get(self, url, params=None):
+        self.calls.append(params)
+        lats = str(params["latitude"]).split(",")
+        now = datetime.strptime(params["start_hour"], "%Y-%m-%dT%H:%M")
+        items = []
+        for i, _ in enumerate(lats):
+            items.append({
+                "hourly": {
+                    "time": [(now + timedelta(hours=h)).isoformat() for h in range(48)],
+                    "wind_speed_10m": [5.0 + i] * 48,
+                    "wind_gusts_10m": [8.0] * 48,
+                    "precipitation_probability": [0] * 48,
+                    "precipitation": [0.0] * 48,
+                }
+            })
+        return FakeResp(items if len(items) > 1 else items[0])
+
+
+@pytest.mark.asyncio
+async def test_get_hourly_many_chunks_and_dedups_cells():
+    client = MultiClient()
+    prov = OpenMeteoProvider(client=client, chunk_size=2)
+    start = datetime(2024, 1, 1, 12)
+    # Two properties share a grid cell; three distinct cells -> two chunked requests
+    points = [(32.78, -96.80), (32.7805, -96.8004), (33.20, -97.10), (35.50, -97.40)]
+    frames = await prov.get_hourly_many(points, start, start + timedelta(hours=6))
+    assert len(client.calls) == 2
+    assert sorted(len(str(c["latitude"]).split(",")) for c in client.calls) == [1, 2]
+    assert [len(f) for f in frames] == [6, 6, 6, 6]
+    assert frames[0][0]["wind_mph"] == frames[1][0]["wind_mph"]
+
+    # Everything is cached now, including for single-point lookups
+    await prov.get_hourly(35.50, -97.40, start, start + timedelta(hours=2))
+    await prov.get_hourly_many(points, start, start + timedelta(hours=3))
+    assert len(client.calls) == 2
+
+
+def test_batch_endpoint_scores_every_location(monkeypatch):
+    monkeypatch.setattr(app.state, "providers", ProviderRegistry(client=MultiClient()), raising=False)
+    client = TestClient(app)
+    r = client.post("/api/weather/ok-to-spray/batch", json={
+        "hours": 4,
+        "locations": [{"id": "a", "lat": 32.78, "lon": -96.80}, {"id": "b", "lat": 35.5, "lon": -97.4}],
+    })
+    assert r.status_code == 200
+    results = r.json()["results"]
+    assert [x["id"] for x in results] == ["a", "b"]
+    assert all(len(x["table"]) == 4 for x in results)
+    assert results[0]["table"][0]["status"] == "OK"
+    assert results[0]["ok_window"] is not None
@@ -1,3 +1,4 @@
+import pytest
 from fastapi.testclient import TestClient
 from apps.api.main import app  # type: ignore
 
@@ -24,3 +25,33 @@ def test_ok_to_spray_endpoint(monkeypatch):
     assert len(data["table"]) == 3
     assert data["table"][0]["status"] == "OK"
     assert data["ok_window"] == {"start": "2024-01-01T00:00:00Z", "end": "2024-01-01T01:00:00Z"}
+
+
+def test_ok_to_spray_product_rainfast(monkeypatch):
+    from apps.api.services.ok_to_spray import ruleset_for_recipe
+    from apps.api import main
+
+    async def fake_om(self, lat, lon, start, end):
+        return [
+            {"ts": f"2024-01-01T0{i}:00:00Z", "wind_mph": 5.0, "wind_gust_mph": 8.0, "precip_prob": 0.9 if i == 3 else 0.0, "precip_in": 0.0}
+            for i in range(5)
+        ]
+
+    from apps.api.providers import openmeteo
+    monkeypatch.setattr(openmeteo.OpenMeteoProvider, 'get_hourly', fake_om)
+    monkeypatch.setattr(main, '_spray_ruleset', lambda product: ruleset_for_recipe({"name": "Slowdry", "rates": {"rainfast_hours": 3}}))
+    r = TestClient(app).get("/api/weather/ok-to-spray?lat=32.8&lon=-96.8&hours=2&product=slowdry")
+    data = r.json()
+    assert data["product"] == "Slowdry"
+    # Rain at hour 3 falls inside the 3-hour rainfast window of hours 1 and 2
+    assert [row["rules"]["rain"] for row in data["table"]] == [True, False]
+    assert len(data["table"]) == 2
+
+
+def test_spray_ruleset_resolves_recipes():
+    from fastapi import HTTPException
+    from apps.api.main import _spray_ruleset
+
+    assert _spray_ruleset("primo").name == "Primo MAXX"
+    with pytest.raises(HTTPException):
+        _spray_ruleset("nosuchthing")
@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from apps.api.main import app
+from apps.api.providers import openmeteo
+from apps.api.providers.openmeteo import OpenMeteoProvider
+from apps.api.providers.registry import ProviderRegistry
+
+from _doubles import Clock, FakeResp
+
+
+class FlakyClient:
+    """Fails until ``healthy`` is set, then answers with 7 mph wind."""
+
+    def __init__(self):
+        self.calls = 0
+        self.healthy = False
+
+    async def get(self, url, params=None):
+        self.calls += 1
+        if not self.healthy:
+            raise RuntimeError("upstream down")
+        start = datetime.strptime(params["start_hour"], "%Y-%m-%dT%H:%M")
+        return FakeResp({"hourly": {
+            "time": [(start + timedelta(hours=i)).isoformat() for i in range(48)],
+            "wind_speed_10m": [7.0] * 48,
+        }})
+
+
+def _provider(client):
+    prov = OpenMeteoProvider(client=client)
+    prov.cache.clock = Clock()
+    return prov
+
+
+@pytest.mark.asyncio
+async def test_failure_is_not_cached_as_forecast(monkeypatch):
+    monkeypatch.setattr(openmeteo.random, "uniform", lambda a, b: 1.0)
+    client = FlakyClient()
+    prov = _provider(client)
+    start = datetime(2024, 1, 1, 12)
+    end = start + timedelta(hours=2)
+
+    first = await prov.get_hourly(32.8, -96.8, start, end)
+    assert first.degraded
+    assert len(prov.cache) == 0
+
+    # Inside the negative TTL the failure is answered locally
+    await prov.get_hourly(32.8, -96.8, start, end)
+    assert client.calls == 1
+
+    prov.cache.clock.now = 31
+    client.healthy = True
+    rows = await prov.get_hourly(32.8, -96.8, start, end)
+    assert client.calls == 2
+    assert not rows.degraded
+    assert rows[0]["wind_mph"] == 7.0
+    assert len(prov.failures) == 0
+
+
+@pytest.mark.asyncio
+async def test_consecutive_failures_back_off(monkeypatch):
+    monkeypatch.setattr(openmeteo.random, "uniform", lambda a, b: 1.0)
+    client = FlakyClient()
+    prov = _provider(client)
+    start = datetime(2024, 1, 1, 12)
+    end = start + timedelta(hours=2)
+    key = prov.series_key(32.8, -96.8, start)
+
+    await prov.get_hourly(32.8, -96.8, start, end)
+    assert prov.failures[key] == (30.0, 1)
+    prov.cache.clock.now = 31
+    await prov.get_hourly(32.8, -96.8, start, end)
+    assert prov.failures[key] == (91.0, 2)
+    prov.cache.clock.now = 60
+    await prov.get_hourly(32.8, -96.8, start, end)
+    assert client.calls == 2
+
+
+def test_negative_ttl_is_jittered():
+    prov = _provider(FlakyClient())
+    prov._record_failure([f"k{i}" for i in range(20)])
+    holds = {prov.failures[f"k{i}"][0] for i in range(20)}
+    assert len(holds) > 1
+    assert all(24.0 <= h <= 36.0 for h in holds)
+
+
+def test_ok_to_spray_reports_degraded(monkeypatch):
+    monkeypatch.setattr(app.state, "providers", ProviderRegistry(client=FlakyClient()), raising=False)
+    client = TestClient(app)
+    r = client.get("/api/weather/ok-to-spray?lat=32.8&lon=-96.8&hours=2")
+    assert r.status_code == 200
+    assert r.json()["source"]["degraded"] is True
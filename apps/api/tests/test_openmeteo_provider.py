@@ -3,7 +3,7 @@ from datetime import datetime, timedelta
 
 import pytest
 
-from apps.api.providers.openmeteo import OpenMeteoProvider
+from apps.api.providers.openmeteo import OpenMeteoProvider, snap_to_grid
 
 
 class FakeResp:
@@ -50,3 +50,32 @@ async def test_openmeteo_normalizes_rows():
     assert round(rows[1]['soil_temp_f'], 1) == 53.6
     # 1.27mm -> 0.05in
     assert round(rows[0]['et0_in'], 2) == 0.05
+
+
+class CountingClient(FakeClient):
+    def __init__(self):
+        self.calls = []
+
+    async def get(self, url, params=None):
+        self.calls.append(params)
+        return await super().get(url, params)
+
+
+def test_snap_to_grid_shares_cell_for_nearby_points():
+    assert snap_to_grid(32.7801, -96.8002) == snap_to_grid(32.7812, -96.8011)
+    assert snap_to_grid(32.78, -96.80) != snap_to_grid(32.90, -96.80)
+
+
+@pytest.mark.asyncio
+async def test_openmeteo_nearby_points_and_windows_share_one_fetch():
+    client = CountingClient()
+    prov = OpenMeteoProvider(client=client)
+    start = datetime(2024, 1, 1, 0, 0, 5)
+    rows_a = await prov.get_hourly(32.7801, -96.8002, start, start + timedelta(hours=3))
+    later = start + timedelta(seconds=40)
+    rows_b = await prov.get_hourly(32.7812, -96.8011, later, later + timedelta(hours=2))
+    assert len(client.calls) == 1
+    assert len(rows_a) == 3 and len(rows_b) == 2
+    assert rows_b[0]['ts'] == rows_a[0]['ts']
+    # Upstream is queried at the snapped cell center, not the raw property coordinate
+    assert (client.calls[0]['latitude'], client.calls[0]['longitude']) == snap_to_grid(32.7801, -96.8002)
@@ -1,10 +1,10 @@
 from fastapi.testclient import TestClient
 from sqlmodel import create_engine, Session
-from apps.api.main import app
+from apps.api.main import app, get_db_session
 from apps.api.models import Property as DBProperty
 
 
-def test_pgr_apply_sets_date(tmp_path):
+def test_pgr_apply_sets_date(tmp_path, monkeypatch):
     # Create a temporary sqlite and inject via monkeypatch-like approach: direct session
     engine = create_engine(f"sqlite:///{tmp_path}/pgr.db", connect_args={"check_same_thread": False})
     with Session(engine) as s:
@@ -14,8 +14,13 @@ def test_pgr_apply_sets_date(tmp_path):
         s.commit()
         s.refresh(p)
 
+    def override_session():
+        with Session(engine) as s:
+            yield s
+
+    monkeypatch.setitem(app.dependency_overrides, get_db_session, override_session)
     client = TestClient(app)
-    # This hits the real engine (Postgres) in app; we only assert route exists and format.
+    # Requests go to the temporary sqlite engine; we only assert route exists and format.
     # For isolation, we skip a full integration and just ensure 404 on non-existent property is clear.
     r = client.post('/api/pgr/apply', json={"property_id": 999999, "model": "gdd10"})
     assert r.status_code in (200, 404)
@@ -0,0 +1,133 @@
+import asyncio
+from datetime import date, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, create_engine
+
+from apps.api.models import GddDaily, PgrDueDate, Property as DBProperty
+from apps.api.providers.openmeteo import OpenMeteoProvider
+from apps.api.services.gdd import SqlGddStore
+from apps.api.services.pgr_due import compute_due_dates, project_cell, targets_from_recipes
+
+from _doubles import FakeResp
+
+
+TODAY = date(2024, 6, 1)
+
+
+def _series(start, days, mean):
+    return [((start + timedelta(days=i)).isoformat(), mean + 5, mean - 5) for i in range(days)]
+
+
+class MultiDailyClient:
+    """Every location averages 20 °C; one response entry per requested coordinate."""
+
+    def __init__(self):
+        self.calls = 0
+        self.past_days = []
+
+    async def get(self, url, params=None):
+        self.calls += 1
+        self.past_days.append(params["past_days"])
+        n = len(params["latitude"].split(","))
+        rows = _series(TODAY - timedelta(days=params["past_days"]), params["past_days"] + params["forecast_days"], 20.0)
+        daily = {
+            "time": [r[0] for r in rows],
+            "temperature_2m_max": [r[1] for r in rows],
+            "temperature_2m_min": [r[2] for r in rows],
+        }
+        payload = [{"daily": daily} for _ in range(n)]
+        return FakeResp(payload if n > 1 else payload[0])
+
+    async def aclose(self):
+        pass
+
+
+def test_project_cell_due_dates():
+    days = _series(date(2024, 5, 1), 40, 20.0)  # gdd10 = 10/day, gdd0 = 20/day
+    members = [
+        (1, "gdd10", "2024-05-21", "2024-05-20", 0.0, None),
+        (2, "gdd0", "2024-04-01", "2024-03-31", 0.0, None),
+        # Stored totals already cover 2024-05-15 .. 2024-05-30 with 160 GDD
+        (3, "gdd10", "2024-05-15", "2024-05-30", 160.0, None),
+        (4, "gdd10", "2024-05-01", "2024-05-31", 230.0, "2024-05-28"),
+    ]
+    rows = project_cell(days, members, {"gdd10": 200, "gdd0": 200}, TODAY)
+    by_pid = {r["property_id"]: r for r in rows}
+    # 2024-05-21 .. 2024-06-01 inclusive is 12 days; 200 reached on the 20th day
+    assert by_pid[1]["gdd_to_date"] == 120.0
+    assert by_pid[1]["due_date"] == "2024-06-09"
+    assert not by_pid[1]["history_truncated"]
+    # Application predates the series: counted from the first available day
+    assert by_pid[2]["history_truncated"]
+    assert by_pid[2]["due_date"] == "2024-05-10"
+    # Stored 160 + two series days; the remaining 40 is reached on the fourth
+    assert by_pid[3]["gdd_to_date"] == 180.0
+    assert by_pid[3]["due_date"] == "2024-06-03"
+    assert not by_pid[3]["history_truncated"]
+    # Target already passed in the stored history
+    assert by_pid[4]["due_date"] == "2024-05-28"
+
+    short = project_cell(days[:10], [(3, "gdd10", "2024-05-05", "2024-05-04", 0.0, None)], {"gdd10": 500}, TODAY)
+    assert short[0]["due_date"] is None
+
+
+def test_targets_from_recipes():
+    targets = targets_from_recipes("data/label_recipes")
+    assert targets["gdd10"] == 200.0
+    assert targets["gdd0"] == 200.0
+
+
+def test_compute_due_dates_groups_by_cell_and_upserts():
+    eng = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    DBProperty.__table__.create(eng)
+    PgrDueDate.__table__.create(eng)
+    GddDaily.__table__.create(eng)
+    with Session(eng) as s:
+        # Two neighbours share one grid cell; the third has no PGR history and is skipped
+        s.add(DBProperty(address="a", lat=32.90, lon=-97.00, pgr_last_gdd10="2024-05-21"))
+        s.add(DBProperty(address="b", lat=32.901, lon=-97.001, pgr_last_gdd0="2024-05-25", pgr_last_gdd10="2024-05-25"))
+        s.add(DBProperty(address="c", lat=35.5, lon=-97.5))
+        s.commit()
+
+    client = MultiDailyClient()
+    provider = OpenMeteoProvider(client=client)
+    summary = compute_due_dates(bind=eng, today=TODAY, provider=provider, data_dir="data/label_recipes")
+    assert summary["cells"] == 1 and summary["rows"] == 3
+    assert client.calls == 1
+
+    # Re-running replaces rows instead of duplicating them
+    compute_due_dates(bind=eng, today=TODAY, provider=provider, data_dir="data/label_recipes")
+    with eng.connect() as conn:
+        rows = conn.execute(text("SELECT property_id, model, due_date FROM pgr_due_dates ORDER BY property_id, model")).all()
+    assert [(r[0], r[1], str(r[2])) for r in rows] == [
+        (1, "gdd10", "2024-06-09"),
+        (2, "gdd0", "2024-06-03"),
+        (2, "gdd10", "2024-06-13"),
+    ]
+
+
+def test_compute_due_dates_continues_from_stored_totals():
+    eng = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    DBProperty.__table__.create(eng)
+    PgrDueDate.__table__.create(eng)
+    GddDaily.__table__.create(eng)
+    with Session(eng) as s:
+        s.add(DBProperty(address="a", lat=32.90, lon=-97.00, pgr_last_gdd10="2024-02-01"))
+        s.commit()
+    # Four months of stored history at 12 GDD/day (mean 22 °C) through yesterday
+    store = SqlGddStore(bind=eng)
+    asyncio.run(store.ingest(1, _series(date(2024, 1, 20), 133, 22.0)))
+
+    client = MultiDailyClient()
+    compute_due_dates(bind=eng, today=TODAY, provider=OpenMeteoProvider(client=client), data_dir="data/label_recipes")
+    # Only the days after the stored totals are fetched
+    assert client.past_days == [0]
+    with eng.connect() as conn:
+        row = conn.execute(text("SELECT gdd_to_date, due_date, history_truncated FROM pgr_due_dates")).one()
+    # 2024-02-01 .. 2024-05-31 is 121 stored days x 12, then today's 10 from upstream
+    assert row[0] == 1462.0
+    # 200 at 12/day is reached on the 17th stored day
+    assert str(row[1]) == "2024-02-17"
+    assert not row[2]
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from apps.api.main import app, providers
+from apps.api.providers.registry import ProviderRegistry
+
+from _doubles import FakeResp
+
+
+class CountingClient:
+    def __init__(self):
+        self.calls = 0
+
+    async def get(self, url, params=None):
+        self.calls += 1
+        now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        return FakeResp({
+            "hourly": {
+                "time": [(now + timedelta(hours=i)).isoformat() + 'Z' for i in range(48)],
+                "wind_speed_10m": [5.0] * 48,
+                "wind_gusts_10m": [8.0] * 48,
+                "precipitation_probability": [0] * 48,
+                "precipitation": [0.0] * 48,
+            }
+        })
+
+
+def test_registry_is_reused_across_requests(monkeypatch):
+    fake = CountingClient()
+    reg = ProviderRegistry(client=fake)
+    monkeypatch.setattr(app.state, "providers", reg, raising=False)
+    assert providers() is reg
+
+    client = TestClient(app)
+    r1 = client.get("/api/weather/summary?lat=32.8&lon=-96.8&hours=3")
+    r2 = client.get("/api/weather/summary?lat=32.8&lon=-96.8&hours=3")
+    assert r1.status_code == 200 and r2.status_code == 200
+    assert providers().openmeteo is reg.openmeteo
+    # The second request is served from the registry-owned cache
+    assert fake.calls == 1
+
+
+def test_nws_shares_the_registry_client(monkeypatch):
+    monkeypatch.setenv('NWS_USER_AGENT', 'BermudaBuddy/1.0 (test@example.com)')
+    fake = CountingClient()
+    reg = ProviderRegistry(client=fake)
+    assert reg.nws().client is fake
+    assert reg.nws().headers["User-Agent"] == 'BermudaBuddy/1.0 (test@example.com)'
@@ -0,0 +1,34 @@
+from sqlalchemy import inspect
+from sqlalchemy.pool import StaticPool
+from sqlmodel import create_engine
+from fastapi.testclient import TestClient
+
+from apps.api import db
+from apps.api.db import bootstrap_schema
+from apps.api.main import app
+
+
+def test_bootstrap_creates_sqlite_tables_once():
+    eng = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    created = bootstrap_schema(eng)
+    for name in ("properties", "polygons", "labels", "applications", "gdd_daily"):
+        assert name in created
+    # PostGIS-backed tables are left to Alembic
+    assert "stations" not in created and "station_observations" not in created
+    cols = {c["name"] for c in inspect(eng).get_columns("applications")}
+    assert {"batch_id", "weather_snapshot", "gdd_model"} <= cols
+    assert bootstrap_schema(eng) == []
+
+
+def test_lifespan_bootstraps_configured_sqlite(tmp_path, monkeypatch):
+    path = tmp_path / "dev.db"
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{path}")
+    monkeypatch.delenv("NWS_USER_AGENT", raising=False)
+    monkeypatch.setattr(db, "_engine", None)
+    try:
+        with TestClient(app) as client:
+            assert client.get("/healthz").status_code == 200
+            assert "properties" in inspect(db.engine()).get_table_names()
+    finally:
+        if db._engine is not None:
+            db._engine.dispose()
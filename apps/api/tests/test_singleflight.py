@@ -0,0 +1,75 @@
+import asyncio
+import gc
+from datetime import datetime, timedelta
+
+import pytest
+
+from apps.api.providers.nws import NWSProvider
+from apps.api.providers.openmeteo import OpenMeteoProvider
+from apps.api.providers.singleflight import SingleFlight
+
+from _doubles import FakeResp
+
+
+class SlowClient:
+    def __init__(self, payload):
+        self.payload = payload
+        self.calls = 0
+
+    async def get(self, url, params=None, headers=None):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return FakeResp(self.payload)
+
+
+@pytest.mark.asyncio
+async def test_singleflight_counts_and_propagates_errors():
+    sf = SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    results = await asyncio.gather(*(sf.do("k", boom) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert sf.stats() == {"originated": 1, "coalesced": 2, "inflight": 0}
+
+
+@pytest.mark.asyncio
+async def test_abandoned_flight_failure_is_retrieved():
+    unhandled = []
+    asyncio.get_running_loop().set_exception_handler(lambda loop, ctx: unhandled.append(ctx))
+    sf = SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.02)
+        raise RuntimeError("upstream down")
+
+    # The only waiter gives up; the shared task still fails later
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(sf.do("k", boom), 0.001)
+    await asyncio.sleep(0.05)
+    gc.collect()
+    assert unhandled == []
+
+
+@pytest.mark.asyncio
+async def test_openmeteo_concurrent_misses_share_one_fetch():
+    start = datetime(2024, 1, 1)
+    client = SlowClient({"hourly": {"time": [(start + timedelta(hours=i)).isoformat() for i in range(48)]}})
+    prov = OpenMeteoProvider(client=client)
+    results = await asyncio.gather(*(prov.get_hourly(32.8, -96.8, start, start + timedelta(hours=6)) for _ in range(10)))
+    assert client.calls == 1
+    assert all(len(r) == 6 for r in results)
+    assert prov.flight.coalesced == 9
+
+
+@pytest.mark.asyncio
+async def test_nws_concurrent_alert_requests_share_one_fetch(monkeypatch):
+    monkeypatch.setenv('NWS_USER_AGENT', 'BermudaBuddy/1.0 (test@example.com)')
+    client = SlowClient({"features": [{"id": "a1", "properties": {"event": "Wind Advisory"}}]})
+    nws = NWSProvider(client=client)
+    results = await asyncio.gather(*(nws.get_alerts(32.8, -96.8) for _ in range(5)))
+    assert client.calls == 1
+    assert all(r[0]["event"] == "Wind Advisory" for r in results)
+    assert nws.flight.stats()["coalesced"] == 4
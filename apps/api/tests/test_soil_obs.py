@@ -0,0 +1,116 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.pool import StaticPool
+from sqlmodel import create_engine
+
+from apps.api.main import app
+from apps.api.models import StationObservation
+from apps.api.providers import openmeteo
+from apps.api.services.soil_obs import FEEDS, SqlObservationStore, parse_feed, read_lines
+from apps.api.services.station_index import StationDirectory
+
+
+def _engine():
+    eng = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with eng.begin() as conn:
+        # Minimal stations table (the real one needs PostGIS)
+        conn.execute(text("CREATE TABLE stations (id INTEGER PRIMARY KEY, provider TEXT, metadata_json TEXT)"))
+        conn.execute(text("INSERT INTO stations VALUES (1, 'OK_MESONET', :m)"), {"m": json.dumps({"site_id": "okce"})})
+        conn.execute(text("INSERT INTO stations VALUES (2, 'TEX_MESONET', :m)"), {"m": json.dumps({"site_id": "kdal"})})
+    StationObservation.__table__.create(eng)
+    return eng
+
+
+def _ok_csv(tmp_path, now):
+    lines = ["STID,TIME,TAIR,TS05,TS10"]
+    for i, (ts05, ts10) in enumerate([(20.0, 19.0), (21.0, -996), (22.0, 19.5)]):
+        t = (now - timedelta(minutes=10 * (2 - i))).strftime("%Y-%m-%dT%H:%M:%SZ")
+        lines.append(f"OKCE,{t},25.0,{ts05},{ts10}")
+    lines.append(f"NOPE,{now:%Y-%m-%dT%H:%M:%SZ},25.0,30.0,30.0")
+    path = tmp_path / "okmesonet.csv"
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+def test_parse_feed_converts_and_skips_missing():
+    lines = [
+        "Station_ID,Date_Time,Soil_Temp_2in,Soil_Temp_4in",
+        "KDAL,2024-05-01 12:00,68.5,",
+        "KDAL,not-a-time,70,70",
+    ]
+    rows = list(parse_feed(lines, FEEDS["TEX_MESONET"], {"kdal": 2}))
+    assert rows == [(2, datetime(2024, 5, 1, 12, tzinfo=timezone.utc), 2, 68.5)]
+
+    ok = list(parse_feed(["STID,TIME,TS05,TS10", "OKCE,2024-05-01T12:00:00Z,20.0,-999"], FEEDS["OK_MESONET"], {"okce": 1}))
+    assert ok == [(1, datetime(2024, 5, 1, 12, tzinfo=timezone.utc), 2, 68.0)]
+
+
+@pytest.mark.asyncio
+async def test_ingest_local_file_and_latest(tmp_path):
+    now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    store = SqlObservationStore(bind=_engine())
+    path = _ok_csv(tmp_path, now)
+    assert store.ingest("OK_MESONET", read_lines(path)) == 5
+    # Overlapping feed documents don't duplicate rows
+    assert store.ingest("OK_MESONET", read_lines(path)) == 0
+
+    latest = await store.latest(1)
+    assert latest["depth_2in_f"] == 71.6  # 22 °C, newest reading
+    assert latest["depth_4in_f"] == 67.1  # 19.5 °C
+    assert latest["observed_at"].startswith(now.strftime("%Y-%m-%dT%H:%M"))
+    assert await store.latest(2) is None
+
+
+def test_summary_reports_station_soil_temps(monkeypatch):
+    async def fake_station(self, lat, lon):
+        return {"id": 1, "provider": "OK_MESONET", "name": "OKC East", "lat": 35.5, "lon": -97.4, "state": "OK", "has_soil_temp": True}
+
+    async def fake_latest(self, station_id, max_age_h=6.0):
+        return {"station_id": station_id, "depth_2in_f": 71.6, "depth_4in_f": 67.1, "observed_at": "2024-05-01T12:00:00+00:00"}
+
+    async def fake_get_hourly(self, lat, lon, start, end):
+        return []
+
+    monkeypatch.delenv("NWS_USER_AGENT", raising=False)
+    monkeypatch.setattr(StationDirectory, "nearest", fake_station)
+    monkeypatch.setattr(SqlObservationStore, "latest", fake_latest)
+    monkeypatch.setattr(openmeteo.OpenMeteoProvider, "get_hourly", fake_get_hourly)
+
+    r = TestClient(app).get("/api/weather/summary?lat=35.5&lon=-97.4")
+    assert r.status_code == 200
+    assert r.json()["soil"]["depth_2in_f"] == 71.6
+
+
+def test_summary_reads_soil_while_forecast_is_in_flight(monkeypatch):
+    soil_read = asyncio.Event()
+    seen = {}
+
+    async def fake_station(self, lat, lon):
+        return {"id": 1, "provider": "OK_MESONET", "name": "OKC East", "lat": 35.5, "lon": -97.4, "state": "OK", "has_soil_temp": True}
+
+    async def fake_latest(self, station_id, max_age_h=6.0):
+        soil_read.set()
+        return {"station_id": station_id, "depth_2in_f": 71.6, "depth_4in_f": 67.1, "observed_at": "2024-05-01T12:00:00+00:00"}
+
+    async def slow_get_hourly(self, lat, lon, start, end):
+        # Finishes only once the soil read has happened alongside it
+        try:
+            await asyncio.wait_for(soil_read.wait(), 1.0)
+            seen["overlapped"] = True
+        except asyncio.TimeoutError:
+            seen["overlapped"] = False
+        return []
+
+    monkeypatch.delenv("NWS_USER_AGENT", raising=False)
+    monkeypatch.setattr(StationDirectory, "nearest", fake_station)
+    monkeypatch.setattr(SqlObservationStore, "latest", fake_latest)
+    monkeypatch.setattr(openmeteo.OpenMeteoProvider, "get_hourly", slow_get_hourly)
+
+    r = TestClient(app).get("/api/weather/summary?lat=35.5&lon=-97.4")
+    assert r.status_code == 200 and r.json()["soil"]["depth_4in_f"] == 67.1
+    assert seen["overlapped"] is True
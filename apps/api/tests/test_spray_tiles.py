@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.pool import StaticPool
+from sqlmodel import create_engine
+
+from apps.api.main import app
+from apps.api.models import SprayTile
+from apps.api.providers.openmeteo import OpenMeteoProvider
+from apps.api.providers.registry import ProviderRegistry
+from apps.api.services.spray_tiles import SqlTileStore, TileCache, compute_tile, parse_regions
+
+from _doubles import FakeResp
+
+
+class GridClient:
+    """Wind rises with longitude so each tile column is distinguishable."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def get(self, url, params=None):
+        self.calls += 1
+        lons = [float(x) for x in str(params["longitude"]).split(",")]
+        start = datetime.strptime(params["start_hour"], "%Y-%m-%dT%H:%M")
+        items = [{"hourly": {
+            "time": [(start + timedelta(hours=h)).isoformat() for h in range(48)],
+            "wind_speed_10m": [round(lon + 100, 2) * 4] * 48,
+            "precipitation_probability": [0] * 48,
+            "precipitation": [0.0] * 48,
+        }} for lon in lons]
+        return FakeResp(items if len(items) > 1 else items[0])
+
+
+REGION = (32.70, -98.79, 32.76, -98.73)  # 3 x 3 points on the 0.03 deg grid
+
+
+def test_parse_regions():
+    assert parse_regions("a:1,2,3,4; bad ;b:5,6,7,8") == {"a": (1.0, 2.0, 3.0, 4.0), "b": (5.0, 6.0, 7.0, 8.0)}
+
+
+@pytest.mark.asyncio
+async def test_compute_tile_and_round_trip():
+    start = datetime(2024, 1, 1, 12)
+    tile = await compute_tile("test", REGION, OpenMeteoProvider(client=GridClient()), start=start)
+    assert tile.status.shape == (48, 3, 3)
+    assert tile.columns["wind_mph"][0, 0].tolist() == pytest.approx([4.84, 4.96, 5.08], abs=1e-4)
+    assert (tile.rules == 0b111).all() and (tile.status == 0).all()
+
+    eng = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SprayTile.__table__.create(eng)
+    store = SqlTileStore(bind=eng)
+    await store.save(tile)
+    (loaded,) = await store.load_latest()
+    assert loaded.region == "test" and loaded.rule_names == ["wind", "gust", "rain"]
+    frame = loaded.forecast(32.731, -98.765, start + timedelta(hours=1, minutes=20), 6)
+    assert len(frame) == 6
+    assert frame[0]["ts"] == "2024-01-01T13:00:00Z"
+    assert frame[0]["wind_mph"] == pytest.approx(4.96, abs=1e-4)
+    assert loaded.forecast(33.5, -98.77, start, 6) is None
+    assert loaded.forecast(32.73, -98.77, start + timedelta(hours=45), 6) is None
+
+
+@pytest.mark.asyncio
+async def test_tile_points_align_to_the_forecast_grid():
+    # Off-grid bounds and step snap to 0.03 deg multiples, like live requests do
+    tile = await compute_tile("test", (32.71, -98.80, 32.77, -98.74), OpenMeteoProvider(client=GridClient()), step=0.05)
+    assert (tile.south, tile.west, tile.step) == (32.70, -98.79, 0.06)
+    assert tile.shape == (2, 2)
+    assert tile.cell(32.761, -98.725) == (1, 1)
+    # Snaps to a 0.03 cell between tile points: not covered
+    assert tile.cell(32.73, -98.76) is None
+
+
+def test_point_endpoint_answers_from_tile(monkeypatch):
+    import asyncio
+
+    async def no_live(self, lat, lon, start, end):
+        raise AssertionError("live Open-Meteo call")
+
+    tile = asyncio.run(compute_tile("test", REGION, OpenMeteoProvider(client=GridClient())))
+    reg = ProviderRegistry(client=GridClient())
+    reg.tiles = TileCache()
+    reg.tiles.put(tile)
+    monkeypatch.setattr(app.state, "providers", reg, raising=False)
+    monkeypatch.setattr(OpenMeteoProvider, "get_hourly", no_live)
+
+    client = TestClient(app)
+    r = client.get("/api/weather/ok-to-spray?lat=32.73&lon=-98.79&hours=3")
+    data = r.json()
+    assert data["source"]["tile"] == "test"
+    assert data["source"]["status"]["openmeteo"] == "tile"
+    assert data["table"][0]["wind_mph"] == pytest.approx(4.84, abs=1e-4)
+
+    overlay = client.get("/api/weather/spray-tiles/test?hour=1").json()
+    assert overlay["rows"] == 3 and np.array(overlay["status"]).shape == (3, 3)
+    assert client.get("/api/weather/spray-tiles/nowhere").status_code == 404
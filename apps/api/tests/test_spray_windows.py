@@ -0,0 +1,29 @@
+import numpy as np
+
+from apps.api.services.spray_windows import find_windows, first_ok_window
+
+
+TS = [f"2024-01-01T{h:02d}:00:00Z" for h in range(10)]
+STATUS = np.array(["OK", "OK", "NOT_OK", "OK", "CAUTION", "OK", "OK", "NOT_OK", "CAUTION", "CAUTION"])
+
+
+def test_windows_are_maximal_runs_ranked():
+    windows = find_windows(STATUS, TS, min_hours=2)
+    assert [(w["start"], w["hours"], w["caution_hours"]) for w in windows] == [
+        ("2024-01-01T00:00:00Z", 2, 0),
+        ("2024-01-01T03:00:00Z", 4, 1),
+        ("2024-01-01T08:00:00Z", 2, 2),
+    ]
+    assert windows[1]["end"] == "2024-01-01T06:00:00Z"
+
+
+def test_min_hours_and_ok_only():
+    assert [w["start"] for w in find_windows(STATUS, TS, min_hours=3)] == ["2024-01-01T03:00:00Z"]
+    assert [w["hours"] for w in find_windows(STATUS, TS, min_hours=2, include_caution=False)] == [2, 2]
+    assert find_windows(np.array(["NOT_OK"] * 3), TS[:3]) == []
+
+
+def test_first_ok_window_matches_legacy_semantics():
+    assert first_ok_window(STATUS, TS) == {"start": "2024-01-01T00:00:00Z", "end": "2024-01-01T01:00:00Z"}
+    assert first_ok_window(STATUS[2:], TS[2:]) == {"start": "2024-01-01T05:00:00Z", "end": "2024-01-01T06:00:00Z"}
+    assert first_ok_window(np.array(["OK"]), TS[:1]) is None
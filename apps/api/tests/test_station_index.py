@@ -0,0 +1,133 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.pool import StaticPool
+from sqlmodel import create_engine
+
+from apps.api.services import station_index
+from apps.api.services.station_index import StationDirectory, StationIndex
+
+
+STATIONS = [
+    {"id": 1, "provider": "OK_MESONET", "name": "OKC East", "lat": 35.508, "lon": -97.427, "state": "OK", "has_soil_temp": True},
+    {"id": 2, "provider": "TEX_MESONET", "name": "Dallas Love", "lat": 32.847, "lon": -96.851, "state": "TX", "has_soil_temp": True},
+    {"id": 3, "provider": "TEX_MESONET", "name": "Fort Worth", "lat": 32.755, "lon": -97.330, "state": "TX", "has_soil_temp": False},
+    {"id": 4, "provider": "TEX_MESONET", "name": "Austin", "lat": 30.267, "lon": -97.743, "state": "TX", "has_soil_temp": True},
+]
+
+
+def test_nearest_k_nearest_and_radius():
+    idx = StationIndex(STATIONS)
+    # Fort Worth is closest to this point but has no soil sensor
+    assert idx.nearest(32.76, -97.33)["id"] == 2
+    assert idx.nearest(32.76, -97.33, soil_only=False)["id"] == 3
+
+    hits = idx.k_nearest(32.8, -96.8, k=3)
+    assert [h["id"] for h in hits] == [2, 4, 1]
+    assert hits[0]["distance_km"] < 10
+    # Dallas -> Austin is roughly 290 km
+    assert 280 < hits[1]["distance_km"] < 300
+
+    assert [h["id"] for h in idx.within(32.8, -96.8, 100, soil_only=False)] == [2, 3]
+    assert idx.within(0.0, 0.0, 100) == []
+    assert StationIndex([]).nearest(32.8, -96.8) is None
+
+
+def _engine():
+    eng = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with eng.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE stations (id INTEGER PRIMARY KEY, provider TEXT, name TEXT, lat REAL, lon REAL, "
+                "state TEXT, has_soil_temp BOOLEAN, priority INTEGER DEFAULT 0)"
+            )
+        )
+        conn.execute(
+            text("INSERT INTO stations (id, provider, name, lat, lon, state, has_soil_temp) VALUES (:id, :provider, :name, :lat, :lon, :state, :has_soil_temp)"),
+            STATIONS[:2],
+        )
+    return eng
+
+
+@pytest.mark.asyncio
+async def test_directory_falls_back_then_reloads_on_change(monkeypatch):
+    calls = []
+
+    async def fake_db(lat, lon):
+        calls.append((lat, lon))
+        return {"id": 99}
+
+    monkeypatch.setattr(station_index, "select_nearest_station_safe", fake_db)
+    eng = _engine()
+    directory = StationDirectory(bind=eng)
+    assert (await directory.nearest(32.8, -96.8))["id"] == 99
+    assert directory.stats()["db_fallbacks"] == 1
+
+    first = await directory.refresh()
+    hit = await directory.nearest(32.8, -96.8)
+    assert hit["id"] == 2 and "distance_km" not in hit
+    # Unchanged table keeps the same index object
+    assert await directory.refresh() is first
+
+    with eng.begin() as conn:
+        conn.execute(text("INSERT INTO stations VALUES (5, 'TEX_MESONET', 'Plano', 33.02, -96.70, 'TX', 1, 0)"))
+    assert await directory.refresh() is not first
+    assert (await directory.nearest(33.0, -96.7))["id"] == 5
+    assert len(calls) == 1
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+
+class _Conn:
+    def __init__(self, rows, seen):
+        self._rows = rows
+        self._seen = seen
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt, params):
+        self._seen.append((str(stmt), params))
+        return _Rows(self._rows)
+
+
+class _Engine:
+    def __init__(self, rows):
+        self.rows = rows
+        self.seen = []
+
+    def connect(self):
+        return _Conn(self.rows, self.seen)
+
+
+@pytest.mark.asyncio
+async def test_batched_knn_query_maps_rows_back_to_points(monkeypatch):
+    from apps.api.services import station_select
+
+    rows = [
+        {"idx": 1, **STATIONS[1]},
+        {"idx": 2, **{k: None for k in STATIONS[0]}},  # LEFT JOIN LATERAL with no candidate
+        {"idx": 3, **STATIONS[0]},
+    ]
+    eng = _Engine(rows)
+    monkeypatch.setattr(station_select, "async_engine", lambda: eng)
+    out = await station_select.select_nearest_stations_safe([(32.8, -96.8), (0.0, 0.0), (35.5, -97.4)])
+    assert [s["id"] if s else None for s in out] == [2, None, 1]
+    assert "idx" not in out[0]
+
+    sql, params = eng.seen[0]
+    assert "<->" in sql and "LATERAL" in sql and "ST_DistanceSphere" not in sql
+    assert params["lats"] == [32.8, 0.0, 35.5] and params["lons"] == [-96.8, 0.0, -97.4]
+    assert len(eng.seen) == 1
+    assert await station_select.select_nearest_stations_safe([]) == []
@@ -0,0 +1,74 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from apps.api.providers.openmeteo import OpenMeteoProvider
+
+from _doubles import Clock, FakeResp
+
+
+class VersionedClient:
+    """Each upstream call returns a new wind value so refreshes are observable."""
+
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+
+    async def get(self, url, params=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        start = datetime.strptime(params["start_hour"], "%Y-%m-%dT%H:%M")
+        return FakeResp({"hourly": {
+            "time": [(start + timedelta(hours=i)).isoformat() for i in range(48)],
+            "wind_speed_10m": [float(self.calls)] * 48,
+        }})
+
+
+def _provider(client):
+    prov = OpenMeteoProvider(client=client, ttl_seconds=600, max_stale_seconds=1800)
+    prov.cache.clock = Clock()
+    return prov
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_served_immediately_and_refreshed_in_background():
+    client = VersionedClient(delay=0.05)
+    prov = _provider(client)
+    start = datetime(2024, 1, 1, 12)
+    end = start + timedelta(hours=2)
+    assert (await prov.get_hourly(32.8, -96.8, start, end))[0]["wind_mph"] == 1.0
+
+    prov.cache.clock.now = 900  # past fresh TTL, inside the stale window
+    stale = await prov.get_hourly(32.8, -96.8, start, end)
+    assert stale[0]["wind_mph"] == 1.0
+    assert prov.stale_served == 1
+    await asyncio.sleep(0.1)
+    assert client.calls == 2
+    assert (await prov.get_hourly(32.8, -96.8, start, end))[0]["wind_mph"] == 2.0
+
+
+@pytest.mark.asyncio
+async def test_entry_past_hard_stale_limit_is_refetched_inline():
+    client = VersionedClient()
+    prov = _provider(client)
+    start = datetime(2024, 1, 1, 12)
+    await prov.get_hourly(32.8, -96.8, start, start + timedelta(hours=2))
+    prov.cache.clock.now = 600 + 1800 + 1
+    rows = await prov.get_hourly(32.8, -96.8, start, start + timedelta(hours=2))
+    assert rows[0]["wind_mph"] == 2.0
+    assert prov.stale_served == 0
+
+
+@pytest.mark.asyncio
+async def test_new_hour_bucket_served_from_previous_series():
+    client = VersionedClient(delay=0.05)
+    prov = _provider(client)
+    start = datetime(2024, 1, 1, 12, 59)
+    await prov.get_hourly(32.8, -96.8, start, start + timedelta(hours=3))
+
+    next_hour = datetime(2024, 1, 1, 13, 1)
+    rows = await prov.get_hourly(32.8, -96.8, next_hour, next_hour + timedelta(hours=3))
+    assert rows[0]["ts"] == "2024-01-01T13:00:00Z"
+    assert rows[0]["wind_mph"] == 1.0
+    await prov.aclose()
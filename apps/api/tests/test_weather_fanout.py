@@ -0,0 +1,66 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from apps.api.main import app
+
+
+client = TestClient(app)
+
+OM_ROWS = [
+    {"ts": "2024-01-01T00:00:00Z", "wind_mph": 5.0, "wind_gust_mph": 10.0, "precip_prob": 0.0, "precip_in": 0.0},
+    {"ts": "2024-01-01T01:00:00Z", "wind_mph": 6.0, "wind_gust_mph": 10.0, "precip_prob": 0.0, "precip_in": 0.0},
+]
+
+
+def _patch_sources(monkeypatch, om_delay, nws_delay):
+    async def slow_om(self, lat, lon, start, end):
+        await asyncio.sleep(om_delay)
+        return OM_ROWS
+
+    async def slow_nws(self, lat, lon):
+        await asyncio.sleep(nws_delay)
+        return [{"ts": "2024-01-01T00:00:00Z", "wind_mph": 7.0, "wind_gust_mph": 9.0}]
+
+    from apps.api.providers import nws, openmeteo
+    monkeypatch.setattr(openmeteo.OpenMeteoProvider, 'get_hourly', slow_om)
+    monkeypatch.setattr(nws.NWSProvider, 'get_forecast_hourly', slow_nws)
+    monkeypatch.setenv('NWS_USER_AGENT', 'BermudaBuddy/1.0 (test@example.com)')
+
+
+def test_sources_are_fetched_concurrently(monkeypatch):
+    _patch_sources(monkeypatch, om_delay=0.3, nws_delay=0.3)
+    t0 = time.perf_counter()
+    r = client.get("/api/weather/ok-to-spray?lat=32.8&lon=-96.8&hours=2&wind_source=nws")
+    elapsed = time.perf_counter() - t0
+    assert r.status_code == 200
+    assert r.json()["source"]["provider"] == "NWS+OpenMeteo"
+    assert elapsed < 0.55
+
+
+def test_slow_nws_degrades_to_openmeteo(monkeypatch):
+    _patch_sources(monkeypatch, om_delay=0.0, nws_delay=2.0)
+    monkeypatch.setenv('NWS_TIMEOUT_S', '0.05')
+    t0 = time.perf_counter()
+    r = client.get("/api/weather/ok-to-spray?lat=32.8&lon=-96.8&hours=2&wind_source=nws")
+    assert time.perf_counter() - t0 < 1.0
+    data = r.json()
+    assert data["source"]["provider"] == "OpenMeteo"
+    assert data["source"]["status"]["nws"] == "timeout"
+    assert data["table"][0]["wind_mph"] == 5.0
+
+
+def test_summary_alerts_timeout_is_reported(monkeypatch):
+    async def slow_alerts(self, lat, lon):
+        await asyncio.sleep(2.0)
+        return []
+
+    _patch_sources(monkeypatch, om_delay=0.0, nws_delay=0.0)
+    from apps.api.providers import nws
+    monkeypatch.setattr(nws.NWSProvider, 'get_alerts', slow_alerts)
+    monkeypatch.setenv('ALERTS_TIMEOUT_S', '0.05')
+    r = client.get("/api/weather/summary?lat=32.8&lon=-96.8")
+    assert r.status_code == 200
+    assert r.json()["alerts"] == {"items": [], "status": "timeout", "provider": "NWS"}
+    assert r.json()["current"]["wind_mph"] == 5.0